@@ -0,0 +1,262 @@
+import heapq
+import math
+import time
+
+from algorithms.flow_solver import FlowProblem
+
+# Costs carry 3 decimals → integer benefits, so ε < 1/n proves optimality
+SCALE = 1000
+THETA = 5                             # ε reduction factor per phase
+INF = math.inf
+CHECK_EVERY = 64                      # bids between deadline checks
+
+
+class FloorAuction:
+    """
+    ε-scaling forward auction for one floor.
+
+    Each AP is a pool of identical slots with their own prices (a min-heap,
+    cheapest slot first); a user bids for the cheapest slot of its best AP.
+    The problem is made square so plain forward auction stays exact:
+
+      • an AP never needs more slots than there are users on the floor
+      • spare slots are taken by dummy persons (benefit 0 everywhere)
+      • users beyond total capacity go to "no AP" slots (benefit 0), so
+        exactly min(users, slots) users end up assigned — same as MCMF
+
+    Every completed phase yields a full assignment within n·ε of optimal;
+    the latest one is kept so the solver can be stopped at any time.
+    Assumes every user can reach every AP of the floor (per_floor problems).
+    """
+
+    def __init__(self, problem):
+        self.p = problem
+        n_u, n_a = problem.n_users, problem.n_aps
+
+        caps = [min(c, n_u) for c in problem.capacity]
+        total = sum(caps)
+        self.none = n_a if n_u > total else -1
+        if self.none >= 0:
+            caps.append(n_u - total)
+
+        # Integer benefits per person: [(object, benefit), ...]
+        self.rows = []
+        lo, hi = 0, 0
+        for u in range(n_u):
+            row = []
+            for k in range(problem.indptr[u], problem.indptr[u + 1]):
+                b = -int(round(problem.costs[k] * SCALE))
+                row.append((problem.indices[k], b))
+                lo, hi = min(lo, b), max(hi, b)
+            if self.none >= 0:
+                row.append((self.none, 0))
+            self.rows.append(row)
+
+        dummy = [(a, 0) for a in range(n_a)]
+        self.rows.extend(dummy for _ in range(total - n_u))
+
+        self.n = len(self.rows)
+        self.spread = max(1, hi - lo)
+
+        # Slot prices + owners per object
+        self.slots = [[(0, s) for s in range(c)] for c in caps]
+        self.owner = [[-1] * c for c in caps]
+
+        self.assign = [-1] * self.n
+        self.bids = 0
+        self.phases = 0
+
+    # ============================================================
+    # One ε phase
+    # ============================================================
+    def _reset(self):
+        for owners in self.owner:
+            for s in range(len(owners)):
+                owners[s] = -1
+        self.assign = [-1] * self.n
+
+    def _phase(self, eps, deadline):
+        """Run until every person holds a slot; False if the deadline hit."""
+        rows, slots, owner, assign = self.rows, self.slots, self.owner, self.assign
+
+        queue = [u for u in range(self.n) if assign[u] < 0]
+        queue.reverse()
+        n = 0
+
+        while queue:
+            n += 1
+            if n % CHECK_EVERY == 0 and time.perf_counter() >= deadline:
+                self.bids += n
+                return False
+
+            u = queue.pop()
+
+            best_v = second_v = -INF
+            best_a = -1
+            best_b = 0
+            for a, b in rows[u]:
+                heap = slots[a]
+                if not heap:
+                    continue
+                v = b - heap[0][0]
+                if v > best_v:
+                    second_v = best_v
+                    best_v, best_a, best_b = v, a, b
+                elif v > second_v:
+                    second_v = v
+
+            heap = slots[best_a]
+            if len(heap) > 1:
+                p2 = heap[1][0] if len(heap) == 2 else min(heap[1][0], heap[2][0])
+                second_v = max(second_v, best_b - p2)
+            if second_v == -INF:
+                second_v = best_v
+
+            _, s = heap[0]
+            heapq.heapreplace(heap, (best_b - second_v + eps, s))
+
+            evicted = owner[best_a][s]
+            owner[best_a][s] = u
+            assign[u] = best_a
+
+            if evicted >= 0:
+                assign[evicted] = -1
+                queue.append(evicted)
+
+        self.bids += n
+        return True
+
+    def _complete_greedily(self):
+        """Deadline before any phase finished: fill the gaps feasibly."""
+        free = [sum(1 for o in owners if o < 0) for owners in self.owner]
+        for u in range(self.p.n_users):
+            if self.assign[u] >= 0:
+                continue
+            # Real APs first (best benefit), "no AP" only as a last resort
+            for a, _ in sorted(self.rows[u], key=lambda e: (e[0] == self.none, -e[1])):
+                if free[a]:
+                    free[a] -= 1
+                    self.assign[u] = a
+                    break
+        return self._users_only(self.assign)
+
+    def _users_only(self, assign):
+        """Drop dummies and map "no AP" to -1."""
+        return [
+            a if a != self.none else -1
+            for a in assign[:self.p.n_users]
+        ]
+
+    # ============================================================
+    # Bounds
+    # ============================================================
+    def gap(self, assign):
+        """
+        Optimality gap bound for the user assignment, in cost units.
+
+        Weak duality for the square problem with the current slot prices:
+            opt ≤ Σ_persons max_obj(b - p_min) + Σ_slots p
+        Dummies and "no AP" users contribute benefit 0 to the primal.
+        """
+        p_min = [heap[0][0] if heap else None for heap in self.slots]
+        dual = sum(p for heap in self.slots for p, _ in heap)
+        for row in self.rows:
+            dual += max(b - p_min[a] for a, b in row if p_min[a] is not None)
+
+        primal = 0
+        for u, a in enumerate(assign):
+            if a < 0:
+                continue
+            for a2, b in self.rows[u]:
+                if a2 == a:
+                    primal += b
+                    break
+
+        return max(0, dual - primal) / SCALE
+
+    # ============================================================
+    # Public API
+    # ============================================================
+    def solve(self, deadline):
+        """Best assignment reachable before `deadline` (perf_counter)."""
+        eps_final = 1.0 / (self.n + 1)
+        eps = max(self.spread / THETA, eps_final)
+
+        best = None
+        best_eps = None
+
+        while True:
+            done = self._phase(eps, deadline)
+            if not done:
+                break
+
+            self.phases += 1
+            best, best_eps = self._users_only(self.assign), eps
+            if eps <= eps_final or time.perf_counter() >= deadline:
+                break
+
+            eps = max(eps / THETA, eps_final)
+            self._reset()
+
+        if best is None:
+            best = self._complete_greedily()
+
+        return best, {
+            "phases": self.phases,
+            "bids": self.bids,
+            "optimal": best_eps is not None and best_eps <= eps_final,
+            "eps": (best_eps or eps) / SCALE,
+            "gap": self.gap(best),
+        }
+
+
+class AuctionEngine:
+    """
+    Anytime assignment backend — same interface as MCMFEngine.run().
+
+    Floors are independent, so each gets a slice of `time_budget` (seconds)
+    proportional to its user count.  Whatever happens, run() returns a
+    valid assignment (no AP over capacity, floor rule respected) and
+    `engine.report` carries the optimality gap bound.
+    """
+
+    def __init__(self, users, aps, time_budget=0.05, weights=None, alpha=None):
+        self.users = users
+        self.aps = aps
+        self.time_budget = time_budget
+        self.weights = weights      # cost_function.W / CAPACITY_ALPHA when None
+        self.alpha = alpha
+        self.report = {}
+
+    def run(self):
+        start = time.perf_counter()
+        end = start + max(0.0, self.time_budget)
+
+        problems = FlowProblem.per_floor(self.users, self.aps, self.weights, self.alpha)
+        remaining = sum(p.n_users for p in problems.values())
+
+        assignments = {u["id"]: None for u in self.users}
+        report = {"floors": len(problems), "phases": 0, "bids": 0,
+                  "optimal": True, "eps": 0.0, "gap": 0.0}
+
+        for problem in problems.values():
+            now = time.perf_counter()
+            share = problem.n_users / remaining if remaining else 1.0
+            remaining -= problem.n_users
+            deadline = now + max(0.0, end - now) * share
+
+            assign, stats = FloorAuction(problem).solve(deadline)
+
+            for uid, a in zip(problem.user_ids, assign):
+                assignments[uid] = problem.ap_ids[a] if a >= 0 else None
+
+            report["phases"] += stats["phases"]
+            report["bids"] += stats["bids"]
+            report["optimal"] &= stats["optimal"]
+            report["eps"] = max(report["eps"], stats["eps"])
+            report["gap"] += stats["gap"]
+
+        report["gap"] = round(report["gap"], 3)
+        report["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        self.report = report
+        return assignments
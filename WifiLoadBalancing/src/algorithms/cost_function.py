@@ -1,8 +1,12 @@
 import math
 
+import numpy as np
+
 # ============================================================
 # Tunable Weights
 # ============================================================
+# Defaults; every function below also takes per-call `weights` / `alpha`
+# (WifiSimulator(config=...) passes its own, see simulation.sweep)
 W = {
     "distance":      0.20,
     "signal":        0.50,
@@ -14,12 +18,13 @@ W = {
 
 RSSI_THRESHOLD = -75
 FLOOR_PENALTY = 10_000          # Hard block: cross-floor assignment is illegal
+CAPACITY_ALPHA = 0.25           # dynamic_capacity boost per log(1 + users)
 
 
 # ============================================================
 # 1. Dynamic AP Capacity (Real WiFi Controllers)
 # ============================================================
-def dynamic_capacity(ap):
+def dynamic_capacity(ap, alpha=None):
     """
     Real enterprise WiFi (Cisco/Aruba) automatically increases
     per-AP effective capacity when user count rises.
@@ -30,7 +35,7 @@ def dynamic_capacity(ap):
 
     base = ap.get("airtime_capacity", 100)
     users = ap.get("user_count", 0)
-    alpha = 0.25  # Smooth boosting
+    alpha = CAPACITY_ALPHA if alpha is None else alpha  # Smooth boosting
 
     # Safe log
     boosted = base * (1 + alpha * math.log(1 + users))
@@ -38,6 +43,13 @@ def dynamic_capacity(ap):
     return max(base, boosted)
 
 
+def dynamic_capacities(base, users, alpha=None):
+    """dynamic_capacity() over arrays (airtime_capacity, user_count columns)."""
+    alpha = CAPACITY_ALPHA if alpha is None else alpha
+    boosted = base * (1 + alpha * np.log1p(users))
+    return np.maximum(base, boosted)
+
+
 # ============================================================
 # 2. Helper Functions
 # ============================================================
@@ -67,12 +79,12 @@ def interference_penalty(ap):
     return float(ap.get("interference_score", 0.0))
 
 
-def load_penalty(ap):
+def load_penalty(ap, alpha=None):
     """
     Cost increases as AP approaches its dynamic effective capacity.
     """
     load = ap.get("load", 0.0)
-    cap = dynamic_capacity(ap)
+    cap = dynamic_capacity(ap, alpha)
 
     if cap <= 0:
         return 5.0  # emergency
@@ -86,11 +98,12 @@ def load_penalty(ap):
 # ============================================================
 # MAIN COST FUNCTION (Floor-Safe)
 # ============================================================
-def compute_cost(user, ap):
+def compute_cost(user, ap, weights=None, alpha=None):
     """
     Cost for MCMF edges.
     Lower = better.
     """
+    W_ = W if weights is None else weights
 
     # ---------------------------
     # HARD RESTRICTION:
@@ -121,15 +134,120 @@ def compute_cost(user, ap):
     air = float(user.get("airtime_usage", 1))
     sticky = sticky_penalty(temp_rssi)
     inter = interference_penalty(ap)
-    load = load_penalty(ap)  # NEW
+    load = load_penalty(ap, alpha)  # NEW
 
     total = (
-        W["distance"]      * dist +
-        W["signal"]        * sig +
-        W["airtime"]       * air +
-        W["sticky"]        * sticky +
-        W["interference"]  * inter +
-        W["load"]          * load       # NEW → makes system self-balancing
+        W_["distance"]      * dist +
+        W_["signal"]        * sig +
+        W_["airtime"]       * air +
+        W_["sticky"]        * sticky +
+        W_["interference"]  * inter +
+        W_["load"]          * load       # NEW → makes system self-balancing
     )
 
     return round(total, 3)
+
+
+# ============================================================
+# BATCHED COST MATRIX (same semantics as compute_cost)
+# ============================================================
+def compute_floor_cost_matrices(users, aps, weights=None, alpha=None):
+    """
+    Per-floor cost blocks for MCMF edges.
+
+    Returns {floor: (user_idx, ap_idx, costs)} where costs[i, j] equals
+    compute_cost(users[user_idx[i]], aps[ap_idx[j]]).  Only floors that
+    have both users and APs appear — every other pair is FLOOR_PENALTY.
+
+    Per-AP terms (interference, load vs dynamic capacity) are evaluated
+    once per AP and broadcast down the user axis.
+    """
+    W_ = W if weights is None else weights
+
+    # Group indices by floor (list order preserved)
+    ap_floors = {}
+    for j, ap in enumerate(aps):
+        ap_floors.setdefault(ap.get("floor"), []).append(j)
+
+    user_floors = {}
+    for i, u in enumerate(users):
+        f = u.get("floor")
+        if f in ap_floors:
+            user_floors.setdefault(f, []).append(i)
+
+    # Per-AP terms, once
+    ap_x = np.zeros(len(aps))
+    ap_y = np.zeros(len(aps))
+    ap_ok = np.zeros(len(aps), dtype=bool)
+    ap_inter = np.zeros(len(aps))
+    ap_load = np.zeros(len(aps))
+
+    for j, ap in enumerate(aps):
+        ap_ok[j], ap_x[j], ap_y[j] = _xy(ap)
+        ap_inter[j] = W_["interference"] * interference_penalty(ap)
+        ap_load[j] = W_["load"] * load_penalty(ap, alpha)
+
+    blocks = {}
+
+    for floor, rows in user_floors.items():
+        cols = np.asarray(ap_floors[floor], dtype=np.int64)
+        rows = np.asarray(rows, dtype=np.int64)
+
+        ux = np.zeros(rows.size)
+        uy = np.zeros(rows.size)
+        u_ok = np.zeros(rows.size, dtype=bool)
+        air = np.zeros(rows.size)
+
+        for k, i in enumerate(rows.tolist()):
+            u = users[i]
+            u_ok[k], ux[k], uy[k] = _xy(u)
+            air[k] = float(u.get("airtime_usage", 1))
+
+        # Distance (9999 wherever euclidean_distance would have failed)
+        dist = np.hypot(
+            ux[:, None] - ap_x[None, cols],
+            uy[:, None] - ap_y[None, cols],
+        )
+        dist[~(u_ok[:, None] & ap_ok[None, cols])] = 9999.0
+
+        # RSSI via log-distance model
+        temp_rssi = -30 - 20 * np.log10(np.maximum(dist, 1.0))
+        temp_rssi = np.clip(temp_rssi, -95, -40)
+
+        sig = np.maximum(0.0, (-temp_rssi - 40.0) / 10.0)
+        sticky = (temp_rssi < RSSI_THRESHOLD).astype(float)
+
+        total = (
+            W_["distance"]      * dist +
+            W_["signal"]        * sig +
+            W_["airtime"]       * air[:, None] +
+            W_["sticky"]        * sticky +
+            ap_inter[None, cols] +
+            ap_load[None, cols]
+        )
+
+        blocks[floor] = (rows, cols, np.round(total, 3))
+
+    return blocks
+
+
+def compute_cost_matrix(users, aps, weights=None, alpha=None):
+    """
+    Dense |users| × |aps| version of compute_cost.
+
+    Cross-floor pairs carry FLOOR_PENALTY, exactly like the scalar function.
+    """
+    costs = np.full((len(users), len(aps)), float(FLOOR_PENALTY))
+
+    for rows, cols, block in compute_floor_cost_matrices(users, aps, weights, alpha).values():
+        costs[np.ix_(rows, cols)] = block
+
+    return costs
+
+
+def _xy(obj):
+    """(ok, x, y) — ok is False where math.dist would have raised."""
+    x, y = obj.get("x"), obj.get("y")
+    if isinstance(x, (int, float)) and isinstance(y, (int, float)):
+        return True, float(x), float(y)
+    return False, 0.0, 0.0
@@ -0,0 +1,520 @@
+import heapq
+import math
+
+from algorithms.cost_function import compute_floor_cost_matrices, dynamic_capacity
+
+INF = math.inf
+EPS = 1e-9
+
+
+class FlowProblem:
+    """
+    Integer-indexed S → user → AP → T flow problem.
+
+    Users and APs are plain indices; user → AP edges are stored CSR-style:
+
+        indptr[u] : indptr[u + 1]   → slice of indices / costs for user u
+        indices[k]                  → AP index of edge k
+        costs[k]                    → edge cost (compute_cost semantics)
+        capacity[a]                 → AP → T capacity
+
+    S → user edges are implicit (capacity 1, cost 0).
+    """
+
+    def __init__(self, user_ids, ap_ids, indptr, indices, costs, capacity):
+        self.user_ids = user_ids
+        self.ap_ids = ap_ids
+        self.indptr = indptr
+        self.indices = indices
+        self.costs = costs
+        self.capacity = capacity
+
+    @property
+    def n_users(self):
+        return len(self.user_ids)
+
+    @property
+    def n_aps(self):
+        return len(self.ap_ids)
+
+    @classmethod
+    def from_users(cls, users, aps, weights=None, alpha=None):
+        """Same edges and capacities as GraphModel + MCMFEngine."""
+        row_cols = {}
+        for rows, cols, block in compute_floor_cost_matrices(users, aps, weights, alpha).values():
+            col_list = cols.tolist()
+            for k, i in enumerate(rows.tolist()):
+                row_cols[i] = (col_list, block[k].tolist())
+
+        indptr = [0]
+        indices = []
+        costs = []
+        for i in range(len(users)):
+            cols, row = row_cols.get(i, ((), ()))
+            indices.extend(cols)
+            costs.extend(row)
+            indptr.append(len(indices))
+
+        capacity = [int(max(1, dynamic_capacity(ap, alpha))) for ap in aps]
+
+        return cls(
+            [u["id"] for u in users],
+            [ap["id"] for ap in aps],
+            indptr, indices, costs, capacity,
+        )
+
+    @classmethod
+    def per_floor(cls, users, aps, weights=None, alpha=None):
+        """
+        One independent problem per floor.
+
+        The floor rule means there are no cross-floor edges, so the global
+        flow is just the union of these.  Users on floors without APs are
+        left out (they can never be assigned).
+        """
+        problems = {}
+        for floor, (rows, cols, block) in compute_floor_cost_matrices(users, aps, weights, alpha).items():
+            n_u, n_a = block.shape
+            problems[floor] = cls(
+                [users[i]["id"] for i in rows.tolist()],
+                [aps[j]["id"] for j in cols.tolist()],
+                list(range(0, n_u * n_a + 1, n_a)),
+                list(range(n_a)) * n_u,
+                block.ravel().tolist(),
+                [int(max(1, dynamic_capacity(aps[j], alpha))) for j in cols.tolist()],
+            )
+        return problems
+
+
+class SSPSolver:
+    """
+    Successive shortest paths with Dijkstra + node potentials, specialised
+    for the bipartite S → user → AP → T shape.
+
+    User nodes are never expanded explicitly.  Every residual path between
+    two APs goes through exactly one user, so the search runs on the AP
+    nodes only:
+
+        S → a   cheapest unassigned user with an edge to a     c(u, a)
+        a → b   cheapest user on a that could move to b        c(u, b) - c(u, a)
+        a → T   a still has spare capacity                     0
+        a → S   most expensive user on a (warm repair only)   -c(u, a)
+        T → a   a carries flow (warm repair only)              0
+
+    Each edge family is a lazy-deletion heap, so one augmentation costs
+    O(A log A + deg(path) log U) instead of a scan over every user edge.
+
+    Warm start (solve(warm=...)):
+        The previous assignment is replayed, trimmed to the new capacities
+        and made optimal again by cancelling the negative cycles that the
+        new costs created.  Old potentials are reused when still feasible.
+        Only the users that cycle-cancelling moves, plus the unassigned
+        ones, cost any work.
+    """
+
+    def __init__(self, problem):
+        self.p = problem
+        n_u, n_a = problem.n_users, problem.n_aps
+
+        self.assign = [-1] * n_u
+        self.base = [0.0] * n_u
+        self.stamp = [0] * n_u
+        self.flow = [0] * n_a
+
+        # Counters for reports
+        self.augmentations = 0
+        self.cancellations = 0
+        self.released = 0
+        self.kept = 0
+        self.warm = False       # seeded from a previous solve
+
+        # Potentials: APs 0..n_a-1, then T, then S
+        self.T = n_a
+        self.S = n_a + 1
+        self.pi = [0.0] * (n_a + 2)
+
+        # entry[a]    → heap of unassigned users with an edge to a
+        # cross[a][b] → heap of users on a that could move to b
+        # leave[a]    → heap of users on a, most expensive first
+        self.entry = [[] for _ in range(n_a)]
+        self.cross = [{} for _ in range(n_a)]
+        self.leave = [[] for _ in range(n_a)]
+        self._track_leave = False
+
+    # ============================================================
+    # Assignment + heap maintenance
+    # ============================================================
+    def _user_cost(self, u, a):
+        p = self.p
+        for k in range(p.indptr[u], p.indptr[u + 1]):
+            if p.indices[k] == a:
+                return p.costs[k]
+        return None
+
+    def _set(self, u, b):
+        """Move user u to AP b (-1 = unassign) and publish its new edges."""
+        p = self.p
+        old = self.assign[u]
+        if old >= 0:
+            self.flow[old] -= 1
+
+        self.stamp[u] += 1
+        st = self.stamp[u]
+        self.assign[u] = b
+
+        if b < 0:
+            entry = self.entry
+            for k in range(p.indptr[u], p.indptr[u + 1]):
+                heapq.heappush(entry[p.indices[k]], (p.costs[k], u, st))
+            return
+
+        self.flow[b] += 1
+        base = self._user_cost(u, b)
+        self.base[u] = base
+
+        out = self.cross[b]
+        for k in range(p.indptr[u], p.indptr[u + 1]):
+            c = p.indices[k]
+            if c == b:
+                continue
+            heap = out.get(c)
+            if heap is None:
+                heap = out[c] = []
+            heapq.heappush(heap, (p.costs[k] - base, u, st))
+
+        if self._track_leave:
+            heapq.heappush(self.leave[b], (-base, u, st))
+
+    def _top(self, heap):
+        """Cheapest still-valid (key, user) in a lazy heap."""
+        stamp = self.stamp
+        while heap:
+            key, u, st = heap[0]
+            if stamp[u] == st:
+                return key, u
+            heapq.heappop(heap)
+        return None
+
+    def _init_heaps(self):
+        p = self.p
+        n_a = p.n_aps
+        assign, base, stamp = self.assign, self.base, self.stamp
+
+        entry = [[] for _ in range(n_a)]
+        cross = [{} for _ in range(n_a)]
+        leave = [[] for _ in range(n_a)]
+        lowest = 0.0
+
+        for u in range(p.n_users):
+            a, st = assign[u], stamp[u]
+            lo, hi = p.indptr[u], p.indptr[u + 1]
+
+            if a < 0:
+                for k in range(lo, hi):
+                    c = p.costs[k]
+                    entry[p.indices[k]].append((c, u, st))
+                    if c < lowest:
+                        lowest = c
+                continue
+
+            out = cross[a]
+            for k in range(lo, hi):
+                b = p.indices[k]
+                if b != a:
+                    out.setdefault(b, []).append((p.costs[k] - base[u], u, st))
+            if self._track_leave:
+                leave[a].append((-base[u], u, st))
+
+        for heap in entry:
+            heapq.heapify(heap)
+        for out in cross:
+            for heap in out.values():
+                heapq.heapify(heap)
+        for heap in leave:
+            heapq.heapify(heap)
+
+        self.entry, self.cross, self.leave = entry, cross, leave
+
+        # Negative costs would break Dijkstra on a cold first pass
+        if lowest < 0 and not any(a >= 0 for a in assign):
+            self.pi = [lowest] * (n_a + 1) + [0.0]
+
+    # ============================================================
+    # Warm start
+    # ============================================================
+    def _seed(self, warm):
+        """Replay the previous assignment, then trim to new capacities."""
+        p = self.p
+        ap_index = {aid: a for a, aid in enumerate(p.ap_ids)}
+        previous = warm.get("assignment", {})
+
+        on_ap = [[] for _ in range(p.n_aps)]
+        for u, uid in enumerate(p.user_ids):
+            a = ap_index.get(previous.get(uid), -1)
+            if a < 0:
+                continue
+            cost = self._user_cost(u, a)
+            if cost is None:
+                continue
+            self.assign[u] = a
+            self.base[u] = cost
+            self.flow[a] += 1
+            on_ap[a].append(u)
+
+        # Capacity shrank → drop the most expensive users first
+        for a, users in enumerate(on_ap):
+            excess = self.flow[a] - p.capacity[a]
+            if excess <= 0:
+                continue
+            users.sort(key=lambda u: self.base[u], reverse=True)
+            for u in users[:excess]:
+                self.assign[u] = -1
+                self.flow[a] -= 1
+                self.released += 1
+
+        self.kept = sum(self.flow)
+
+        potentials = warm.get("potentials", {})
+        for a, aid in enumerate(p.ap_ids):
+            self.pi[a] = potentials.get(aid, 0.0)
+        self.pi[self.T] = potentials.get("T", 0.0)
+        self.pi[self.S] = potentials.get("S", 0.0)
+
+    def _residual_edges(self):
+        """(tail, head, cost, user) for every compressed residual edge."""
+        n_a, S, T = self.p.n_aps, self.S, self.T
+        cap, flow = self.p.capacity, self.flow
+        edges = []
+
+        for a in range(n_a):
+            top = self._top(self.entry[a])
+            if top is not None:
+                edges.append((S, a, top[0], top[1]))
+
+            top = self._top(self.leave[a])
+            if top is not None:
+                edges.append((a, S, top[0], top[1]))
+
+            for b, moves in self.cross[a].items():
+                top = self._top(moves)
+                if top is not None:
+                    edges.append((a, b, top[0], top[1]))
+
+            if flow[a] < cap[a]:
+                edges.append((a, T, 0.0, -1))
+            if flow[a] > 0:
+                edges.append((T, a, 0.0, -1))
+
+        return edges
+
+    def _cancel_negative_cycles(self):
+        """
+        Restore optimality of the seeded flow; return feasible potentials.
+
+        Each cancelled cycle moves one user per AP → AP edge on it, so the
+        work is proportional to how much the optimum actually shifted.
+        """
+        n = self.p.n_aps + 2
+        S, T = self.S, self.T
+
+        while True:
+            edges = self._residual_edges()
+            dist, cycle = _bellman_ford(n, edges)
+            if cycle is None:
+                break
+
+            for tail, head, _, u in cycle:
+                if tail == T or head == T:
+                    continue
+                self._set(u, -1 if head == S else head)
+            self.cancellations += 1
+
+        # Keep last tick's potentials if they still price every edge ≥ 0
+        pi = self.pi
+        if all(w + pi[x] - pi[y] >= -EPS for x, y, w, _ in edges):
+            return pi
+        return dist
+
+    # ============================================================
+    # One Dijkstra over AP nodes
+    # ============================================================
+    def _shortest_path(self):
+        n_a, T, pi = self.p.n_aps, self.T, self.pi
+        cap, flow = self.p.capacity, self.flow
+        pi_s = pi[self.S]
+
+        dist = {}
+        pred = {}
+        heap = []
+
+        for a in range(n_a):
+            top = self._top(self.entry[a])
+            if top is None:
+                continue
+            d = top[0] + pi_s - pi[a]
+            dist[a] = d
+            pred[a] = (-1, top[1])
+            heap.append((d, a))
+
+        heapq.heapify(heap)
+        settled = set()
+
+        while heap:
+            d, a = heapq.heappop(heap)
+            if a in settled:
+                continue
+            settled.add(a)
+            if a == T:
+                break
+
+            pa = pi[a]
+
+            if flow[a] < cap[a]:
+                nd = d + pa - pi[T]
+                if nd < dist.get(T, INF):
+                    dist[T] = nd
+                    pred[T] = (a, -1)
+                    heapq.heappush(heap, (nd, T))
+
+            for b, moves in self.cross[a].items():
+                if b in settled:
+                    continue
+                top = self._top(moves)
+                if top is None:
+                    continue
+                nd = d + top[0] + pa - pi[b]
+                if nd < dist.get(b, INF):
+                    dist[b] = nd
+                    pred[b] = (a, top[1])
+                    heapq.heappush(heap, (nd, b))
+
+        if T not in settled:
+            return None
+
+        # Potential update: settled nodes by their distance, the rest by d(T)
+        d_t = dist[T]
+        for v in range(n_a + 1):
+            pi[v] += dist[v] if v in settled else d_t
+
+        return pred
+
+    def _augment(self, pred):
+        b = pred[self.T][0]
+        while True:
+            a, u = pred[b]
+            self._set(u, b)
+            if a == -1:
+                break
+            b = a
+
+        self.augmentations += 1
+
+    # ============================================================
+    # Public API
+    # ============================================================
+    def solve(self, warm=None):
+        """Return assignment list: user index → AP index (or -1)."""
+        if warm:
+            self._seed(warm)
+            self.warm = True
+            self._track_leave = True
+            self._init_heaps()
+            self.pi = list(self._cancel_negative_cycles())
+            self._track_leave = False
+        else:
+            self._init_heaps()
+
+        while True:
+            pred = self._shortest_path()
+            if pred is None:
+                break
+            self._augment(pred)
+
+        return self.assign
+
+    def state(self):
+        """Warm-start payload for the next solve of the same floor."""
+        p = self.p
+        potentials = {aid: self.pi[a] for a, aid in enumerate(p.ap_ids)}
+        potentials["T"] = self.pi[self.T]
+        potentials["S"] = self.pi[self.S]
+        return {
+            "assignment": {
+                uid: p.ap_ids[a]
+                for uid, a in zip(p.user_ids, self.assign) if a >= 0
+            },
+            "potentials": potentials,
+        }
+
+    def report(self):
+        """Work done vs. a cold solve (one augmentation per unit of flow)."""
+        return {
+            "augmentations": self.augmentations,
+            "cancellations": self.cancellations,
+            "kept": self.kept,
+            "released": self.released,
+            "warm_floors": int(self.warm),
+            "cold_augmentations": sum(self.flow),
+        }
+
+
+def _bellman_ford(n, edges):
+    """
+    Bellman-Ford from a virtual source tied to every node.
+
+    Returns (dist, cycle): dist are feasible potentials when cycle is None,
+    otherwise cycle is a list of edges with negative total cost.
+    """
+    dist = [0.0] * n
+    pred = [None] * n
+    last = -1
+
+    for _ in range(n):
+        last = -1
+        for e in edges:
+            nd = dist[e[0]] + e[2]
+            if nd < dist[e[1]] - EPS:
+                dist[e[1]] = nd
+                pred[e[1]] = e
+                last = e[1]
+        if last == -1:
+            return dist, None
+
+    # Still relaxing after n rounds → walk back into the cycle
+    v = last
+    for _ in range(n):
+        if pred[v] is None:
+            return dist, None
+        v = pred[v][0]
+
+    cycle = []
+    x = v
+    while True:
+        e = pred[x]
+        if e is None:
+            return dist, None
+        cycle.append(e)
+        x = e[0]
+        if x == v or len(cycle) > n:
+            break
+
+    if x != v or sum(e[2] for e in cycle) >= -EPS:
+        return dist, None
+    return dist, cycle
+
+
+def solve_floor(problem, warm=None):
+    """
+    Pool-friendly entry point for one floor.
+
+    Returns (assignments, state, report); feed `state` back in as `warm`
+    on the next tick for an incremental solve.
+    """
+    solver = SSPSolver(problem)
+    assign = solver.solve(warm=warm)
+    ap_ids = problem.ap_ids
+    assignments = {
+        uid: (ap_ids[a] if a >= 0 else None)
+        for uid, a in zip(problem.user_ids, assign)
+    }
+    return assignments, solver.state(), solver.report()
@@ -1,5 +1,9 @@
 import networkx as nx
-from algorithms.cost_function import compute_cost, dynamic_capacity
+from algorithms.cost_function import compute_floor_cost_matrices, dynamic_capacity
+
+# Network simplex is only exact on integer weights; costs are rounded to
+# 3 decimals, so scaling by 1000 is lossless.
+COST_SCALE = 1000
 
 
 class GraphModel:
@@ -7,7 +11,7 @@ class GraphModel:
     Min-Cost Max-Flow Graph:
 
         S → user nodes (capacity=1)
-        user → AP edges (capacity=1, weight=cost)
+        user → AP edges (capacity=1, weight=cost * COST_SCALE)
         AP → T (capacity = dynamic airtime capacity)
 
     Properties:
@@ -17,9 +21,11 @@ class GraphModel:
       • Fully stable with new cost model
     """
 
-    def __init__(self, users, aps):
+    def __init__(self, users, aps, weights=None, alpha=None):
         self.users = users
         self.aps = aps
+        self.weights = weights
+        self.alpha = alpha
 
     def build_graph(self):
         G = nx.DiGraph()
@@ -37,23 +43,22 @@ class GraphModel:
 
         # ---------------------------------------------------
         # 2. Users → APs (same floor only)
+        #    Costs come from one batched matrix per floor
         # ---------------------------------------------------
-        for u in self.users:
-            uid = u["id"]
-            user_floor = u.get("floor")
+        user_edges = {}
+        for rows, cols, costs in compute_floor_cost_matrices(self.users, self.aps, self.weights, self.alpha).values():
+            for k, i in enumerate(rows.tolist()):
+                user_edges[i] = (cols.tolist(), costs[k].tolist())
 
-            # APs only on the same floor (strict rule)
-            same_floor_aps = [
-                ap for ap in self.aps
-                if ap.get("floor") == user_floor
-            ]
+        for i, u in enumerate(self.users):
+            uid = u["id"]
+            cols, costs = user_edges.get(i, ((), ()))
 
-            for ap in same_floor_aps:
-                aid = ap["id"]
-                cost = compute_cost(u, ap)
+            for j, cost in zip(cols, costs):
+                aid = self.aps[j]["id"]
 
                 # Each assignment = 1 unit of flow
-                G.add_edge(uid, aid, capacity=1, weight=cost)
+                G.add_edge(uid, aid, capacity=1, weight=int(round(cost * COST_SCALE)))
 
         # ---------------------------------------------------
         # 3. APs → T (dynamic capacity)
@@ -64,7 +69,7 @@ class GraphModel:
             # REAL CHANGE:
             # Instead of max_clients (static)
             # we use dynamic capacity that grows logarithmically
-            cap = dynamic_capacity(ap)
+            cap = dynamic_capacity(ap, self.alpha)
 
             # Make sure we don't pass floats to networkx
             G.add_edge(aid, "T", capacity=int(cap), weight=0)
@@ -1,6 +1,10 @@
 import math
+
+import numpy as np
+
 from algorithms.priority_queue import UserPriorityQueue
 from algorithms.cost_function import dynamic_capacity
+from simulation.state_store import APTable, ClientTable, group_rows
 
 
 class GreedyRedistributor:
@@ -12,11 +16,41 @@ class GreedyRedistributor:
     ✅ RSSI-based eviction order
     ✅ Coverage-aware
     ✅ Uses dynamic_capacity(ap) everywhere
+    ✅ Indexed: id → AP map, per-AP client buckets, per-floor AP lists
+       → one full pass is O((U + A) log U) instead of O(U · A)
+    ✅ Optional APGrid (ap_index) → alternatives come from nearby cells only
+    ✅ ClientTable / APTable → loads, buckets and eviction order come from
+       whole columns; only users actually popped become Record views.
+       `rows` picks the table rows to balance (default: all).
     """
 
-    def __init__(self, aps, users):
+    def __init__(self, aps, users, ap_index=None, alpha=None, rows=None):
         self.aps = aps
         self.users = users
+        self.alpha = alpha      # dynamic_capacity boost (CAPACITY_ALPHA when None)
+        self.rows = rows
+        self.tables = isinstance(users, ClientTable) and isinstance(aps, APTable)
+
+        # Spatial index must cover this exact AP list, otherwise scan floors
+        self.ap_index = ap_index if ap_index is not None and ap_index.aps is aps else None
+
+        # id → AP (first wins, like the old linear scan)
+        self.ap_by_id = {}
+        for ap in aps:
+            self.ap_by_id.setdefault(ap["id"], ap)
+
+        # floor → APs on that floor (list order preserved)
+        self.floor_aps = {}
+        for ap in aps:
+            self.floor_aps.setdefault(ap["floor"], []).append(ap)
+
+        # AP id → {user id: (position in self.users, user)}  (tables: user row)
+        # dicts keep insertion order and give O(1) removal
+        self.clients = {}
+
+        # Work done by the last redistribute()
+        self.moves = 0
+        self.overloaded = 0
 
     # ============================================================
     # Overloaded AP detection (dynamic capacity)
@@ -24,7 +58,7 @@ class GreedyRedistributor:
     def get_overloaded_aps(self):
         overloaded = []
         for ap in self.aps:
-            cap = dynamic_capacity(ap)
+            cap = dynamic_capacity(ap, self.alpha)
             if ap["load"] > cap:
                 overloaded.append(ap)
         return overloaded
@@ -33,36 +67,57 @@ class GreedyRedistributor:
     # Build Priority Queue of weakest users on this AP
     # ============================================================
     def build_priority_queue(self, ap):
+        if self.tables:
+            return self._table_queue(ap)
         pq = UserPriorityQueue()
-        for user in self.users:
+        for pos, user in self.clients.get(ap["id"], {}).values():
             if user.get("assigned_ap") == ap["id"]:
+                # (priority, position) → same pop order as a scan of self.users
                 priority = abs(user.get("RSSI", -95))
-                pq.push(priority, user)
+                pq.push((priority, pos), user)
         return pq
 
+    def _table_queue(self, ap):
+        """build_priority_queue() from the RSSI / assigned_ap columns (row = position)."""
+        users = self.users
+        bucket = self.clients.get(ap["id"], {})
+        rows = np.fromiter(bucket.values(), dtype=np.int64, count=len(bucket))
+        rows = rows[users.col("assigned_ap")[rows] == users.ap_ids.code(ap["id"])]
+        priority = np.abs(users.col("RSSI")[rows])
+        return UserPriorityQueue.from_items(
+            ((p, row), row) for p, row in zip(priority.tolist(), rows.tolist()))
+
     # ============================================================
     # Find alternative AP (same floor, capacity left, strong RSSI)
     # ============================================================
+    def _candidates(self, user):
+        """(ap, distance) for same-floor APs, in AP list order."""
+        floor = user.get("floor")
+        x, y = user["x"], user["y"]
+
+        if self.ap_index is not None:
+            radius = self.ap_index.max_radius.get(floor, 0)
+            for j, dist in self.ap_index.within(floor, x, y, radius):
+                yield self.aps[j], dist
+            return
+
+        for ap in self.floor_aps.get(floor, ()):
+            yield ap, math.dist((x, y), (ap["x"], ap["y"]))
+
     def find_alternative_ap(self, user):
-        user_floor = user.get("floor")
         best_ap = None
         best_rssi = -200
 
-        for ap in self.aps:
-            # Same floor only
-            if ap["floor"] != user_floor:
-                continue
-
+        for ap, dist in self._candidates(user):
             # Skip current AP
             if ap["id"] == user.get("assigned_ap"):
                 continue
 
             # AP must have dynamic available capacity
-            if ap["load"] >= dynamic_capacity(ap):
+            if ap["load"] >= dynamic_capacity(ap, self.alpha):
                 continue
 
             # Check coverage
-            dist = math.dist((user["x"], user["y"]), (ap["x"], ap["y"]))
             if dist > ap.get("coverage_radius", 200):
                 continue
 
@@ -83,30 +138,36 @@ class GreedyRedistributor:
     # Main Redistribution Routine
     # ============================================================
     def redistribute(self):
-        # 1. Reset loads & rebuild connected_clients cleanly
-        for ap in self.aps:
-            ap["load"] = 0
-            ap["connected_clients"] = []
-
-        for user in self.users:
-            aid = user.get("assigned_ap")
-            if aid:
-                for ap in self.aps:
-                    if ap["id"] == aid:
+        # 1. Reset loads & rebuild client buckets cleanly
+        if self.tables:
+            self._fill_from_tables()
+        else:
+            for ap in self.aps:
+                ap["load"] = 0
+            self.clients = {aid: {} for aid in self.ap_by_id}
+
+            for pos, user in enumerate(self.users):
+                aid = user.get("assigned_ap")
+                if aid:
+                    ap = self.ap_by_id.get(aid)
+                    if ap is not None:
                         ap["load"] += user.get("airtime_usage", 1)
-                        ap["connected_clients"].append(user["id"])
-                        break
+                        self.clients[aid][user["id"]] = (pos, user)
 
         # 2. Find overloaded APs using dynamic capacity
         overloaded_aps = self.get_overloaded_aps()
+        self.overloaded = len(overloaded_aps)
+        self.moves = 0
 
         # 3. Reassign weakest users first
         for ap in overloaded_aps:
             pq = self.build_priority_queue(ap)
-            cap = dynamic_capacity(ap)
+            cap = dynamic_capacity(ap, self.alpha)
 
             while len(pq) > 0 and ap["load"] > cap:
                 user = pq.pop()
+                if self.tables:
+                    user = self.users[user]
                 alternative_ap = self.find_alternative_ap(user)
 
                 if alternative_ap:
@@ -120,13 +181,32 @@ class GreedyRedistributor:
                     ap["load"] -= load_val
                     alternative_ap["load"] += load_val
 
-                    # Update lists
-                    if user["id"] in ap["connected_clients"]:
-                        ap["connected_clients"].remove(user["id"])
-
-                    alternative_ap["connected_clients"].append(user["id"])
+                    # Update buckets (O(1))
+                    entry = self.clients[ap["id"]].pop(user["id"])
+                    self.clients[alternative_ap["id"]][user["id"]] = entry
+                    self.moves += 1
 
                     print(f"♻️ Greedy moved {user['id']}   {old_ap} → {alternative_ap['id']}")
 
                 else:
                     break   # no AP available → stop
+
+        # 4. Publish connected_clients lists
+        for ap in self.aps:
+            ap["connected_clients"] = list(self.clients.get(ap["id"], {}))
+
+    def _fill_from_tables(self):
+        """Step 1 of redistribute() over the client columns."""
+        users, aps = self.users, self.aps
+        rows = np.arange(len(users)) if self.rows is None else np.asarray(self.rows, dtype=np.int64)
+        ap_rows = aps.rows_for(users.col("assigned_ap")[rows])   # first AP row per id
+        known = ap_rows >= 0
+
+        airtime = users.col("airtime_usage")[rows[known]]
+        aps.col("load")[:] = np.bincount(ap_rows[known], weights=airtime, minlength=len(aps))
+
+        ids, ap_ids = users.ids(), aps.ids()
+        self.clients = {aid: {} for aid in self.ap_by_id}
+        for ap_row, members in group_rows(ap_rows, rows).items():
+            members = members.tolist()
+            self.clients[ap_ids[ap_row]] = dict(zip([ids[r] for r in members], members))
@@ -1,6 +1,32 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import networkx as nx
 from algorithms.graph_model import GraphModel
 from algorithms.cost_function import dynamic_capacity
+from algorithms.flow_solver import FlowProblem, solve_floor
+
+# Below this many users the pickling round-trip costs more than it saves
+PARALLEL_MIN_USERS = 2000
+
+_pool = None
+_pool_workers = 0
+
+
+def _get_pool(workers):
+    """Shared per-process pool, (re)created only when the size changes."""
+    global _pool, _pool_workers
+    if _pool is None or _pool_workers != workers:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        # spawn, not fork: the API process is multi-threaded
+        _pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        _pool_workers = workers
+    return _pool
 
 
 class MCMFEngine:
@@ -14,20 +40,100 @@ class MCMFEngine:
     • Works even when #users > total capacity (partial assignment ok)
     • Stable + safe fallback behaviour
     • Output always includes ALL users (even unassigned ones)
+
+    Solvers (pluggable via `solver=`):
+        "ssp"       in-house successive-shortest-paths on CSR arrays (default)
+        "networkx"  reference nx.max_flow_min_cost on a DiGraph
+
+    The "ssp" path splits the problem by floor (no cross-floor edges exist)
+    and, for large campuses, solves the floors in parallel on a process
+    pool, so wall-clock time follows the busiest floor.
+    `workers=None` → one worker per floor (capped at CPU count),
+    `workers=0/1`  → solve floors inline.
+
+    Incremental mode: pass the previous run's `engine.state` as
+    `warm_state`.  Each floor then starts from last tick's flow and
+    potentials; users who joined/left (add_user_to_floor /
+    remove_user_from_floor) or whose costs moved the optimum are the only
+    ones repaired.  `engine.report` compares the work with a cold solve.
     """
 
-    def __init__(self, users, aps):
+    SOLVERS = ("ssp", "networkx")
+
+    def __init__(self, users, aps, solver="ssp", workers=None, warm_state=None,
+                 weights=None, alpha=None):
+        if solver not in self.SOLVERS:
+            raise ValueError(f"Unknown MCMF solver: {solver}")
         self.users = users
         self.aps = aps
+        self.solver = solver
+        self.workers = workers
+        self.warm_state = warm_state
+        self.weights = weights      # cost_function.W / CAPACITY_ALPHA when None
+        self.alpha = alpha
+
+        # Filled by run() (ssp only)
+        self.state = {}
+        self.report = {}
 
     def run(self):
+        """
+        Solve → extract assignments {user_id: ap_id | None}.
+        """
+        if self.solver == "networkx":
+            return self._run_networkx()
+        return self._run_ssp()
+
+    def _run_ssp(self):
+        problems = FlowProblem.per_floor(self.users, self.aps, self.weights, self.alpha)
+        floors = list(problems)
+        warm = self.warm_state or {}
+        warms = [warm.get(f) for f in floors]
+
+        try:
+            workers = self._pool_size(len(floors))
+            if workers > 1:
+                results = _get_pool(workers).map(
+                    solve_floor, [problems[f] for f in floors], warms
+                )
+            else:
+                results = map(solve_floor, [problems[f] for f in floors], warms)
+
+            # Merge floors; users on AP-less floors stay unassigned
+            assignments = {u["id"]: None for u in self.users}
+            report = {
+                "incremental": False,
+                "floors": len(floors),
+            }
+            for floor, (floor_assignments, state, stats) in zip(floors, results):
+                assignments.update(floor_assignments)
+                self.state[floor] = state
+                for key, value in stats.items():
+                    report[key] = report.get(key, 0) + value
+            # Only when some floor was actually seeded (not for {} / new floors)
+            report["incremental"] = report.get("warm_floors", 0) > 0
+        except Exception as e:
+            raise RuntimeError(f"MCMF failed: {str(e)}")
+
+        self.report = report
+        return assignments
+
+    def _pool_size(self, n_floors):
+        if len(self.users) < PARALLEL_MIN_USERS or n_floors < 2:
+            return 1
+        workers = self.workers
+        if workers is None:
+            workers = os.cpu_count() or 1
+        return max(1, min(workers, n_floors))
+
+    def _run_networkx(self):
         """
         Build graph → run MCMF → extract assignments.
         """
         # -------------------------------------------------
         # Step 1: Build graph with dynamic AP capacities
         # -------------------------------------------------
-        model = GraphModel(self.users, self.aps)
+        model = GraphModel(self.users, self.aps, self.weights, self.alpha)
         G = model.build_graph()
 
         # -------------------------------------------------
@@ -36,7 +142,7 @@ class MCMFEngine:
         for ap in self.aps:
             aid = ap["id"]
             if G.has_edge(aid, "T"):
-                cap = dynamic_capacity(ap)
+                cap = dynamic_capacity(ap, self.alpha)
                 # dynamic capacity must be int
                 G[aid]["T"]["capacity"] = int(max(1, cap))
 
@@ -25,6 +25,14 @@ class UserPriorityQueue:
         entry = (priority, next(self.counter), user)
         heapq.heappush(self.heap, entry)
 
+    @classmethod
+    def from_items(cls, items):
+        """Queue over (priority, user) pairs, heapified at once (O(n))."""
+        pq = cls()
+        pq.heap = [(priority, next(pq.counter), user) for priority, user in items]
+        heapq.heapify(pq.heap)
+        return pq
+
     def pop(self):
         """Return user with smallest priority score."""
         if not self.heap:
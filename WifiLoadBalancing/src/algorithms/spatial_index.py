@@ -0,0 +1,126 @@
+import math
+
+
+class APGrid:
+    """
+    Uniform grid over AP positions, one grid per floor.
+
+    Cells are `cell_size` px wide (use the band coverage radius), so an
+    "APs within coverage" query only touches the 3×3 block around the
+    query point and a nearest-AP query stops after a ring or two —
+    independent of how many APs the campus has.
+
+    Results always come back in AP list order so callers keep the exact
+    first-wins tie-breaking of the old linear scans.
+    """
+
+    def __init__(self, aps, cell_size):
+        self.aps = aps
+        self.cell = float(cell_size) if cell_size and cell_size > 0 else 1.0
+
+        # floor → {(cx, cy): [ap index, ...]}
+        self.floors = {}
+        # floor → largest coverage_radius on that floor
+        self.max_radius = {}
+        # floor → (min cx, min cy, max cx, max cy) of occupied cells
+        self.extent = {}
+
+        for j, ap in enumerate(aps):
+            x, y = ap.get("x"), ap.get("y")
+            if not (_is_num(x) and _is_num(y)):
+                continue
+            floor = ap.get("floor")
+            key = self.cell_of(x, y)
+            self.floors.setdefault(floor, {}).setdefault(key, []).append(j)
+
+            r = ap.get("coverage_radius", 200)
+            self.max_radius[floor] = max(self.max_radius.get(floor, 0), r)
+
+            lo_x, lo_y, hi_x, hi_y = self.extent.get(floor, (*key, *key))
+            self.extent[floor] = (
+                min(lo_x, key[0]), min(lo_y, key[1]),
+                max(hi_x, key[0]), max(hi_y, key[1]),
+            )
+
+    def cell_of(self, x, y):
+        return math.floor(x / self.cell), math.floor(y / self.cell)
+
+    # ============================================================
+    # Candidate lookup
+    # ============================================================
+    def neighbourhood(self, floor, cx, cy, rings=1):
+        """Sorted AP indices in the (2·rings+1)² block around a cell."""
+        cells = self.floors.get(floor)
+        if not cells:
+            return []
+
+        found = []
+        for dx in range(-rings, rings + 1):
+            for dy in range(-rings, rings + 1):
+                bucket = cells.get((cx + dx, cy + dy))
+                if bucket:
+                    found.extend(bucket)
+        found.sort()
+        return found
+
+    def rings_for(self, r):
+        return max(1, math.ceil(r / self.cell))
+
+    # ============================================================
+    # Queries
+    # ============================================================
+    def within(self, floor, x, y, r):
+        """[(ap index, distance)] for same-floor APs with distance ≤ r."""
+        if not (_is_num(x) and _is_num(y)):
+            return []
+
+        cx, cy = self.cell_of(x, y)
+        out = []
+        for j in self.neighbourhood(floor, cx, cy, self.rings_for(r)):
+            ap = self.aps[j]
+            d = math.dist((x, y), (ap["x"], ap["y"]))
+            if d <= r:
+                out.append((j, d))
+        return out
+
+    def nearest(self, floor, x, y):
+        """Index of the closest same-floor AP (first in list on ties), or -1."""
+        cells = self.floors.get(floor)
+        if not cells or not (_is_num(x) and _is_num(y)):
+            return -1
+
+        cx, cy = self.cell_of(x, y)
+        lo_x, lo_y, hi_x, hi_y = self.extent[floor]
+        max_ring = max(abs(cx - lo_x), abs(cx - hi_x), abs(cy - lo_y), abs(cy - hi_y))
+
+        best = (math.inf, -1)
+        for k in range(max_ring + 1):
+            for key in _ring(cx, cy, k):
+                for j in cells.get(key, ()):
+                    ap = self.aps[j]
+                    cand = (math.dist((x, y), (ap["x"], ap["y"])), j)
+                    if cand < best:
+                        best = cand
+
+            # Anything in ring k+1 or further is more than k·cell away
+            if best[0] <= k * self.cell:
+                break
+
+        return best[1]
+
+
+def _ring(cx, cy, k):
+    """Cells at Chebyshev distance exactly k from (cx, cy)."""
+    if k == 0:
+        yield cx, cy
+        return
+    for dx in range(-k, k + 1):
+        yield cx + dx, cy - k
+        yield cx + dx, cy + k
+    for dy in range(-k + 1, k):
+        yield cx - k, cy + dy
+        yield cx + k, cy + dy
+
+
+def _is_num(v):
+    return isinstance(v, (int, float)) and math.isfinite(v)
@@ -0,0 +1,160 @@
+"""
+MCMF solver benchmark.
+
+    cd WifiLoadBalancing/src
+    python -m benchmarks.bench_mcmf --users 200 2000 5000 --check
+
+Times FlowProblem construction and each solver on a synthetic campus,
+both as one global problem and through MCMFEngine's per-floor split
+(--workers sets its process-pool size).  --check also runs the networkx
+reference (small sizes only) and verifies the assignments are identical.
+--ticks N replays N jittered ticks and compares warm-started (incremental)
+solves against cold ones.  --auction MS runs the anytime auction with that
+budget and reports its optimality gap bound.
+"""
+
+import argparse
+import random
+import time
+
+from algorithms.auction import AuctionEngine
+from algorithms.flow_solver import FlowProblem, SSPSolver
+from algorithms.mcmf import MCMFEngine
+from benchmarks.synthetic import make_campus
+from simulation.rssi_engine import RSSIEngine
+
+TICK_BUDGET_MS = 200
+NETWORKX_CHECK_LIMIT = 2000
+
+
+def prepare(n_users, seed):
+    """Synthetic campus with user_count filled in like update_ap_load does."""
+    aps, users, _ = make_campus(n_users, seed=seed)
+
+    engine = RSSIEngine({"5": 320}, {"5": 22})
+    engine.update_users(users, aps, "5")
+
+    counts = {}
+    for u in users:
+        if u["assigned_ap"]:
+            counts[u["assigned_ap"]] = counts.get(u["assigned_ap"], 0) + 1
+    for ap in aps:
+        ap["user_count"] = counts.get(ap["id"], 0)
+
+    return aps, users
+
+
+def bench(n_users, seed=0, repeat=3, check=False, workers=None, auction_ms=None):
+    aps, users = prepare(n_users, seed)
+
+    best_build = best_solve = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        problem = FlowProblem.from_users(users, aps)
+        t1 = time.perf_counter()
+        solver = SSPSolver(problem)
+        solver.solve()
+        t2 = time.perf_counter()
+        best_build = min(best_build, t1 - t0)
+        best_solve = min(best_solve, t2 - t1)
+
+    best_engine = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        per_floor = MCMFEngine(users, aps, workers=workers).run()
+        best_engine = min(best_engine, time.perf_counter() - t0)
+
+    total_ms = (best_build + best_solve) * 1000
+    row = {
+        "users": n_users,
+        "aps": len(aps),
+        "assigned": sum(1 for a in solver.assign if a >= 0),
+        "augmentations": solver.augmentations,
+        "build_ms": round(best_build * 1000, 2),
+        "solve_ms": round(best_solve * 1000, 2),
+        "total_ms": round(total_ms, 2),
+        "fits_tick": total_ms <= TICK_BUDGET_MS,
+        "per_floor_ms": round(best_engine * 1000, 2),
+    }
+
+    if auction_ms is not None:
+        auction = AuctionEngine(users, aps, time_budget=auction_ms / 1000)
+        auction.run()
+        row["auction"] = auction.report
+
+    if check and n_users <= NETWORKX_CHECK_LIMIT:
+        t0 = time.perf_counter()
+        ref = MCMFEngine(users, aps, solver="networkx").run()
+        row["networkx_ms"] = round((time.perf_counter() - t0) * 1000, 2)
+        row["identical"] = per_floor == ref
+
+    return row
+
+
+def bench_incremental(n_users, ticks, seed=0, jitter=3.0):
+    """Cold vs warm-started MCMFEngine over `ticks` jittered ticks."""
+    aps, users = prepare(n_users, seed)
+    rng = random.Random(seed)
+
+    state = None
+    totals = {"cold_ms": 0.0, "warm_ms": 0.0, "cold_aug": 0, "warm_aug": 0,
+              "cancellations": 0, "identical": True}
+
+    for _ in range(ticks):
+        for u in users:
+            u["x"] += rng.uniform(-jitter, jitter)
+            u["y"] += rng.uniform(-jitter, jitter)
+
+        t0 = time.perf_counter()
+        cold = MCMFEngine(users, aps, workers=1)
+        cold_out = cold.run()
+        t1 = time.perf_counter()
+        warm = MCMFEngine(users, aps, workers=1, warm_state=state or {})
+        warm_out = warm.run()
+        t2 = time.perf_counter()
+
+        state = warm.state
+        totals["cold_ms"] += (t1 - t0) * 1000
+        totals["warm_ms"] += (t2 - t1) * 1000
+        totals["cold_aug"] += cold.report["augmentations"]
+        totals["warm_aug"] += warm.report["augmentations"]
+        totals["cancellations"] += warm.report["cancellations"]
+        totals["identical"] &= cold_out == warm_out
+
+    return {
+        "users": n_users,
+        "ticks": ticks,
+        "cold_ms_per_tick": round(totals["cold_ms"] / ticks, 2),
+        "warm_ms_per_tick": round(totals["warm_ms"] / ticks, 2),
+        "cold_augmentations": totals["cold_aug"],
+        "warm_augmentations": totals["warm_aug"],
+        "warm_cancellations": totals["cancellations"],
+        "identical": totals["identical"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCMF solvers")
+    parser.add_argument("--users", type=int, nargs="+", default=[200, 2000, 5000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="MCMFEngine pool size (default: one per floor)")
+    parser.add_argument("--ticks", type=int, default=0,
+                        help="also benchmark N incremental (warm-start) ticks")
+    parser.add_argument("--auction", type=float, default=None, metavar="MS",
+                        help="also run the anytime auction with this budget")
+    parser.add_argument("--check", action="store_true",
+                        help="compare against networkx (<= %d users)" % NETWORKX_CHECK_LIMIT)
+    args = parser.parse_args()
+
+    for n in args.users:
+        print(bench(n, seed=args.seed, repeat=args.repeat,
+                    check=args.check, workers=args.workers,
+                    auction_ms=args.auction))
+        if args.ticks:
+            print(bench_incremental(n, args.ticks, seed=args.seed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+WifiSimulator.step() scalability benchmark.
+
+    cd WifiLoadBalancing/src
+    python -m benchmarks.bench_step --users 200 2000 20000 100000
+    python -m benchmarks.bench_step --solver mcmf --users 200 2000
+
+Each size runs in a fresh process (so peak RSS is per size) on a synthetic
+campus built from campus_layout.json.  Every tick is timed phase by phase:
+
+    move_users → update_rssi → update_ap_load → apply_<solver>
+    → get_state → JSON encode
+
+One solver per run (--solver greedy | mcmf | auction, default greedy), run
+every tick so its numbers are not mixed with another solver's.  mcmf sizes
+above MCMF_MAX_USERS are skipped; auction uses AUCTION_TIME_BUDGET.
+
+and summarised as ticks/sec, p50/p99 tick latency, per-phase p50/p99/mean
+and peak RSS.  Results are written as JSON (benchmarks/results/ by
+default) so runs can be diffed across commits:
+
+    python -m benchmarks.bench_step --compare old.json new.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.synthetic import make_campus
+from simulation import simulator as sim_module
+from simulation.simulator import WifiSimulator
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_SIZES = [200, 2000, 20000, 100000]
+
+SOLVERS = ["greedy", "mcmf", "auction"]
+
+PHASES = [
+    "move_users",
+    "update_rssi",
+    "update_ap_load",
+    "apply_greedy",
+    "apply_mcmf",
+    "apply_auction",
+    "get_state",
+    "json_encode",
+]
+
+
+# ============================================================
+# One size (runs inside the worker process)
+# ============================================================
+def run_size(n_users, ticks, warmup, seed, solver="greedy"):
+    if solver == "mcmf" and n_users > sim_module.MCMF_MAX_USERS:
+        return {"users": n_users, "solver": solver,
+                "skipped": f"mcmf is capped at MCMF_MAX_USERS={sim_module.MCMF_MAX_USERS}"}
+
+    random.seed(seed)
+    aps, users, floors = make_campus(n_users, seed=seed)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        t0 = time.perf_counter()
+        sim = WifiSimulator(aps=aps, users=users, floors=floors, solver=solver)
+        setup = time.perf_counter() - t0
+
+        apply = getattr(sim, f"apply_{solver}")
+        timings = {name: [] for name in PHASES}
+        totals = []
+
+        for tick in range(warmup + ticks):
+            sample = {}
+
+            def timed(name, fn):
+                start = time.perf_counter()
+                out = fn()
+                sample[name] = time.perf_counter() - start
+                return out
+
+            timed("move_users", sim.move_users)
+            timed("update_rssi", sim.update_rssi)
+            timed("update_ap_load", sim.update_ap_load)
+            timed(f"apply_{solver}", apply)
+            sim.tick += 1
+
+            state = timed("get_state", sim.get_state)
+            timed("json_encode", lambda: json.dumps(state, ensure_ascii=False))
+
+            if tick >= warmup:
+                for name, dt in sample.items():
+                    timings[name].append(dt)
+                totals.append(sum(sample.values()))
+
+    return {
+        "users": n_users,
+        "solver": solver,
+        "aps": len(sim.aps),
+        "ticks": ticks,
+        "setup_ms": round(setup * 1000, 2),
+        "ticks_per_sec": round(len(totals) / sum(totals), 2) if totals else None,
+        "tick_ms": _summary(totals),
+        "phases_ms": {name: _summary(v) for name, v in timings.items() if v},
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def _summary(samples):
+    ms = np.asarray(samples) * 1000
+    return {
+        "p50": round(float(np.percentile(ms, 50)), 3),
+        "p99": round(float(np.percentile(ms, 99)), 3),
+        "mean": round(float(ms.mean()), 3),
+        "max": round(float(ms.max()), 3),
+        "n": int(ms.size),
+    }
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# ============================================================
+# Driver
+# ============================================================
+def run_isolated(n_users, args):
+    """Run one size in a fresh interpreter and return its result dict."""
+    cmd = [
+        sys.executable, "-m", "benchmarks.bench_step", "--worker",
+        "--users", str(n_users), "--ticks", str(args.ticks),
+        "--warmup", str(args.warmup), "--seed", str(args.seed),
+        "--solver", args.solver,
+    ]
+    cwd = Path(__file__).resolve().parents[1]
+    out = subprocess.run(cmd, cwd=cwd, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).parent,
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "mcmf_solver": sim_module.MCMF_SOLVER,
+    }
+
+
+def print_result(r):
+    if "skipped" in r:
+        print(f"\n{r['users']:>7} users  skipped ({r['skipped']})")
+        return
+    tick = r["tick_ms"]
+    print(f"\n{r['users']:>7} users  {r['aps']} APs   "
+          f"{r['ticks_per_sec']} ticks/s   tick p50 {tick['p50']:.1f} ms  "
+          f"p99 {tick['p99']:.1f} ms   peak RSS {r['peak_rss_mb']} MB")
+    for name in PHASES:
+        p = r["phases_ms"].get(name)
+        if p:
+            print(f"    {name:<15} p50 {p['p50']:>9.2f}  p99 {p['p99']:>9.2f}  "
+                  f"mean {p['mean']:>9.2f} ms  (n={p['n']})")
+
+
+def compare(old_path, new_path):
+    """Print new/old ratios for matching user counts."""
+    old = {r["users"]: r for r in json.loads(Path(old_path).read_text())["results"]}
+    new = json.loads(Path(new_path).read_text())
+
+    for r in new["results"]:
+        base = old.get(r["users"])
+        if not base or "skipped" in base or "skipped" in r:
+            continue
+        print(f"\n{r['users']:>7} users   tick p50 {_ratio(base['tick_ms'], r['tick_ms'])}"
+              f"   peak RSS {base['peak_rss_mb']} → {r['peak_rss_mb']} MB")
+        for name in PHASES:
+            a, b = base["phases_ms"].get(name), r["phases_ms"].get(name)
+            if a and b:
+                print(f"    {name:<15} {_ratio(a, b)}")
+
+
+def _ratio(a, b):
+    x = b["p50"] / a["p50"] if a["p50"] else float("inf")
+    return f"{a['p50']:.2f} → {b['p50']:.2f} ms  (×{x:.2f})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark WifiSimulator.step() phases")
+    parser.add_argument("--users", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--solver", choices=SOLVERS, default="greedy",
+                        help="load-balancing solver timed every tick (one per run)")
+    parser.add_argument("--out", type=Path, default=None,
+                        help="results file (default: benchmarks/results/step-<commit>-<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="compare two result files instead of running")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    if args.worker:
+        result = run_size(args.users[0], args.ticks, args.warmup, args.seed,
+                          solver=args.solver)
+        print(json.dumps(result))
+        return
+
+    env = environment()
+    results = []
+    for n in args.users:
+        result = run_isolated(n, args)
+        print_result(result)
+        results.append(result)
+
+    out = args.out
+    if out is None:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        out = RESULTS_DIR / f"step-{env['commit'] or 'nogit'}-{stamp}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps({"env": env, "args": vars(args) | {"out": str(out)},
+                               "results": results}, indent=2))
+    print(f"\n📁 Results → {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Synthetic campuses for benchmarking.
+
+Users are scattered uniformly through the rooms of campus_layout.json;
+APs come from the layout itself, optionally densified with a regular grid
+so spatial / per-floor code paths can be stressed too.
+"""
+
+import json
+import random
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+ROOT_DIR = SRC_DIR.parent
+LAYOUT_PATH = ROOT_DIR / "frontend" / "data" / "campus_layout.json"
+
+
+def load_layout():
+    with open(LAYOUT_PATH, "r") as f:
+        return json.load(f)["floors"]
+
+
+def make_aps(floors, rng, band="5", ap_spacing=None):
+    """Layout APs, plus a grid every `ap_spacing` px if requested."""
+    aps = []
+
+    for floor in floors:
+        level = floor["level"]
+        points = [(ap["id"], ap["x"], ap["y"]) for ap in floor.get("aps", [])]
+
+        if ap_spacing:
+            rooms = floor["rooms"]
+            x1 = min(r["x"] for r in rooms)
+            y1 = min(r["y"] for r in rooms)
+            x2 = max(r["x"] + r["width"] for r in rooms)
+            y2 = max(r["y"] + r["height"] for r in rooms)
+
+            k = 0
+            y = y1 + ap_spacing / 2
+            while y < y2:
+                x = x1 + ap_spacing / 2
+                while x < x2:
+                    points.append((f"AP_{level}G{k}", x, y))
+                    k += 1
+                    x += ap_spacing
+                y += ap_spacing
+
+        for ap_id, x, y in points:
+            aps.append({
+                "id": ap_id,
+                "floor": level,
+                "room": "Corridor",
+                "x": x,
+                "y": y,
+                "band": band,
+                "channel": 36,
+                "interference_score": round(rng.uniform(0, 1), 2),
+                "airtime_capacity": rng.randint(90, 140),
+                "max_clients": 30,
+                "coverage_radius": 200,
+                "client_count": 0,
+                "load": 0,
+            })
+
+    return aps
+
+
+def make_users(floors, n_users, rng):
+    """n_users spread over floors/rooms, weighted by room area."""
+    rooms = [(f["level"], r) for f in floors for r in f["rooms"]]
+    weights = [r["width"] * r["height"] for _, r in rooms]
+
+    users = []
+    for i, (level, room) in enumerate(rng.choices(rooms, weights=weights, k=n_users)):
+        users.append({
+            "id": f"User_{i + 1}",
+            "floor": level,
+            "room": room["name"],
+            "x": room["x"] + 6 + rng.random() * max(0, room["width"] - 12),
+            "y": room["y"] + 6 + rng.random() * max(0, room["height"] - 12),
+            "connected_ap": None,
+            "assigned_ap": None,
+            "airtime_usage": rng.randint(1, 5),
+            "RSSI": -95,
+        })
+
+    return users
+
+
+def make_campus(n_users, seed=0, ap_spacing=None, band="5"):
+    """Return (aps, users, floors) for a reproducible synthetic campus."""
+    rng = random.Random(seed)
+    floors = load_layout()
+    aps = make_aps(floors, rng, band=band, ap_spacing=ap_spacing)
+    users = make_users(floors, n_users, rng)
+    return aps, users, floors
@@ -1,12 +1,25 @@
 import asyncio
 import json
+import os
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-
+from fastapi.responses import FileResponse, JSONResponse, Response
+
+from observability.metrics import CONTENT_TYPE, Registry, render
+from observability.profiler import PROFILE_DIR, TickProfiler, check_request
+from observability.tick_metrics import TickMetrics
+from simulation import commands
+from simulation.replay import CommandLog
+from simulation.scheduler import FixedRate
 from simulation.simulator import WifiSimulator
+from simulation.worker import SimProcess
+from streaming import binary
+from streaming.delta import DeltaEncoder
+from streaming.floors import FloorViews, view_key
+from streaming.sender import BINARY, DELTA, FULL, Connection
+from streaming.snapshot import SnapshotCache
 from pathlib import Path
 from fastapi import Request
 
@@ -14,77 +27,267 @@ from fastapi import Request
 # GLOBAL STATE
 # ============================================================
 sim: WifiSimulator = None
-websockets: set[WebSocket] = set()
+worker: SimProcess | None = None     # SIM_MODE=process: simulator lives there
+connections: dict[WebSocket, Connection] = {}   # one sender task + queue each
+stream = DeltaEncoder()
+floor_views = FloorViews(stream)   # floor / field subscriptions, fragments encoded once
+bin_stream = binary.BinaryEncoder()
+snapshots = SnapshotCache()   # per-tick state, encoded once (/state + full-mode /ws)
 sim_task: asyncio.Task | None = None
+broadcast_task: asyncio.Task | None = None
 sim_running: bool = False
+sim_lock = asyncio.Lock()     # step() vs. state export never overlap
+recorder: CommandLog | None = None   # RECORD=path (SIM_MODE=thread; the worker keeps its own)
+pending_commands: list = []   # (name, args) queued for the next tick (SIM_MODE=thread)
+COMMAND_QUEUE_LIMIT = 50_000
 
+# ============================================================
+# METRICS (/metrics)
+# ============================================================
+registry = Registry()
+tick_metrics: TickMetrics | None = None   # sim side; in the worker when SIM_MODE=process
+broadcast_seconds = registry.histogram(
+    "wifi_broadcast_seconds", "Fan-out of one tick's frames to the socket queues")
+ws_gauge = registry.gauge("wifi_websockets", "Open WebSocket connections")
+ws_dropped = registry.gauge("wifi_ws_dropped_frames", "Frames dropped by open sockets' latest-wins queues")
+profiler = TickProfiler()   # POST /debug/profile
+overruns = registry.counter("wifi_scheduler_overruns_total", "Late wake-ups", labels=("loop",))
+skipped = registry.counter("wifi_scheduler_skipped_ticks_total", "Ticks dropped", labels=("loop",))
+commands_queued = registry.counter("wifi_commands_queued_total", "Control commands accepted by the API")
 
 # ============================================================
-# CLEAN & FAST BROADCAST
+# TICK RATES (env overridable)
 # ============================================================
-async def broadcast(payload: str):
-    if not websockets:
-        return
-    
-    dead = []
-    coros = []
+SIM_HZ = float(os.environ.get("SIM_HZ", 5))               # physics / balancing steps per second
+BROADCAST_HZ = float(os.environ.get("BROADCAST_HZ", 5))   # state frames per second
+OVERRUN_POLICY = os.environ.get("OVERRUN_POLICY", "drop")  # "drop" | "catch_up" (simulation only)
+SIM_MODE = os.environ.get("SIM_MODE", "thread")            # "thread" | "process" (own GIL)
+SIM_SEED = int(os.environ["SIM_SEED"]) if os.environ.get("SIM_SEED") else None   # reproducible run
+RECORD = os.environ.get("RECORD")                          # command log path (simulation.replay)
+sim_rate = FixedRate("simulation", SIM_HZ, OVERRUN_POLICY)
+broadcast_rate = FixedRate("broadcast", BROADCAST_HZ, "drop")   # stale frames are useless
 
-    for ws in websockets:
-        coros.append(_safe_send(ws, payload, dead))
 
-    await asyncio.gather(*coros, return_exceptions=True)
+# ============================================================
+# CLEAN & FAST BROADCAST
+# ============================================================
+def broadcast(frames: dict):
+    """
+    frames: "patch" / "keyframe" / "full" (text) and "bin_table" (text) +
+    "bin" (bytes).  Each connection gets what its protocol and sync state
+    need, queued on its own sender — this never waits on a socket.
+    """
+    for conn in list(connections.values()):
+        if conn.closed:
+            continue
+        payloads, carries_table = _frames_for(conn, frames)
+        conn.offer(payloads, carries_table)
+
+
+def _frames_for(conn: Connection, frames: dict):
+    if conn.view is not None and conn.mode != BINARY:
+        return _view_frames_for(conn, frames.get("views", {}).get(conn.view)), False
+
+    if conn.mode == BINARY:
+        if "bin" not in frames:
+            return [], False
+        out = []
+        carries_table = conn.table_version != frames["bin_version"]
+        if carries_table:
+            out.append(frames["bin_table"])
+            conn.table_version = frames["bin_version"]
+        out.append(frames["bin"])
+        if frames.get("alarms"):
+            out.append(frames["alarms"])
+        return out, carries_table
+
+    if conn.mode == FULL:
+        return [frames["full"]], False
+
+    if conn.needs_keyframe:
+        if "keyframe" not in frames:
+            return [], False        # worker sends one next bundle
+        conn.needs_keyframe = False
+        return [frames["keyframe"]], False
+
+    return [frames["patch"]], False
+
+
+def _view_frames_for(conn: Connection, view):
+    if not view:
+        return []               # subscription not built yet (next tick)
+    if conn.mode == FULL:
+        return [view["full"]] if "full" in view else []
+    if conn.needs_keyframe:
+        if "keyframe" not in view:
+            return []
+        conn.needs_keyframe = False
+        return [view["keyframe"]]
+    return [view["patch"]]
+
+
+def _views_needed():
+    """{view key: {"patch": bool, "full": bool}} over subscribed sockets."""
+    views = {}
+    for conn in connections.values():
+        if conn.view is None or conn.mode == BINARY:
+            continue
+        needs = views.setdefault(conn.view, {"patch": False, "full": False})
+        needs["full" if conn.mode == FULL else "patch"] = True
+    return views
 
-    for ws in dead:
-        websockets.discard(ws)
-        print("🔌 WS removed; total =", len(websockets))
 
+def _needs_keyframe(subscribed):
+    return any(c.needs_keyframe and (c.view is not None) == subscribed
+               for c in connections.values())
 
-async def _safe_send(ws: WebSocket, payload: str, dead_list: list):
-    try:
-        await ws.send_text(payload)
-    except:
-        dead_list.append(ws)
+
+def _on_close(conn: Connection):
+    if connections.get(conn.ws) is conn:
+        del connections[conn.ws]
+        print("🔌 WS removed; total =", len(connections))
 
 
 # ============================================================
-# BACKGROUND SIMULATION LOOP
+# BACKGROUND SIMULATION LOOP (SIM_HZ)
 # ============================================================
 async def simulator_loop():
-    global sim_running
-
     print("SIM LOOP STARTED")
     sim.ready = False
     loop = asyncio.get_running_loop()
 
     while sim_running:
-        # STEP 1: sim tick off main loop
+        ticks = await sim_rate.due()
+
+        # sim tick(s) off main loop; queued commands land first, as one batch
         try:
-            await loop.run_in_executor(None, sim.step)
+            for i in range(ticks):
+                async with sim_lock:
+                    if pending_commands:
+                        await loop.run_in_executor(None, _apply_pending)
+                    # Slack until the next deadline, shared by catch-up ticks
+                    budget = sim_rate.remaining() / (ticks - i)
+                    await loop.run_in_executor(None, profiler.call, sim.step, budget)
+                    tick_metrics.record_step(sim)
+                    profiler.step_done()
         except Exception as e:
             print("🔥 Simulator step error:", e)
             await asyncio.sleep(0.5)
             continue
 
-        # STEP 2: serialize safely
-        try:
-            state = sim.get_state()
-            payload = {"type": "state", "data": state}
+    print("SIM LOOP STOPPED")
 
-            state_json = await loop.run_in_executor(
-                None, lambda: json.dumps(payload, ensure_ascii=False)
-            )
+
+def _apply_pending():
+    batch = pending_commands[:]
+    del pending_commands[:len(batch)]
+    errors = commands.apply_batch(sim, batch, recorder)
+    tick_metrics.record_commands(len(batch), errors)
+    for name, error in errors:
+        print(f"🔥 Command {name} failed:", error)
+
+
+# ============================================================
+# BROADCAST LOOP (BROADCAST_HZ)
+# ============================================================
+async def broadcast_loop():
+    last_tick = None
+
+    while sim_running:
+        await broadcast_rate.due()
+
+        # STEP 1: serialize safely (delta stream + keyframes on demand,
+        #         binary frames only when a "wifi-bin.v1" socket is open)
+        try:
+            if worker is not None:
+                frames = _worker_frames()
+            elif sim.tick == last_tick:
+                frames = None   # nothing new (broadcast faster than sim)
+            else:
+                last_tick = sim.tick
+                frames = await _local_frames()
         except Exception as e:
             print("🔥 Serialization error:", e)
             await asyncio.sleep(1)
             continue
 
-        # STEP 3: broadcast
-        await broadcast(state_json)
+        # STEP 2: broadcast (queue per connection, no awaiting sockets)
+        if frames:
+            profiler.call(broadcast_seconds.time, broadcast, frames)
+        profiler.cycle_done()
 
-        # ⭐ BEST FIX ⭐
-        await asyncio.sleep(0.2)   # <-- make this lighter
 
-    print("SIM LOOP STOPPED")
+async def _local_frames():
+    loop = asyncio.get_running_loop()
+    encode = tick_metrics.encode
+
+    def run(fn, *args):
+        return loop.run_in_executor(None, profiler.call, fn, *args)
+
+    async with sim_lock:
+        tick = sim.tick
+        state = await run(tick_metrics.get_state.time, sim.get_state)
+        # Column-driven diff: reads the live tables, so it runs under the lock
+        patch = await run(encode["patch"].time, stream.update_sim, sim)
+        bin_frames = None
+        if any(c.mode == BINARY for c in connections.values()):
+            bin_frames = await run(encode["binary"].time, bin_stream.encode, sim)
+
+    snap = await run(encode["snapshot"].time, snapshots.publish, state, tick)
+
+    frames = {"full": snap.ws_text, "patch": patch}
+
+    if stream.keyframe_due():
+        _keyframe_all()
+
+    if _needs_keyframe(subscribed=False):
+        frames["keyframe"] = await run(encode["keyframe"].time, stream.keyframe)
+
+    views = _views_needed()
+    if views:
+        frames["views"] = await run(
+            encode["views"].time, floor_views.build, views, _needs_keyframe(subscribed=True)
+        )
+
+    if bin_frames:
+        frames["bin_table"], frames["bin"] = bin_frames
+        frames["bin_version"] = bin_stream.table_version
+        if state["alarms"]:
+            frames["alarms"] = json.dumps(
+                {"type": "alarms", "data": state["alarms"]}, ensure_ascii=False
+            )
+    return frames
+
+
+def _worker_frames():
+    """Frames from the worker's newest bundle (already encoded there)."""
+    worker.set_views(_views_needed())
+    bundle = worker.poll(
+        want_keyframe=_needs_keyframe(subscribed=False),
+        want_binary=any(c.mode == BINARY for c in connections.values()),
+        want_view_keyframe=_needs_keyframe(subscribed=True),
+    )
+    if bundle is None:
+        return None
+
+    snap = snapshots.adopt(bundle.tick, bundle.snap_seq, bundle["state"],
+                           {enc: bundle[enc] for enc in ("gzip", "br") if enc in bundle})
+
+    frames = {"full": snap.ws_text, "patch": bundle["patch"]}
+    if bundle.keyframe_due:
+        _keyframe_all()
+    for name in ("keyframe", "bin_table", "bin", "alarms"):
+        if name in bundle:
+            frames[name] = bundle[name]
+    if "views" in bundle:
+        frames["views"] = json.loads(bundle["views"])
+    frames["bin_version"] = bundle.bin_version
+    return frames
+
+
+def _keyframe_all():
+    for conn in connections.values():
+        conn.needs_keyframe = conn.mode == DELTA
 
 
 # ============================================================
@@ -92,21 +295,32 @@ async def simulator_loop():
 # ============================================================
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    global sim, sim_task, sim_running
+    global sim, worker, tick_metrics, sim_task, broadcast_task, sim_running, recorder
 
     print("\n=== BACKEND STARTING ===")
 
-    sim = WifiSimulator()
-    sim.ready = False
-
     sim_running = True
-    sim_task = asyncio.create_task(simulator_loop())
-
-    await asyncio.sleep(0.5)
-    sim.ready = True
-
-    print("READY ✓")
-    print(f"APs: {len(sim.aps)}, Users: {len(sim.clients)}")
+    if SIM_MODE == "process":
+        worker = SimProcess(SIM_HZ, BROADCAST_HZ, OVERRUN_POLICY,
+                            seed=SIM_SEED, record=RECORD).start()
+        broadcast_task = asyncio.create_task(broadcast_loop())
+        print(f"READY ✓ (simulator in worker process, pid {worker.process.pid})")
+    else:
+        sim = WifiSimulator(seed=SIM_SEED)
+        sim.ready = False
+        if RECORD:
+            recorder = CommandLog(RECORD, SIM_SEED)
+            print(f"⏺️ Recording commands → {RECORD}")
+        tick_metrics = TickMetrics(registry)
+
+        sim_task = asyncio.create_task(simulator_loop())
+        broadcast_task = asyncio.create_task(broadcast_loop())
+
+        await asyncio.sleep(0.5)
+        sim.ready = True
+
+        print("READY ✓")
+        print(f"APs: {len(sim.aps)}, Users: {len(sim.clients)}")
     print("========================\n")
 
     yield
@@ -115,20 +329,27 @@ async def lifespan(app: FastAPI):
     print("\n=== BACKEND SHUTTING DOWN ===")
     sim_running = False
 
-    if sim_task:
-        sim_task.cancel()
-        try:
-            await sim_task
-        except:
-            pass
-
-    for ws in list(websockets):
+    for task in (sim_task, broadcast_task):
+        if task:
+            task.cancel()
+            try:
+                await task
+            except:
+                pass
+
+    if worker is not None:
+        await asyncio.get_running_loop().run_in_executor(None, worker.stop)
+    if recorder is not None:
+        recorder.close(sim.tick)
+
+    for ws, conn in list(connections.items()):
+        await conn.close()
         try:
             await ws.close()
         except:
             pass
 
-    websockets.clear()
+    connections.clear()
 
     print("CLEAN SHUTDOWN ✓")
     print("========================\n")
@@ -165,29 +386,163 @@ async def root():
     return {"status": "online", "service": "wifi-simulator"}
 
 
+def _ready():
+    if worker is not None:
+        return worker.ready
+    return sim is not None and sim.ready
+
+
 @app.get("/status")
 async def get_status():
+    if worker is not None:
+        if not worker.ready:
+            return {"status": "initializing", "worker": worker.stats()}
+        status = worker.status
+        return {
+            "status": "running" if sim_running else "stopped",
+            "ready": True,
+            "mode": "process",
+            "aps": status["aps"],
+            "clients": status["clients"],
+            "websockets": len(connections),
+            "tick": worker.tick,
+            "mcmf": status["mcmf"],
+            "auction": status["auction"],
+            "stream": status["stream"],
+            "views": status["views"],
+            "binary": status["binary"],
+            "snapshot": snapshots.stats(),
+            "connections": [c.stats() for c in connections.values()],
+            "scheduler": {
+                "simulation": status["simulation"],
+                "broadcast": broadcast_rate.stats(),
+            },
+            "worker": worker.stats(),
+        }
+
     if not sim:
         return {"status": "initializing"}
 
     return {
         "status": "running" if sim_running else "stopped",
         "ready": sim.ready,
+        "mode": "thread",
         "aps": len(sim.aps),
         "clients": len(sim.clients),
-        "websockets": len(websockets),
+        "websockets": len(connections),
         "tick": sim.tick,
+        "mcmf": sim.mcmf_report,
+        "auction": sim.auction_report,
+        "stream": stream.stats(),
+        "views": floor_views.stats(),
+        "binary": bin_stream.stats(),
+        "snapshot": snapshots.stats(),
+        "commands": {"pending": len(pending_commands)},
+        "connections": [c.stats() for c in connections.values()],
+        "scheduler": {
+            "simulation": sim_rate.stats(),
+            "broadcast": broadcast_rate.stats(),
+        },
     }
 
 
 @app.get("/state")
-async def get_state():
-    if not sim.ready:
+async def get_state(request: Request):
+    # Served from the tick snapshot: no get_state() on the event loop,
+    # no reads of a simulator the executor may be mutating
+    snap = snapshots.current
+    if not _ready() or snap is None:
         return JSONResponse(
             status_code=503,
             content={"error": "Simulator not ready"}
         )
-    return sim.get_state()
+
+    encoding = snap.negotiate(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": snap.etag_for(encoding),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+        "X-Sim-Tick": str(snap.tick),
+    }
+
+    if snap.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return Response(snap.variants[encoding], media_type="application/json", headers=headers)
+    return Response(snap.body, media_type="application/json", headers=headers)
+
+
+@app.get("/metrics")
+async def metrics():
+    ws_gauge.set(len(connections))
+    ws_dropped.set(sum(c.dropped for c in connections.values()))
+    loops = {
+        "simulation": worker.status.get("simulation", {}) if worker else sim_rate.stats(),
+        "broadcast": broadcast_rate.stats(),
+    }
+    for name, stats in loops.items():
+        overruns.labels(name).set(stats.get("overruns", 0))
+        skipped.labels(name).set(stats.get("skipped", 0))
+
+    families = registry.snapshot()
+    if worker is not None:
+        families += worker.status.get("metrics", [])
+    return Response(render(families), media_type=CONTENT_TYPE)
+
+
+# ============================================================
+# PROFILING
+# ============================================================
+@app.post("/debug/profile")
+async def debug_profile(ticks: int = 20, mode: str = "cprofile"):
+    """
+    Profile the next `ticks` step → serialize → broadcast cycles and
+    answer once they're done.  mode=cprofile → .pstats, mode=sample →
+    collapsed stacks; download with GET /debug/profile/{file}.
+    """
+    try:
+        check_request(ticks, mode)
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    rate = worker.config["sim_hz"] if worker is not None else SIM_HZ
+    deadline = asyncio.get_running_loop().time() + 10 + 2 * ticks / rate
+
+    if worker is not None:
+        # profiled inside the worker (step + publish); API fan-out not included
+        if worker.profiling:
+            return JSONResponse(status_code=409, content={"error": "a profile is already running"})
+        worker.request_profile(ticks, mode)
+        while worker.profile_result is None:
+            if asyncio.get_running_loop().time() > deadline:
+                return JSONResponse(status_code=504, content={"error": "worker profile timed out"})
+            await asyncio.sleep(0.05)
+        result = worker.profile_result
+    else:
+        try:
+            job = profiler.start(ticks, mode)
+        except RuntimeError as e:
+            return JSONResponse(status_code=409, content={"error": str(e)})
+        while not job.done.is_set():
+            if asyncio.get_running_loop().time() > deadline:
+                profiler.finish()       # write what we have
+                break
+            await asyncio.sleep(0.05)
+        result = job.result
+
+    if "error" in result:
+        return JSONResponse(status_code=500, content=result)
+    return result
+
+
+@app.get("/debug/profile/{name}")
+async def download_profile(name: str):
+    path = PROFILE_DIR / name
+    if "/" in name or "\\" in name or not path.is_file():
+        return JSONResponse(status_code=404, content={"error": "no such profile"})
+    return FileResponse(path, filename=name)
 
 
 # ============================================================
@@ -195,56 +550,167 @@ async def get_state():
 # ============================================================
 @app.websocket("/ws")
 async def websocket_endpoint(ws: WebSocket):
-    await ws.accept()
-    websockets.add(ws)
-    print("WS CONNECTED, total =", len(websockets))
+    if binary.PROTOCOL in ws.scope.get("subprotocols", []):
+        await ws.accept(subprotocol=binary.PROTOCOL)
+        mode = BINARY
+    else:
+        await ws.accept()
+        mode = FULL if ws.query_params.get("mode") == "full" else DELTA
+
+    conn = Connection(ws, mode, on_close=_on_close)
+    if mode != BINARY:
+        # /ws?floors=1,3&fields=x,y,load  (same as a "subscribe" message)
+        _subscribe(conn, {
+            "floors": _csv(ws.query_params.get("floors")),
+            "fields": _csv(ws.query_params.get("fields")),
+        })
+    conn.start()
+    connections[ws] = conn
+    print("WS CONNECTED, total =", len(connections))
 
     try:
         while True:
-            # read ping/keepalive so buffer doesn't fill
-            await ws.receive_text()
+            # read ping/keepalive so buffer doesn't fill;
+            # {"type": "resync"} → next frame is a keyframe / id table
+            # {"type": "subscribe", "floors": [3], "fields": [...]} → only
+            #   those floors (and fields); null / missing = everything
+            msg = await ws.receive_text()
+            if '"subscribe"' in msg and conn.mode != BINARY:
+                try:
+                    _subscribe(conn, json.loads(msg))
+                except (ValueError, AttributeError):
+                    pass
+            elif '"resync"' in msg:
+                conn.needs_keyframe = conn.mode == DELTA
+                conn.table_version = 0
     except WebSocketDisconnect:
         pass
     except:
         pass
     finally:
-        websockets.discard(ws)
-        print("WS DISCONNECTED, total =", len(websockets))
+        connections.pop(ws, None)
+        await conn.close()
+        print("WS DISCONNECTED, total =", len(connections))
+
+
+def _subscribe(conn: Connection, data: dict):
+    floors, fields = data.get("floors"), data.get("fields")
+    try:
+        floors = None if floors is None else [int(f) for f in floors]
+        fields = None if fields is None else [str(f) for f in fields]
+    except (TypeError, ValueError):
+        return
+    conn.view = None if floors is None and fields is None else view_key(floors, fields)
+    conn.needs_keyframe = conn.mode == DELTA
+
+
+def _csv(value):
+    return None if value is None else [v for v in value.split(",") if v]
 
 
 # ============================================================
 # USER MANAGEMENT
 # ============================================================
+async def submit(name, **args):
+    """Queue one simulator command for the next tick (here or in the worker)."""
+    enqueue([(name, commands.check(name, args))])
+
+
+def enqueue(batch):
+    """
+    Queue [(name, args), ...]; they are applied together right before the
+    next step().  CommandQueueFull (→ 429) when the thread-mode queue is full.
+    """
+    if worker is not None:
+        worker.submit_batch(batch)
+    else:
+        if len(pending_commands) + len(batch) > COMMAND_QUEUE_LIMIT:
+            raise CommandQueueFull()
+        pending_commands.extend(batch)
+    commands_queued.inc(len(batch))
+
+
+class CommandQueueFull(Exception):
+    pass
+
+
+@app.exception_handler(CommandQueueFull)
+async def command_queue_full(request: Request, exc: CommandQueueFull):
+    return JSONResponse(status_code=429, content={"error": "command queue full, retry after the next tick"})
+
+
+@app.exception_handler(commands.CommandError)
+async def command_error(request: Request, exc: commands.CommandError):
+    return JSONResponse(status_code=400, content={"error": str(exc)})
+
+
+@app.post("/commands")
+async def post_commands(request: Request):
+    """
+    Many commands in one request, applied in order at the next tick:
+
+        [{"cmd": "add_user", "floor": 2, "count": 50},
+         {"cmd": "set_band", "band": "5"}, ...]
+
+    (or {"commands": [...]}).  The whole request is rejected with 400 if
+    any entry is invalid.
+    """
+    try:
+        data = await request.json()
+    except ValueError:
+        return JSONResponse(status_code=400, content={"error": "body must be JSON"})
+    if isinstance(data, dict):
+        data = data.get("commands")
+    if not isinstance(data, list):
+        return JSONResponse(status_code=400, content={"error": "expected a list of commands"})
+    if len(data) > COMMAND_QUEUE_LIMIT:
+        return JSONResponse(status_code=413,
+                            content={"error": f"at most {COMMAND_QUEUE_LIMIT} commands per request"})
+
+    batch = []
+    for i, entry in enumerate(data):
+        if not isinstance(entry, dict):
+            return JSONResponse(status_code=400, content={"error": f"commands[{i}]: expected an object"})
+        args = dict(entry)
+        name = args.pop("cmd", None)
+        try:
+            batch.append((name, commands.check(name, args)))
+        except commands.CommandError as e:
+            return JSONResponse(status_code=400, content={"error": f"commands[{i}]: {e}"})
+
+    enqueue(batch)
+    return {"status": "queued", "accepted": len(batch)}
+
+
 @app.post("/floor/{floor}/add_user")
 async def add_user(floor: int):
-    sim.add_user_to_floor(floor)
+    await submit("add_user", floor=floor)
     return {"status": "ok", "floor": floor}
 
 
 @app.post("/floor/{floor}/remove_user")
 async def remove_user(floor: int):
-    sim.remove_user_from_floor(floor)
+    await submit("remove_user", floor=floor)
     return {"status": "ok", "floor": floor}
 
 @app.post("/apkiller/deploy")
 async def deploy_apkiller():
-    sim.ap_killer.deploy()
+    await submit("apkiller_deploy")
     return {"status": "deployed"}
 
 @app.post("/apkiller/withdraw")
 async def withdraw_apkiller():
-    sim.ap_killer.withdraw()
+    await submit("apkiller_withdraw")
     return {"status": "removed"}
 
 @app.post("/apkiller/floor/{level}")
 async def move_apkiller(level: int):
-    sim.ap_killer.set_floor(level)
+    await submit("apkiller_floor", level=level)
     return {"status": "moved", "floor": level}
 
 @app.post("/apkiller/move")
 async def move_apkiller(data: dict):
-    sim.ap_killer.vx = data.get("vx", 0) * 6
-    sim.ap_killer.vy = data.get("vy", 0) * 6
+    await submit("apkiller_move", vx=data.get("vx", 0), vy=data.get("vy", 0))
     return {"status": "ok"}
 
 @app.post("/setband")
@@ -252,13 +718,8 @@ async def setband(request: Request):
     data = await request.json()
     band = data["band"]
 
-    # Set global band
-    sim.current_band = band
-
-    # 🔥 FORCE band into every AP
-    for ap in sim.aps:
-        ap["band"] = band
-        ap["coverage_radius"] = sim.band_coverage[band]
+    # Set global band + 🔥 FORCE band into every AP (drops the AP index)
+    await submit("set_band", band=band)
 
     return {"status": "ok", "band": band}
 
@@ -0,0 +1,217 @@
+"""
+Tiny in-process metrics registry with Prometheus text output.
+
+    registry = Registry()
+    ticks = registry.counter("wifi_ticks_total", "Simulation steps")
+    phase = registry.histogram("wifi_step_phase_seconds", "step() phases", labels=("phase",))
+
+    ticks.inc()
+    phase.labels("move_users").observe(0.0021)
+
+    render(registry.snapshot())   # → text/plain; version=0.0.4
+
+Recording is a few integer / float updates (histograms bisect into fixed
+buckets) — no locks, no allocation — so it's fine on the tick path.
+snapshot() is plain JSON, which is how the worker process ships its
+metrics to the API process.
+"""
+
+from bisect import bisect_left
+from time import perf_counter
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds: 0.5 ms … 2.5 s
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _Family:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children = {}
+        if not self.label_names:
+            self._default = self._children[()] = self._new()
+
+    def labels(self, *values):
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new()
+        return child
+
+    def _new(self):
+        raise NotImplementedError
+
+    def snapshot(self):
+        return {
+            "name": self.name,
+            "help": self.help,
+            "type": self.kind,
+            "labels": list(self.label_names),
+            "series": [[list(k), c.value()] for k, c in self._children.items()],
+        }
+
+
+class _Value:
+    __slots__ = ("v",)
+
+    def __init__(self):
+        self.v = 0.0
+
+    def inc(self, n=1):
+        self.v += n
+
+    def set(self, v):
+        self.v = v
+
+    def value(self):
+        return self.v
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)     # last = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v):
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.sum += v
+        self.count += 1
+
+    def time(self, fn, *args):
+        """fn(*args), observing how long it took."""
+        start = perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self.observe(perf_counter() - start)
+
+    def value(self):
+        return {"counts": self.counts, "sum": self.sum, "count": self.count}
+
+
+class Counter(_Family):
+    kind = "counter"
+
+    def _new(self):
+        return _Value()
+
+    def inc(self, n=1):
+        self._default.v += n
+
+
+class Gauge(_Family):
+    kind = "gauge"
+
+    def _new(self):
+        return _Value()
+
+    def set(self, v):
+        self._default.v = v
+
+    def inc(self, n=1):
+        self._default.v += n
+
+
+class Histogram(_Family):
+    kind = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=TIME_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def _new(self):
+        return _Buckets(self.buckets)
+
+    def observe(self, v):
+        self._default.observe(v)
+
+    def time(self, fn, *args):
+        return self._default.time(fn, *args)
+
+    def snapshot(self):
+        snap = super().snapshot()
+        snap["buckets"] = list(self.buckets)
+        return snap
+
+
+class Registry:
+    def __init__(self):
+        self._families = {}
+
+    def counter(self, name, help, labels=()):
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self._register(Gauge(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=TIME_BUCKETS):
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def _register(self, family):
+        existing = self._families.get(family.name)
+        if existing is not None:
+            if existing.kind != family.kind:
+                raise ValueError(f"metric {family.name} already registered as {existing.kind}")
+            return existing
+        self._families[family.name] = family
+        return family
+
+    def snapshot(self):
+        return [f.snapshot() for f in self._families.values()]
+
+
+# ============================================================
+# Prometheus text exposition
+# ============================================================
+def render(families):
+    lines = []
+    for fam in families:
+        name = fam["name"]
+        lines.append(f"# HELP {name} {_escape_help(fam['help'])}")
+        lines.append(f"# TYPE {name} {fam['type']}")
+        label_names = fam["labels"]
+
+        for values, value in fam["series"]:
+            labels = list(zip(label_names, values))
+            if fam["type"] != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_num(value)}")
+                continue
+
+            cumulative = 0
+            for bound, n in zip(fam["buckets"] + ["+Inf"], value["counts"]):
+                cumulative += n
+                le = bound if bound == "+Inf" else _num(bound)
+                lines.append(f"{name}_bucket{_labels(labels + [('le', le)])} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {_num(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape_label(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _num(v):
+    if isinstance(v, float) and v.is_integer() and abs(v) < 1e15:
+        return str(int(v))
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def _escape_help(s):
+    return s.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(s):
+    return str(s).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
@@ -0,0 +1,221 @@
+"""
+On-demand profiling of the next N tick cycles (step → serialize → broadcast).
+
+    job = profiler.start(ticks=20, mode="cprofile")
+    ... loop calls profiler.call(fn, *args), step_done(), cycle_done() ...
+    job.done.wait(); job.result  → {"file": ..., "top": [...], ...}
+
+Modes:
+  • "cprofile" — one .pstats file (snakeviz, pstats, gprof2dot).  On
+    Python ≥ 3.12 cProfile hooks sys.monitoring, which is process-wide:
+    one Profile per job is enabled in start() and disabled in finish()
+    (both on the loop thread) and sees every thread; a second enabled
+    profiler would raise "Another profiling tool is already active".
+    Before 3.12 profiling is per thread, so every call routed through
+    profiler.call() runs under its own Profile (executor threads
+    included) and the runs are merged.  If cProfile can't start (another
+    tool holds it) the job falls back to "sample" and says so in its
+    result; a tick is never failed by the profiler.
+  • "sample"   — a background thread samples every thread's stack each
+    SAMPLE_INTERVAL; written as collapsed stacks (flamegraph.pl,
+    speedscope).  Idle pool / event-loop waits are skipped.
+
+Idle cost is one attribute check per wrapped call.
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", ROOT_DIR / "profiles"))
+
+MODES = ("cprofile", "sample")
+MAX_TICKS = 500
+SAMPLE_INTERVAL = 0.005     # seconds
+TOP_N = 25
+
+# cProfile on sys.monitoring: one process-wide profiler at a time
+PROCESS_WIDE = sys.version_info >= (3, 12)
+
+# Innermost frames that mean the thread is just waiting (file, function);
+# blocking C calls (sleep, SimpleQueue.get) leave their caller innermost
+IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+IDLE_FRAMES = {("thread.py", "_worker"), ("scheduler.py", "wait")}
+
+
+class ProfileJob:
+    def __init__(self, ticks, mode):
+        self.ticks = ticks
+        self.mode = mode
+        self.steps = 0
+        self.started = time.perf_counter()
+        self.profiles = []          # cProfile runs
+        self.profile = None         # the job's one Profile (PROCESS_WIDE)
+        self.fallback = None        # why "cprofile" ran as "sample"
+        self.samples = Counter()    # collapsed stack → count
+        self.done = threading.Event()
+        self.result = None
+
+
+class TickProfiler:
+    def __init__(self, out_dir=PROFILE_DIR):
+        self.out_dir = Path(out_dir)
+        self.active = False
+        self.job = None
+        self._stop = None
+        self._sampler = None
+
+    # ============================================================
+    # Control
+    # ============================================================
+    def start(self, ticks, mode="cprofile"):
+        if self.active:
+            raise RuntimeError("a profile is already running")
+        check_request(ticks, mode)
+
+        job = self.job = ProfileJob(ticks, mode)
+        if mode == "cprofile" and PROCESS_WIDE:
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+                job.profile = prof
+            except ValueError as e:     # another profiling tool is active
+                job.mode, job.fallback = "sample", str(e)
+        if job.mode == "sample":
+            self._stop = threading.Event()
+            self._sampler = threading.Thread(
+                target=_sample, args=(job, self._stop), name="tick-profiler", daemon=True
+            )
+            self._sampler.start()
+        self.active = True
+        return job
+
+    def finish(self):
+        """Stop now and write whatever was collected."""
+        if not self.active:
+            return self.job.result if self.job else None
+        self.active = False
+        job = self.job
+        if job.profile is not None:
+            job.profile.disable()
+            job.profiles.append(job.profile)
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+
+        try:
+            job.result = self._write(job)
+        except Exception as e:
+            job.result = {"error": str(e)}
+        job.done.set()
+        return job.result
+
+    # ============================================================
+    # Hooks (hot path)
+    # ============================================================
+    def call(self, fn, *args):
+        job = self.job
+        if not self.active or job.mode != "cprofile" or job.profile is not None:
+            return fn(*args)
+        prof = cProfile.Profile()
+        try:
+            prof.enable()
+        except ValueError:              # this thread is profiled by someone else
+            return fn(*args)
+        try:
+            return fn(*args)
+        finally:
+            prof.disable()
+            job.profiles.append(prof)
+
+    def step_done(self):
+        if self.active:
+            self.job.steps += 1
+
+    def cycle_done(self):
+        """After a broadcast: finish once N steps have gone out."""
+        if self.active and self.job.steps >= self.job.ticks:
+            return self.finish()
+        return None
+
+    # ============================================================
+    # Output
+    # ============================================================
+    def _write(self, job):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        result = {
+            "mode": job.mode,
+            "ticks": job.steps,
+            "seconds": round(time.perf_counter() - job.started, 3),
+        }
+        if job.fallback:
+            result["fallback"] = f"cprofile unavailable ({job.fallback}), sampled instead"
+
+        if job.mode == "cprofile":
+            if not job.profiles:
+                return {**result, "error": "no calls were profiled"}
+            stats = pstats.Stats(job.profiles[0])
+            for prof in job.profiles[1:]:
+                stats.add(prof)
+            path = self.out_dir / f"profile-{stamp}.pstats"
+            stats.dump_stats(path)
+            result["top"] = _top_functions(stats)
+        else:
+            path = self.out_dir / f"profile-{stamp}.collapsed"
+            path.write_text("".join(f"{stack} {n}\n" for stack, n in job.samples.most_common()))
+            result["samples"] = sum(job.samples.values())
+            result["top"] = _top_leaves(job.samples)
+
+        result["file"] = path.name
+        return result
+
+
+def check_request(ticks, mode):
+    if mode not in MODES:
+        raise ValueError(f"mode must be one of {MODES}")
+    if not 1 <= ticks <= MAX_TICKS:
+        raise ValueError(f"ticks must be in 1..{MAX_TICKS}")
+
+
+def _top_functions(stats):
+    rows = sorted(stats.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:TOP_N]
+    return [
+        {
+            "function": f"{Path(file).name}:{line}({name})",
+            "calls": nc,
+            "tottime": round(tt, 6),
+            "cumtime": round(ct, 6),
+        }
+        for (file, line, name), (cc, nc, tt, ct, _) in rows
+    ]
+
+
+def _top_leaves(samples):
+    leaves = Counter()
+    for stack, n in samples.items():
+        leaves[stack.rsplit(";", 1)[-1]] += n
+    return [{"function": f, "samples": n} for f, n in leaves.most_common(TOP_N)]
+
+
+def _sample(job, stop):
+    me = threading.get_ident()
+    while not stop.wait(SAMPLE_INTERVAL):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for tid, frame in sys._current_frames().items():
+            leaf = (Path(frame.f_code.co_filename).name, frame.f_code.co_name)
+            if tid == me or leaf[0] in IDLE_FILES or leaf in IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})")
+                frame = frame.f_back
+            job.samples[";".join([names.get(tid, str(tid)), *reversed(stack)])] += 1
@@ -0,0 +1,69 @@
+from .metrics import Registry
+
+# step() phases (sim.phase_times keys)
+PHASES = ("move_users", "update_rssi", "update_ap_load",
+          "apply_greedy", "apply_mcmf", "apply_auction", "ap_killer")
+
+# Encoded frames (wifi_json_encode_seconds{frame=...})
+FRAMES = ("snapshot", "patch", "keyframe", "binary", "views")
+
+
+class TickMetrics:
+    """
+    Simulation-side metrics, registered wherever step() runs: the API
+    process (SIM_MODE=thread) or the worker (SIM_MODE=process, which
+    ships registry.snapshot() to the API with every bundle).
+
+    record_step() reads what step() already measured (sim.phase_times,
+    sim.greedy_report), so the tick itself only pays for perf_counter().
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or Registry()
+        r = self.registry
+
+        self.ticks = r.counter("wifi_ticks_total", "Simulation steps run")
+        self.step = r.histogram("wifi_step_seconds", "Wall time of one step()")
+        phase = r.histogram("wifi_step_phase_seconds", "Wall time of each step() phase",
+                            labels=("phase",))
+        self.phases = {name: phase.labels(name) for name in PHASES}
+
+        self.get_state = r.histogram("wifi_get_state_seconds", "Wall time of get_state()")
+        encode = r.histogram("wifi_json_encode_seconds", "Encoding time per broadcast frame kind",
+                             labels=("frame",))
+        self.encode = {name: encode.labels(name) for name in FRAMES}
+
+        self.clients = r.gauge("wifi_clients", "Clients in the simulation")
+        self.aps = r.gauge("wifi_aps", "Access points in the simulation")
+        self.overloaded = r.gauge("wifi_overloaded_aps",
+                                  "APs over dynamic capacity at the last greedy pass")
+        self.moves = r.gauge("wifi_greedy_moves", "Clients moved by the last greedy pass")
+        self.moves_total = r.counter("wifi_greedy_moves_total", "Clients moved by greedy")
+
+        self.commands = r.counter("wifi_commands_applied_total", "Control commands applied at tick boundaries")
+        self.command_errors = r.counter("wifi_command_errors_total", "Command runs that raised")
+        self.command_batch = r.histogram("wifi_command_batch_size", "Commands applied per tick",
+                                         buckets=(1, 5, 10, 50, 100, 500, 1000, 5000))
+
+    def record_step(self, sim):
+        self.ticks.inc()
+        total = 0.0
+        for name, dt in sim.phase_times.items():
+            child = self.phases.get(name)
+            if child is not None:
+                child.observe(dt)
+            total += dt
+        self.step.observe(total)
+
+        self.clients.set(len(sim.clients))
+        self.aps.set(len(sim.aps))
+        if "apply_greedy" in sim.phase_times:
+            report = sim.greedy_report
+            self.moves.set(report.get("moves", 0))
+            self.moves_total.inc(report.get("moves", 0))
+            self.overloaded.set(report.get("overloaded", 0))
+
+    def record_commands(self, n, errors=()):
+        self.commands.inc(n)
+        self.command_errors.inc(len(errors))
+        self.command_batch.observe(n)
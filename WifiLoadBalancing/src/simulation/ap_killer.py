@@ -27,7 +27,17 @@ class APKiller:
     def set_floor(self, level):
         self.floor = level
 
+    def _index(self, aps):
+        """Simulator's APGrid when it covers this AP list, else None."""
+        grid = self.sim.get_ap_index()
+        return grid if grid.aps is aps else None
+
     def get_nearest_ap_id(self, aps):
+        grid = self._index(aps)
+        if grid is not None:
+            j = grid.nearest(self.floor, self.x, self.y)
+            return aps[j]["id"] if j >= 0 else None
+
         best_id = None
         best_dist = float("inf")
 
@@ -55,7 +65,7 @@ class APKiller:
             self.x = corridor["x"] + corridor["width"] / 2
             self.y = corridor["y"] + corridor["height"] / 2
 
-    def update(self, aps, rooms):
+    def update(self, aps):
         if not self.active:
             return
 
@@ -63,12 +73,10 @@ class APKiller:
         self.x += self.vx * self.speed
         self.y += self.vy * self.speed
 
-        # full floor bounding box (NOT corridor)
-        if rooms:
-            min_x = min(r["x"] for r in rooms)
-            max_x = max(r["x"] + r["width"] for r in rooms)
-            min_y = min(r["y"] for r in rooms)
-            max_y = max(r["y"] + r["height"] for r in rooms)
+        # full floor bounding box (NOT corridor), precomputed per floor
+        bbox = self.sim.layout.bbox(self.floor)
+        if bbox:
+            min_x, min_y, max_x, max_y = bbox
 
             self.x = max(min_x + 8, min(max_x - 8, self.x))
             self.y = max(min_y + 8, min(max_y - 8, self.y))
@@ -76,13 +84,22 @@ class APKiller:
         # ===================================================
         # 🔥 CORRECT AP IMPACT LOGIC (GLOBAL DISTANCE MATCH)
         # ===================================================
-        killer_gx, killer_gy = self.sim.to_global(self.floor, self.x, self.y)
+        # Same floor → same global offset, so local distances are identical
+        grid = self._index(aps)
+        if grid is not None:
+            for j, dist in grid.within(self.floor, self.x, self.y, 180):
+                if dist < 180:
+                    aps[j]["load"] = min(100, aps[j]["load"] + 10)
+            return
+
+        to_global = self.sim.layout.to_global
+        killer_gx, killer_gy = to_global(self.floor, self.x, self.y)
 
         for ap in aps:
             if ap["floor"] != self.floor:
                 continue
 
-            ap_gx, ap_gy = self.sim.to_global(ap["floor"], ap["x"], ap["y"])
+            ap_gx, ap_gy = to_global(ap["floor"], ap["x"], ap["y"])
 
             # now both are in GLOBAL space → correct distance
             dist = math.dist((killer_gx, killer_gy), (ap_gx, ap_gy))
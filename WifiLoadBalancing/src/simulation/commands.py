@@ -0,0 +1,140 @@
+"""
+Named simulator mutations.
+
+Every REST control goes through apply(sim, name, args), so the same
+command works on an in-process simulator and on one living in the
+worker process (where it arrives over a queue).
+
+Controls are queued and applied once per tick with apply_batch(), which
+folds runs of add_user / remove_user into one add_users / remove_users
+call (POST /commands can add hundreds of users in one request).
+"""
+
+import inspect
+from collections import Counter
+from itertools import groupby
+
+
+def _add_user(sim, floor, count=1):
+    sim.add_users({int(floor): int(count)})
+
+
+def _remove_user(sim, floor, count=1):
+    sim.remove_users({int(floor): int(count)})
+
+
+def _apkiller_deploy(sim):
+    sim.ap_killer.deploy()
+
+
+def _apkiller_withdraw(sim):
+    sim.ap_killer.withdraw()
+
+
+def _apkiller_floor(sim, level):
+    sim.ap_killer.set_floor(int(level))
+
+
+def _apkiller_move(sim, vx=0, vy=0):
+    sim.ap_killer.vx = vx * 6
+    sim.ap_killer.vy = vy * 6
+
+
+def _set_band(sim, band):
+    sim.set_band(band)
+
+
+COMMANDS = {
+    "add_user": _add_user,
+    "remove_user": _remove_user,
+    "apkiller_deploy": _apkiller_deploy,
+    "apkiller_withdraw": _apkiller_withdraw,
+    "apkiller_floor": _apkiller_floor,
+    "apkiller_move": _apkiller_move,
+    "set_band": _set_band,
+}
+
+
+def apply(sim, name, args=None):
+    """Run command `name` on `sim`; KeyError for unknown names."""
+    try:
+        fn = COMMANDS[name]
+    except KeyError:
+        raise KeyError(f"unknown command: {name}") from None
+    return fn(sim, **(args or {}))
+
+
+# Consecutive runs collapse into one call …
+BATCHED = {"add_user": "add_users", "remove_user": "remove_users"}
+# … or only the last one matters
+LAST_WINS = {"apkiller_move", "set_band"}
+
+ARG_TYPES = {"floor": int, "count": int, "level": int, "vx": float, "vy": float, "band": str}
+BANDS = ("2.4", "5", "6")
+MAX_COUNT = 1000
+FLOOR_MIN, FLOOR_MAX = -99, 999     # floor / level (int16 in a command log)
+
+
+class CommandError(ValueError):
+    pass
+
+
+def check(name, args=None):
+    """
+    Validate a command before it is queued and return its args with
+    canonical types (so a recorded session replays the exact values).
+    CommandError rejects a bad entry at the API instead of inside a tick.
+    """
+    fn = COMMANDS.get(name)
+    if fn is None:
+        raise CommandError(f"unknown command: {name}")
+    args = dict(args or {})
+    try:
+        inspect.signature(fn).bind(None, **args)
+    except TypeError as e:
+        raise CommandError(f"{name}: {e}") from None
+    for key, kind in ARG_TYPES.items():
+        if key in args:
+            try:
+                args[key] = kind(args[key])
+            except (TypeError, ValueError):
+                raise CommandError(f"{name}: {key} must be {kind.__name__}") from None
+    if not 1 <= args.get("count", 1) <= MAX_COUNT:
+        raise CommandError(f"{name}: count must be in 1..{MAX_COUNT}")
+    for key in ("floor", "level"):
+        if key in args and not FLOOR_MIN <= args[key] <= FLOOR_MAX:
+            raise CommandError(f"{name}: {key} must be in {FLOOR_MIN}..{FLOOR_MAX}")
+    if "band" in args and args["band"] not in BANDS:
+        raise CommandError(f"{name}: band must be one of {BANDS}")
+    return args
+
+
+def apply_batch(sim, batch, recorder=None):
+    """
+    Apply [(name, args), ...] in order.  Returns [(name, error), ...] for
+    the runs that failed; the rest of the batch still applies.  The batch
+    is written to `recorder` (a replay.CommandLog) first; a failed write
+    is reported as a "record" error and never keeps the batch from running.
+    """
+    errors = []
+    if recorder is not None:
+        try:
+            recorder.write(sim.tick, batch)
+        except Exception as e:
+            errors.append(("record", str(e)))
+    for name, run in groupby(batch, key=lambda cmd: cmd[0]):
+        run = [args or {} for _, args in run]
+        try:
+            if name in BATCHED:
+                counts = Counter()
+                for args in run:
+                    counts[int(args["floor"])] += int(args.get("count", 1))
+                getattr(sim, BATCHED[name])(dict(counts))
+            elif name in LAST_WINS:
+                apply(sim, name, run[-1])
+            else:
+                for args in run:
+                    apply(sim, name, args)
+        except Exception as e:
+            errors.append((name, str(e)))
+    return errors
@@ -0,0 +1,213 @@
+"""
+campus_layout.json compiled once into lookup tables.
+
+    layout = CampusLayout(floors)
+    layout.to_global(floor, x, y)              # frontend coordinates
+    layout.to_global_many(floors, xs, ys)      # same, whole columns
+    layout.rooms_on(level), layout.spawn(level), layout.bbox(level)
+    layout.rooms                               # RoomBounds (per room id)
+
+Nothing here is rebuilt per tick or per record.
+"""
+
+import numpy as np
+
+from .state_store import INT_NONE
+
+# Frontend stacks floors top-down, highest level first
+FLOOR_MARGIN = 20
+FLOOR_HEIGHT = 350
+
+# Rooms users never spawn in (corridors, staircases, tiny rooms …)
+SPAWN_BLOCK = ("corridor", "stair", "lift", "toilet", "washroom", "wc")
+SPAWN_MIN_SIZE = 25
+SPAWN_INSET = 5
+
+
+class CampusLayout:
+    def __init__(self, floors):
+        self.floors = floors
+        self.rooms = RoomBounds(floors)
+
+        # Global offset per level (first floor in -level order wins)
+        self.offsets = {}
+        for i, f in enumerate(sorted(floors, key=lambda f: -f["level"])):
+            self.offsets.setdefault(
+                f["level"], (FLOOR_MARGIN, FLOOR_MARGIN + i * (FLOOR_HEIGHT + FLOOR_MARGIN))
+            )
+        levels = sorted(self.offsets)
+        self._levels = np.array(levels, dtype=np.int64)
+        self._dx = np.array([self.offsets[l][0] for l in levels], dtype=np.float64)
+        self._dy = np.array([self.offsets[l][1] for l in levels], dtype=np.float64)
+
+        # Per level: every room (all floors with that level), spawnable
+        # rooms, and the bounding box of the floor
+        self._rooms_on = {}
+        for f in floors:
+            self._rooms_on.setdefault(f["level"], []).extend(f["rooms"])
+        self._spawn = {level: SpawnTable(spawnable(rooms))
+                       for level, rooms in self._rooms_on.items()}
+        self._bbox = {
+            level: (
+                min(r["x"] for r in rooms), min(r["y"] for r in rooms),
+                max(r["x"] + r["width"] for r in rooms), max(r["y"] + r["height"] for r in rooms),
+            )
+            for level, rooms in self._rooms_on.items() if rooms
+        }
+
+    # ============================================================
+    # Coordinates
+    # ============================================================
+    def to_global(self, floor, x, y):
+        off = self.offsets.get(floor)
+        if off is None:
+            return x, y
+        return x + off[0], y + off[1]
+
+    def to_global_many(self, floors, x, y):
+        """to_global() over arrays (floor column may hold INT_NONE)."""
+        gx = np.asarray(x, dtype=np.float64).copy()
+        gy = np.asarray(y, dtype=np.float64).copy()
+        if not len(self._levels):
+            return gx, gy
+        floors = np.asarray(floors)
+        li = np.searchsorted(self._levels, floors)
+        li[li == len(self._levels)] = 0
+        known = (self._levels[li] == floors) & (floors != INT_NONE)
+        gx[known] += self._dx[li[known]]
+        gy[known] += self._dy[li[known]]
+        return gx, gy
+
+    # ============================================================
+    # Rooms
+    # ============================================================
+    def rooms_on(self, level):
+        """All room dicts of a level ([] if unknown)."""
+        return self._rooms_on.get(level, [])
+
+    def spawn(self, level):
+        """SpawnTable of a level's spawnable rooms, or None."""
+        table = self._spawn.get(level)
+        return table if table else None
+
+    def bbox(self, level):
+        """(x1, y1, x2, y2) around every room of a level, or None."""
+        return self._bbox.get(level)
+
+
+def spawnable(rooms):
+    """
+    Filter out corridors, staircases, tiny rooms etc to avoid weird geometry.
+    """
+    return [
+        r for r in rooms
+        if not any(tok in r["name"].lower() for tok in SPAWN_BLOCK)
+        and r["width"] >= SPAWN_MIN_SIZE and r["height"] >= SPAWN_MIN_SIZE
+    ]
+
+
+class SpawnTable:
+    """
+    Spawnable rooms of one floor: the room dicts plus their safe spawn
+    rectangles (inset from the walls), as arrays.  Rooms are picked
+    uniformly (not by area), as before the layout index.
+    """
+
+    def __init__(self, rooms):
+        self.rooms = rooms
+        self.names = [r["name"] for r in rooms]
+        self.x1 = np.array([r["x"] + SPAWN_INSET for r in rooms], dtype=np.float64)
+        self.y1 = np.array([r["y"] + SPAWN_INSET for r in rooms], dtype=np.float64)
+        self.x2 = np.array([r["x"] + r["width"] - SPAWN_INSET for r in rooms], dtype=np.float64)
+        self.y2 = np.array([r["y"] + r["height"] - SPAWN_INSET for r in rooms], dtype=np.float64)
+
+    def __len__(self):
+        return len(self.rooms)
+
+
+class RoomBounds:
+    """
+    Room rectangles of campus_layout compiled into arrays, indexed by an
+    integer room id:
+
+        x1[rid], y1[rid], x2[rid], y2[rid], floor[rid]
+
+    Users don't need a new column for their room id: the "room" column of
+    ClientTable is already an interned int code, so ids(floor_col,
+    room_col, pool) maps (floor, room code) → room id with one table
+    gather (-1 when the room isn't on that floor, like the old lookup
+    returning None).  Names match case-insensitively; as before, only the
+    first floor with a given level and the first room with a given name
+    count.
+    """
+
+    def __init__(self, floors):
+        self.by_key = {}        # (level, lowercase name) → room id
+        x1, y1, x2, y2, level_of = [], [], [], [], []
+        seen = set()
+
+        for f in floors:
+            level = f["level"]
+            if level in seen:
+                continue
+            seen.add(level)
+            for r in f["rooms"]:
+                key = (level, r["name"].lower())
+                if key in self.by_key:
+                    continue
+                self.by_key[key] = len(x1)
+                x1.append(r["x"])
+                y1.append(r["y"])
+                x2.append(r["x"] + r["width"])
+                y2.append(r["y"] + r["height"])
+                level_of.append(level)
+
+        self.x1 = np.array(x1, dtype=np.float64)
+        self.y1 = np.array(y1, dtype=np.float64)
+        self.x2 = np.array(x2, dtype=np.float64)
+        self.y2 = np.array(y2, dtype=np.float64)
+        self.floor = np.array(level_of, dtype=np.int64)
+
+        self.levels = np.array(sorted(seen), dtype=np.int64)
+        self._lut = None        # [level index, room code] → room id
+        self._lut_pool = 0
+
+    def __len__(self):
+        return len(self.x1)
+
+    def find(self, floor, name):
+        """Room id for one (floor, name), or -1."""
+        return self.by_key.get((floor, str(name).lower()), -1)
+
+    def bounds(self, rid):
+        return {
+            "x1": self.x1.item(rid), "y1": self.y1.item(rid),
+            "x2": self.x2.item(rid), "y2": self.y2.item(rid),
+        }
+
+    def ids(self, floor, room, pool):
+        """
+        Room id per row from a floor column (int, INT_NONE = None) and an
+        interned room column whose names live in `pool`.
+        """
+        lut = self._lookup(pool)
+        if not len(self.levels):
+            return np.full(len(floor), -1, dtype=np.int64)
+
+        li = np.searchsorted(self.levels, floor)
+        li[li == len(self.levels)] = 0
+        known = (self.levels[li] == floor) & (floor != INT_NONE)
+        # code -1 (None) lands in the trailing "unknown" column
+        rid = lut[li, room]
+        rid[~known] = -1
+        return rid
+
+    def _lookup(self, pool):
+        if self._lut is None or self._lut_pool != len(pool):
+            names = [str(n).lower() for n in pool.names]
+            lut = np.full((max(len(self.levels), 1), len(names) + 1), -1, dtype=np.int64)
+            for i, level in enumerate(self.levels.tolist()):
+                for code, name in enumerate(names):
+                    lut[i, code] = self.by_key.get((level, name), -1)
+            self._lut, self._lut_pool = lut, len(pool)
+        return self._lut
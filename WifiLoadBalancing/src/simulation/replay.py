@@ -0,0 +1,152 @@
+"""
+Record / replay of external commands.
+
+A seeded WifiSimulator is deterministic, so a session is fully described
+by its seed, its starting data and the commands applied at each tick.
+CommandLog appends every batch apply_batch() runs to a compact binary
+file; replay re-executes it headless at full speed:
+
+    SIM_SEED=42 RECORD=session.wlog uvicorn main:app     # record
+    python -m simulation.run --replay session.wlog       # replay
+
+File layout (little endian):
+
+    b"WLOG" u16 version u32 header_len  header JSON
+        {"seed", "sim": {...WifiSimulator args}, "commands": [name, ...]}
+    record*   u32 tick  u8 code  packed args     (code = index in "commands")
+    end       u32 tick  u8 0xFF                  (last tick; absent if killed)
+
+Args are packed per command (ARGS): h = int16, H = uint16, d = float64,
+s = u8 length + UTF-8.  Replay is exact for greedy / MCMF; the auction
+spends a wall-clock budget per tick, so its trajectory can differ.
+"""
+
+import json
+import struct
+
+from .commands import COMMANDS, apply_batch
+
+MAGIC = b"WLOG"
+VERSION = 1
+END = 0xFF
+
+PREAMBLE = struct.Struct("<4sHI")
+RECORD = struct.Struct("<IB")
+
+# name → ((arg, struct code, default), ...); commands.check() keeps
+# floor / level / count inside these ranges
+ARGS = {
+    "add_user": (("floor", "h", None), ("count", "H", 1)),
+    "remove_user": (("floor", "h", None), ("count", "H", 1)),
+    "apkiller_deploy": (),
+    "apkiller_withdraw": (),
+    "apkiller_floor": (("level", "h", None),),
+    "apkiller_move": (("vx", "d", 0), ("vy", "d", 0)),
+    "set_band": (("band", "s", None),),
+}
+_CAST = {"h": int, "H": int, "d": float, "s": str}
+
+
+class CommandLog:
+    """Append-only writer; write() once per applied batch, close() at the end."""
+
+    def __init__(self, path, seed, sim=None):
+        self.path = path
+        self.names = list(COMMANDS)
+        self._codes = {name: i for i, name in enumerate(self.names)}
+        self.records = 0
+        self._f = open(path, "wb")
+
+        header = json.dumps({"seed": seed, "sim": sim or {}, "commands": self.names}).encode()
+        self._f.write(PREAMBLE.pack(MAGIC, VERSION, len(header)) + header)
+
+    def write(self, tick, batch):
+        out = bytearray()
+        for name, args in batch:
+            out += RECORD.pack(tick, self._codes[name])
+            out += _pack(name, args or {})
+        self._f.write(out)
+        self._f.flush()
+        self.records += len(batch)
+
+    def close(self, tick):
+        if not self._f.closed:
+            self._f.write(RECORD.pack(tick, END))
+            self._f.close()
+
+
+def read_log(path):
+    """(header dict, [(tick, name, args), ...], last tick)."""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    magic, version, size = PREAMBLE.unpack_from(data, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path}: not a version {VERSION} command log")
+    pos = PREAMBLE.size
+    header = json.loads(data[pos:pos + size])
+    pos += size
+    names = header["commands"]
+
+    records, last = [], None
+    while pos + RECORD.size <= len(data):
+        tick, code = RECORD.unpack_from(data, pos)
+        pos += RECORD.size
+        if code == END:
+            last = tick
+            break
+        name = names[code]
+        args, pos = _unpack(name, data, pos)
+        records.append((tick, name, args))
+
+    if last is None:        # recorder was killed: run through the last command
+        last = records[-1][0] + 1 if records else 0
+    return header, records, last
+
+
+class Replayer:
+    """Feeds recorded commands back at their ticks (call before each step())."""
+
+    def __init__(self, records):
+        self.records = records
+        self.pos = 0
+        self.errors = []
+
+    def __call__(self, sim):
+        records, i = self.records, self.pos
+        if i >= len(records) or records[i][0] > sim.tick:
+            return
+        batch = []
+        while i < len(records) and records[i][0] <= sim.tick:
+            batch.append(records[i][1:])
+            i += 1
+        self.pos = i
+        self.errors += apply_batch(sim, batch)
+
+
+# ============================================================
+# Arg packing
+# ============================================================
+def _pack(name, args):
+    out = bytearray()
+    for arg, code, default in ARGS[name]:
+        value = _CAST[code](args.get(arg, default))
+        if code == "s":
+            raw = value.encode()
+            out += struct.pack("<B", len(raw)) + raw
+        else:
+            out += struct.pack("<" + code, value)
+    return bytes(out)
+
+
+def _unpack(name, data, pos):
+    args = {}
+    for arg, code, _ in ARGS[name]:
+        if code == "s":
+            n = data[pos]
+            args[arg] = data[pos + 1:pos + 1 + n].decode()
+            pos += 1 + n
+        else:
+            (args[arg],) = struct.unpack_from("<" + code, data, pos)
+            pos += struct.calcsize("<" + code)
+    return args, pos
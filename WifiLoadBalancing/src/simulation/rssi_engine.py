@@ -0,0 +1,222 @@
+import math
+
+import numpy as np
+
+from .state_store import APTable, ClientTable, INT_NONE, NONE_CODE
+
+# Keep each user×AP block under ~1M cells so dense floors don't blow memory
+MAX_BLOCK_CELLS = 1 << 20
+
+# Floors with at least this many APs go through the spatial grid
+GRID_MIN_APS = 32
+
+RSSI_MIN = -95
+RSSI_MAX = -40
+
+
+class RSSIEngine:
+    """
+    Batched RSSI / association engine.
+
+    Replaces the per-user × per-AP Python loop of update_rssi with one
+    NumPy pass per floor:
+
+        distance  →  band path-loss RSSI  →  coverage mask  →  best AP
+
+    Semantics match the scalar loop exactly:
+      • Same-floor APs only
+      • Coverage radius comes from band_coverage[current_band]
+      • Path-loss exponent comes from the AP's own band (falls back to
+        current_band), unknown bands use 22
+      • RSSI clamped to [-95, -40]; an AP must beat -95 to be picked
+      • Ties go to the first AP in list order
+
+    Dense floors (≥ GRID_MIN_APS APs) use an APGrid so each user is only
+    compared with the APs in the cells around it.
+    """
+
+    def __init__(self, band_coverage, band_pathloss, default_loss=22):
+        self.band_coverage = band_coverage
+        self.band_pathloss = band_pathloss
+        self.default_loss = default_loss
+
+    # ============================================================
+    # Array helpers
+    # ============================================================
+    def ap_arrays(self, aps, current_band):
+        """Pack AP positions, floors and path-loss exponents into arrays."""
+        n = len(aps)
+        ax = np.fromiter((_finite(ap.get("x")) for ap in aps), float, n)
+        ay = np.fromiter((_finite(ap.get("y")) for ap in aps), float, n)
+        loss = np.fromiter(
+            (self.band_pathloss.get(ap.get("band", current_band), self.default_loss)
+             for ap in aps),
+            float, n,
+        )
+        floors = [ap["floor"] for ap in aps]
+        return ax, ay, loss, floors
+
+    # ============================================================
+    # Core batched pass
+    # ============================================================
+    def associate(self, ux, uy, u_floors, ax, ay, loss, ap_floors, coverage, grid=None):
+        """
+        Return (best_idx, best_rssi) for every user.
+
+        best_idx is an index into the AP arrays, or -1 when the user has no
+        same-floor AP inside coverage.  best_rssi is -95 for those users.
+        `grid` (an APGrid over the same AP list) enables the dense path.
+        """
+        n_users = len(ux)
+        best_idx = np.full(n_users, -1, dtype=np.int64)
+        best_rssi = np.full(n_users, float(RSSI_MIN))
+
+        if n_users == 0 or len(ax) == 0:
+            return best_idx, best_rssi
+
+        # Group APs by floor once (list order preserved for tie-breaking)
+        floor_aps = {}
+        for j, f in enumerate(ap_floors):
+            floor_aps.setdefault(f, []).append(j)
+
+        floor_code = {f: k for k, f in enumerate(floor_aps)}
+        u_codes = np.fromiter(
+            (floor_code.get(f, -1) for f in u_floors), np.int64, n_users
+        )
+
+        out = (best_idx, best_rssi)
+        arrays = (ux, uy, ax, ay, loss)
+
+        for f, code in floor_code.items():
+            users = np.flatnonzero(u_codes == code)
+            if users.size == 0:
+                continue
+
+            cols = np.asarray(floor_aps[f], dtype=np.int64)
+
+            if grid is not None and cols.size >= GRID_MIN_APS:
+                self._associate_grid(users, f, grid, arrays, coverage, out)
+                continue
+
+            block = max(1, MAX_BLOCK_CELLS // cols.size)
+            for start in range(0, users.size, block):
+                _best(users[start:start + block], cols, arrays, coverage, out)
+
+        return best_idx, best_rssi
+
+    def _associate_grid(self, users, floor, grid, arrays, coverage, out):
+        """Batch users by grid cell; each cell only sees nearby APs."""
+        ux, uy = arrays[0], arrays[1]
+        cx = np.floor(ux[users] / grid.cell).astype(np.int64)
+        cy = np.floor(uy[users] / grid.cell).astype(np.int64)
+
+        cells, inverse = np.unique(np.stack([cx, cy], axis=1), axis=0, return_inverse=True)
+        order = np.argsort(inverse.ravel(), kind="stable")
+        bounds = np.searchsorted(inverse.ravel()[order], np.arange(len(cells) + 1))
+        rings = grid.rings_for(coverage)
+
+        for k, (gx, gy) in enumerate(cells.tolist()):
+            cols = grid.neighbourhood(floor, gx, gy, rings)
+            if not cols:
+                continue
+            rows = users[order[bounds[k]:bounds[k + 1]]]
+            _best(rows, np.asarray(cols, dtype=np.int64), arrays, coverage, out)
+
+    # ============================================================
+    # Dict-level entry point (what update_rssi calls)
+    # ============================================================
+    def update_users(self, users, aps, current_band, grid=None):
+        """Compute associations and write nearest/assigned/connected + RSSI."""
+        n = len(users)
+        if n == 0:
+            return
+
+        if isinstance(users, ClientTable) and isinstance(aps, APTable):
+            self._update_tables(users, aps, current_band, grid)
+            return
+
+        coverage = self.band_coverage[current_band]
+        ax, ay, loss, ap_floors = self.ap_arrays(aps, current_band)
+
+        ux = np.fromiter((_finite(u.get("x")) for u in users), float, n)
+        uy = np.fromiter((_finite(u.get("y")) for u in users), float, n)
+
+        # Users missing coordinates can't reach any AP
+        u_floors = [
+            u.get("floor") if ("x" in u and "y" in u) else None
+            for u in users
+        ]
+
+        best_idx, best_rssi = self.associate(
+            ux, uy, u_floors, ax, ay, loss, ap_floors, coverage, grid=grid
+        )
+
+        ap_ids = [ap["id"] for ap in aps]
+        rssi_int = np.trunc(best_rssi).astype(np.int64).tolist()
+
+        for user, j, r in zip(users, best_idx.tolist(), rssi_int):
+            if j < 0:
+                user["nearest_ap"] = None
+                user["connected_ap"] = None
+                user["assigned_ap"] = None
+                user["RSSI"] = RSSI_MIN
+                continue
+
+            aid = ap_ids[j]
+            user["nearest_ap"] = aid
+            user["assigned_ap"] = aid
+            user["connected_ap"] = aid
+            user["RSSI"] = r
+
+
+    def _update_tables(self, users, aps, current_band, grid):
+        """Column-level version of update_users (no per-user dict access)."""
+        coverage = self.band_coverage[current_band]
+        ax, ay, loss, ap_floors = self.ap_arrays(aps, current_band)
+
+        ux = np.nan_to_num(users.col("x"), nan=0.0, posinf=0.0, neginf=0.0)
+        uy = np.nan_to_num(users.col("y"), nan=0.0, posinf=0.0, neginf=0.0)
+        u_floors = [None if f == INT_NONE else f for f in users.col("floor").tolist()]
+
+        best_idx, best_rssi = self.associate(
+            ux, uy, u_floors, ax, ay, loss, ap_floors, coverage, grid=grid
+        )
+
+        # AP row → id code, with a trailing -1 (None) for "no AP"
+        codes = np.append(aps.codes(), NONE_CODE)
+        ref = codes[best_idx]
+        users.col("nearest_ap")[:] = ref
+        users.col("assigned_ap")[:] = ref
+        users.col("connected_ap")[:] = ref
+        users.col("RSSI")[:] = np.where(best_idx < 0, RSSI_MIN, np.trunc(best_rssi))
+
+
+def _best(rows, cols, arrays, coverage, out):
+    """Strongest in-coverage AP among `cols` for each user in `rows`."""
+    ux, uy, ax, ay, loss = arrays
+    best_idx, best_rssi = out
+
+    dist = np.hypot(
+        ux[rows, None] - ax[None, cols],
+        uy[rows, None] - ay[None, cols],
+    )
+
+    rssi = -30 - loss[None, cols] * np.log10(np.maximum(dist, 1e-3))
+    np.clip(rssi, RSSI_MIN, RSSI_MAX, out=rssi)
+
+    # Outside the current band's range (or NaN) → not a candidate
+    rssi[~(dist <= coverage)] = -np.inf
+
+    pick = np.argmax(rssi, axis=1)
+    val = rssi[np.arange(rows.size), pick]
+    hit = val > RSSI_MIN
+
+    best_idx[rows[hit]] = cols[pick[hit]]
+    best_rssi[rows[hit]] = val[hit]
+
+
+def _finite(v):
+    """Mirror safe_float(): non-numeric / NaN / inf → 0.0."""
+    if isinstance(v, (int, float)) and math.isfinite(v):
+        return float(v)
+    return 0.0
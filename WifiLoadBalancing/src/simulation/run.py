@@ -0,0 +1,235 @@
+"""
+Headless simulator: step() as fast as possible, no get_state(), no JSON,
+no sockets.
+
+    cd WifiLoadBalancing/src
+    python -m simulation.run --ticks 100000 --solver greedy --out kpis.npz
+    python -m simulation.run --ticks 20000 --users 5000 --solver auction
+    python -m simulation.run --replay session.wlog      # see simulation.replay
+    python -m simulation.run --config tuning.json       # DEFAULT_CONFIG overrides
+
+Per-tick KPIs are kept as columns and flushed to --out every
+--flush-every ticks (.npz: one array per KPI, or .csv):
+
+    tick, step_ms, clients, overloaded_aps, disconnected, mean_rssi, moves
+
+  • overloaded_aps — APs with load above dynamic_capacity()
+  • disconnected   — clients without an assigned AP
+  • mean_rssi      — mean client RSSI (dBm)
+  • moves          — clients whose assigned AP changed this tick (matched
+                     by id; joins and leaves are not moves)
+
+Throughput (ticks/s, simulated time per wall second) is printed at the end.
+Many configs in parallel: simulation.sweep.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from algorithms.cost_function import dynamic_capacities
+from .replay import Replayer, read_log
+from .simulator import WifiSimulator
+from .state_store import NONE_CODE
+
+SOLVERS = ("greedy", "mcmf", "auction")
+TICK_SECONDS = 0.2        # simulated time per tick (live default SIM_HZ=5)
+
+KPIS = {
+    "tick": np.int64,
+    "step_ms": np.float32,
+    "clients": np.int32,
+    "overloaded_aps": np.int32,
+    "disconnected": np.int32,
+    "mean_rssi": np.float32,
+    "moves": np.int32,
+}
+
+
+class KPILog:
+    """Per-tick KPI columns (preallocated, doubled when full)."""
+
+    def __init__(self, capacity=1024):
+        self.n = 0
+        self.cols = {name: np.zeros(capacity, dtype=dtype) for name, dtype in KPIS.items()}
+        self._prev_ids = None
+        self._prev_assigned = None
+
+    def record(self, sim, step_seconds):
+        if self.n == len(self.cols["tick"]):
+            for name, arr in self.cols.items():
+                self.cols[name] = np.concatenate([arr, np.zeros_like(arr)])
+
+        clients, aps = sim.clients, sim.aps
+        assigned = clients.col("assigned_ap")
+        rssi = clients.col("RSSI")
+        capacity = dynamic_capacities(aps.col("airtime_capacity"), aps.col("user_count"),
+                                      sim.capacity_alpha)
+
+        # Same ids in the same rows: compare directly.  Adds and swap-removes
+        # shift rows, so then line last tick's rows up by id first
+        ids, prev = clients.ids(), self._prev_assigned
+        moves = 0
+        if prev is not None:
+            if ids == self._prev_ids:
+                moves = int(np.count_nonzero(assigned != prev))
+            else:
+                row_of = {rid: row for row, rid in enumerate(self._prev_ids)}
+                at = np.array([row_of.get(rid, -1) for rid in ids], dtype=np.int64)
+                known = at >= 0
+                moves = int(np.count_nonzero(assigned[known] != prev[at[known]]))
+        self._prev_ids = list(ids)
+        self._prev_assigned = assigned.copy()
+
+        i = self.n
+        c = self.cols
+        c["tick"][i] = sim.tick
+        c["step_ms"][i] = step_seconds * 1000
+        c["clients"][i] = len(clients)
+        c["overloaded_aps"][i] = np.count_nonzero(aps.col("load") > capacity)
+        c["disconnected"][i] = np.count_nonzero(assigned == NONE_CODE)
+        c["mean_rssi"][i] = rssi.mean() if len(rssi) else np.nan
+        c["moves"][i] = moves
+        self.n += 1
+
+    def columns(self):
+        return {name: arr[:self.n] for name, arr in self.cols.items()}
+
+    def save(self, path):
+        """Write .npz or .csv atomically (readers never see a half file)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        cols = self.columns()
+        with open(tmp, "wb") as f:
+            if path.suffix == ".csv":
+                np.savetxt(f, np.column_stack(list(cols.values())), delimiter=",",
+                           header=",".join(cols), comments="", fmt="%.6g")
+            else:
+                np.savez(f, **cols)
+        os.replace(tmp, path)
+
+
+def run(sim, ticks, log=None, out=None, flush_every=10_000, time_budget=None, progress=None,
+        before_step=None):
+    """Step `sim` `ticks` times (before_step(sim) first, e.g. a Replayer); returns a summary dict."""
+    log = log if log is not None else KPILog(capacity=max(ticks, 1))
+    clock = time.perf_counter
+    started = clock()
+
+    for i in range(1, ticks + 1):
+        if before_step is not None:
+            before_step(sim)
+        t0 = clock()
+        sim.step(time_budget)
+        log.record(sim, clock() - t0)
+
+        if out is not None and i % flush_every == 0:
+            log.save(out)
+        if progress and i % progress == 0:
+            _report(i, clock() - started, log)
+
+    wall = clock() - started
+    if out is not None:
+        log.save(out)
+
+    cols = log.columns()
+    return {
+        "ticks": ticks,
+        "seconds": round(wall, 3),
+        "ticks_per_sec": round(ticks / wall, 1) if wall else None,
+        "simulated_seconds": round(ticks * TICK_SECONDS, 1),
+        "speedup": round(ticks * TICK_SECONDS / wall, 1) if wall else None,
+        "step_ms_p50": round(float(np.percentile(cols["step_ms"], 50)), 3) if ticks else None,
+        "mean_overloaded_aps": round(float(cols["overloaded_aps"].mean()), 3) if ticks else None,
+        "mean_disconnected": round(float(cols["disconnected"].mean()), 3) if ticks else None,
+    }
+
+
+def _report(i, wall, log):
+    c = log.cols
+    j = log.n - 1
+    print(f"  tick {i:>8}  {i / wall:>8.1f} ticks/s   overloaded {c['overloaded_aps'][j]:>3}  "
+          f"disconnected {c['disconnected'][j]:>5}  RSSI {c['mean_rssi'][j]:6.1f}  "
+          f"moves {c['moves'][j]:>4}", file=sys.stderr)
+
+
+def build_sim(seed=0, solver=None, users=None, ap_spacing=None, config=None):
+    """Default data, or a synthetic campus with `users` users."""
+    aps = floors = None
+    if users:
+        from benchmarks.synthetic import make_campus
+        aps, users, floors = make_campus(users, seed=seed, ap_spacing=ap_spacing)
+    return WifiSimulator(aps=aps, users=users, floors=floors, seed=seed, solver=solver,
+                         config=config)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run WifiSimulator headless, as fast as possible")
+    parser.add_argument("--ticks", type=int, default=None,
+                        help="default 10000, or the recorded length with --replay")
+    parser.add_argument("--solver", choices=SOLVERS, default=None, help="default greedy")
+    parser.add_argument("--users", type=int, default=None,
+                        help="synthetic campus with N users (default: data/*.json)")
+    parser.add_argument("--ap-spacing", type=float, default=None,
+                        help="extra grid APs every N px (synthetic campus only)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", type=Path, default=None,
+                        help="JSON file of DEFAULT_CONFIG overrides (weights, load_decay, ...)")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="seconds step() may take per tick; the auction gets what is "
+                             "left after move/RSSI (default AUCTION_TIME_BUDGET for the auction)")
+    parser.add_argument("--out", type=Path, default=None, help="KPI file (.npz or .csv)")
+    parser.add_argument("--flush-every", type=int, default=10_000)
+    parser.add_argument("--progress", type=int, default=0, help="print a line every N ticks")
+    parser.add_argument("--replay", type=Path, default=None,
+                        help="re-run a recorded command log (seed + data from its header)")
+    parser.add_argument("--verbose", action="store_true", help="keep the simulator's prints")
+    args = parser.parse_args(argv)
+
+    config = {"seed": args.seed, "solver": args.solver, "users": args.users,
+              "ap_spacing": args.ap_spacing}
+    if args.config is not None:
+        config["config"] = json.loads(args.config.read_text())
+    replayer, ticks = None, args.ticks
+    if args.replay is not None:
+        header, records, last = read_log(args.replay)
+        config = {**config, **header["sim"], "seed": header["seed"]}
+        if args.solver:
+            config["solver"] = args.solver
+        replayer = Replayer(records)
+        ticks = last if ticks is None else ticks
+        print(f"▶️ Replaying {len(records)} commands over {last} ticks (seed {header['seed']})")
+        if header["seed"] is None:
+            print("⚠️ Recorded without a seed (SIM_SEED): the trajectory will not match")
+    ticks = 10_000 if ticks is None else ticks
+
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        sim = build_sim(**config)
+        summary = run(sim, ticks, out=args.out, flush_every=args.flush_every,
+                      time_budget=args.time_budget, progress=args.progress,
+                      before_step=replayer)
+
+    solver = sim.solver or "greedy"
+    print(f"✅ {summary['ticks']} ticks ({solver}, {len(sim.clients)} users, {len(sim.aps)} APs) "
+          f"in {summary['seconds']} s → {summary['ticks_per_sec']} ticks/s, "
+          f"{summary['simulated_seconds']} s simulated (×{summary['speedup']} real time)")
+    print(f"   step p50 {summary['step_ms_p50']} ms   mean overloaded APs "
+          f"{summary['mean_overloaded_aps']}   mean disconnected {summary['mean_disconnected']}")
+    if replayer is not None and replayer.errors:
+        print(f"⚠️ {len(replayer.errors)} recorded command runs failed again: {replayer.errors[:3]}")
+    if args.out is not None:
+        print(f"📁 KPIs → {args.out}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import asyncio
+import time
+
+MAX_CATCH_UP = 5   # ticks per wake-up when catching up
+
+
+class FixedRate:
+    """
+    Deadline-based fixed timestep: tick k is due at start + k / hz, so the
+    rate doesn't drift with how long each tick takes.
+
+    When a tick starts a whole period (or more) late:
+      • "drop"     → missed ticks are skipped, the schedule keeps its phase
+      • "catch_up" → up to MAX_CATCH_UP ticks run back-to-back, the rest
+                     are skipped
+
+    due() is for asyncio loops, wait() for a plain thread / process.
+    remaining() is the slack left before the next deadline (the budget an
+    anytime solver may use this tick).
+    """
+
+    def __init__(self, name, hz, policy="drop", max_catch_up=MAX_CATCH_UP):
+        self.name = name
+        self.hz = hz
+        self.period = 1.0 / hz
+        self.policy = policy
+        self.max_catch_up = max_catch_up
+
+        self.next = None
+        self.ticks = 0
+        self.overruns = 0       # wake-ups that were ≥ 1 period late
+        self.skipped = 0        # ticks dropped
+        self.caught_up = 0      # extra ticks run to catch up
+        self.max_lag = 0.0
+        self.busy = 0.0         # EWMA of time spent per wake-up
+        self._woke = None
+
+    async def due(self):
+        """Sleep until the next deadline; return how many ticks to run now."""
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return self._advance()
+
+    def wait(self):
+        """Blocking due()."""
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        return self._advance()
+
+    def remaining(self):
+        """Seconds until the next tick is due (0 when already late)."""
+        if self.next is None:
+            return self.period
+        return max(0.0, self.next - time.perf_counter())
+
+    def _delay(self):
+        now = time.perf_counter()
+        if self._woke is not None:
+            self.busy = 0.9 * self.busy + 0.1 * (now - self._woke)
+        if self.next is None:
+            self.next = now
+        return self.next - now
+
+    def _advance(self):
+        now = time.perf_counter()
+        lag = max(0.0, now - self.next)
+        self.max_lag = max(self.max_lag, lag)
+        missed = int(lag // self.period)
+
+        n = 1
+        if missed:
+            self.overruns += 1
+            if self.policy == "catch_up":
+                n = min(1 + missed, self.max_catch_up)
+                self.caught_up += n - 1
+            self.skipped += 1 + missed - n
+
+        self.next += (1 + missed) * self.period
+        self.ticks += n
+        self._woke = now
+        return n
+
+    def stats(self):
+        return {
+            "hz": self.hz,
+            "policy": self.policy,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "caught_up": self.caught_up,
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+            "busy_ms": round(self.busy * 1000, 2),
+            "utilization": round(self.busy / self.period, 3),
+        }
@@ -1,10 +1,19 @@
 import json
 import math
 import random
+import time
 from pathlib import Path
 
+import numpy as np
+
+from algorithms.auction import AuctionEngine
+from algorithms.cost_function import CAPACITY_ALPHA, W
 from algorithms.mcmf import MCMFEngine
 from algorithms.greedy_redistribution import GreedyRedistributor
+from algorithms.spatial_index import APGrid
+from .layout import CampusLayout
+from .rssi_engine import RSSIEngine
+from .state_store import INT_NONE, APTable, ClientTable, group_rows
 
 # ----------------------------------------------------------------------
 # PATHS - Correct for your project structure
@@ -24,8 +33,65 @@ LAYOUT_PATH = ROOT_DIR / "frontend" / "data" / "campus_layout.json"
 USE_MCMF = False
 
 # If you ever enable MCMF, we also cap how often and how many users.
-MCMF_MAX_USERS = 120         # don't run MCMF above this count
+# The in-house "ssp" solver handles ~5k users inside one 200 ms tick;
+# "networkx" is the slow reference and should stay around ~120 users.
+MCMF_SOLVER = "ssp"
+MCMF_MAX_USERS = 5000        # don't run MCMF above this count
 MCMF_EVERY_N_TICKS = 10      # run at most once every N ticks
+MCMF_INCREMENTAL = True      # warm-start each solve from the previous flow
+
+# Anytime auction solver: uses whatever slack is left in the tick
+# (step(time_budget=...), the live loops pass FixedRate.remaining())
+# and always returns a valid assignment.
+USE_AUCTION = False
+AUCTION_TIME_BUDGET = 0.05   # seconds, when step() isn't given a budget
+
+# Walking: speed range (px/tick) and per-tick chance of a new heading
+SPEED_MIN, SPEED_MAX = 1, 2
+TURN_CHANCE = 0.05
+
+# Hard cap on users per floor (add_user / add_users)
+MAX_FLOOR_CAP = 90
+
+# Per-instance tuning: WifiSimulator(config={...}) overrides any subset,
+# dict values key by key (e.g. {"weights": {"load": 0.9}}).  Nothing is
+# read from module globals after __init__, so instances with different
+# configs can share a process (see simulation.sweep).
+DEFAULT_CONFIG = {
+    "weights": dict(W),                 # cost_function.W
+    "capacity_alpha": CAPACITY_ALPHA,   # dynamic_capacity() boost
+    "load_decay": 0.82,                 # load retains 82% of previous value each tick
+    "load_gain_weight": 0.40,           # 40% from new user airtime
+    "band_coverage": {
+        "2.4": 800,   # massive campus coverage
+        "5":   320,   # moderate
+        "6":   120,   # tiny
+    },
+    "band_pathloss": {
+        "2.4": 20,
+        "5":   22,
+        "6":   24,
+    },
+    "mcmf_workers": None,               # MCMFEngine(workers=...), 1 = solve floors inline
+}
+
+
+def make_config(overrides=None):
+    """DEFAULT_CONFIG with `overrides` merged in (fresh dicts, never shared)."""
+    config = {k: dict(v) if isinstance(v, dict) else v for k, v in DEFAULT_CONFIG.items()}
+    for key, value in (overrides or {}).items():
+        if key not in config:
+            raise ValueError(f"unknown config key {key!r} (expected one of {sorted(config)})")
+        if isinstance(config[key], dict):
+            if not isinstance(value, dict):
+                raise ValueError(f"config {key!r} must be a dict")
+            unknown = set(value) - set(config[key])
+            if unknown:
+                raise ValueError(f"unknown {key} entries {sorted(unknown)}")
+            config[key].update(value)
+        else:
+            config[key] = value
+    return config
 
 
 # ----------------------------------------------------------------------
@@ -49,6 +115,21 @@ def safe_int(v, default=0) -> int:
     return int(default)
 
 
+def _clamp_load(load, high):
+    """max(0, min(load, high)) over an array (NaN → 0, like the scalar form)."""
+    return np.where(np.isnan(load), 0.0, np.clip(load, 0, high))
+
+
+def _floats(col):
+    """safe_float() over a column → list of floats."""
+    return np.where(np.isfinite(col), col, 0.0).tolist()
+
+
+def _ints(col):
+    """safe_int() over a column → list of ints."""
+    return np.where(np.isfinite(col), np.trunc(col), 0).astype(np.int64).tolist()
+
+
 class WifiSimulator:
     """
     WiFi Load Balancing Simulator - STABLE VERSION (NON-BLOCKING)
@@ -61,38 +142,61 @@ class WifiSimulator:
     ✅ Step() is LIGHT and deterministic → no more freezing
     """
 
-    def __init__(self):
+    def __init__(self, aps=None, users=None, floors=None, seed=None, solver=None, config=None):
+        """
+        Data defaults to data/aps.json, data/users.json and the frontend
+        campus layout; pass lists (e.g. a synthetic campus) to override.
+        `seed` fixes every random draw (see also simulation.replay).  `solver` ("greedy" | "mcmf" |
+        "auction") overrides the USE_MCMF / USE_AUCTION flags.  `config`
+        overrides DEFAULT_CONFIG (cost weights, load smoothing, bands).
+        """
         print(">>> Simulator file active:", __file__)
 
         # Load data
-        with open(DATA_DIR / "aps.json", "r") as f:
-            self.aps = json.load(f)
-
-        with open(DATA_DIR / "users.json", "r") as f:
-            self.clients = json.load(f)
-
-        with open(LAYOUT_PATH, "r") as f:
-            layout = json.load(f)
-        self.campus_layout = layout["floors"]
+        if aps is None:
+            with open(DATA_DIR / "aps.json", "r") as f:
+                aps = json.load(f)
+        self.aps = aps
+
+        if users is None:
+            with open(DATA_DIR / "users.json", "r") as f:
+                users = json.load(f)
+        self.clients = users
+
+        if floors is None:
+            with open(LAYOUT_PATH, "r") as f:
+                floors = json.load(f)["floors"]
+        self.campus_layout = floors
+        self.layout = CampusLayout(floors)   # offsets, room / spawn tables, built once
+        self.rooms = self.layout.rooms
+
+        # Every random draw goes through these two, so a seed fixes the run
+        self.seed = seed
+        self.random = random.Random(seed)         # per-user draws (spawn, reset, removal)
+        self.rng = np.random.default_rng(seed)    # vectorized draws (movement)
 
         # State tracking
         self.assignments = {}
+        self.mcmf_state = {}      # per-floor warm start for MCMFEngine
+        self.mcmf_report = {}     # work done by the last MCMF solve
+        self.auction_report = {}  # phases / ε / gap of the last auction
+        self.greedy_report = {}   # moves / overloaded APs of the last greedy pass
+        self.phase_times = {}     # seconds per phase of the last step()
         self.ap_alarms = []
         self._ap_alarm_memory = set()
         self.tick = 0
         self.ready = False
+        self.solver = solver
         self.current_band = "5"  # default
-        
-        self.band_coverage = {
-            "2.4": 800,   # massive campus coverage
-            "5":   320,   # moderate
-            "6":   120,   # tiny
-        }
-        self.band_pathloss = {
-            "2.4": 20,
-            "5":   22,
-            "6":   24,
-        }
+
+        self.config = make_config(config)
+        self.weights = self.config["weights"]
+        self.capacity_alpha = self.config["capacity_alpha"]
+        self.band_coverage = self.config["band_coverage"]
+        self.band_pathloss = self.config["band_pathloss"]
+        self.rssi_engine = RSSIEngine(self.band_coverage, self.band_pathloss)
+        self._ap_index = None
+        self._ap_index_key = None
 
         # Initialize AP fields
         for ap in self.aps:
@@ -104,14 +208,18 @@ class WifiSimulator:
 
         # Initialize user fields
         for user in self.clients:
-            user.setdefault("vx", random.uniform(-1, 1))
-            user.setdefault("vy", random.uniform(-1, 1))
+            user.setdefault("vx", self.random.uniform(-1, 1))
+            user.setdefault("vy", self.random.uniform(-1, 1))
             user.setdefault("nearest_ap", None)
             user.setdefault("assigned_ap", user.get("connected_ap"))
             user.setdefault("connected_ap", user.get("assigned_ap"))
             user.setdefault("airtime_usage", user.get("airtime_usage", 1))
             user.setdefault("RSSI", user.get("RSSI", -95))
-            
+
+        # Struct-of-arrays storage; rows still read/write like the dicts above
+        self.aps = APTable(self.aps)
+        self.clients = ClientTable(self.clients, ap_ids=self.aps.ap_ids)
+
         from .ap_killer import APKiller
         self.ap_killer = APKiller(self)
 
@@ -124,110 +232,77 @@ class WifiSimulator:
     # ====================================================================
     def get_user_room_bounds(self, user):
         """Return safe bounding box for user's current room."""
-        floor_level = user.get("floor")
-        room_name = user.get("room")
-
-        floor = next(
-            (f for f in self.campus_layout if f["level"] == floor_level),
-            None
-        )
-        if not floor:
-            return None
-
-        room = next(
-            (r for r in floor["rooms"]
-             if r["name"].lower() == str(room_name).lower()),
-            None
-        )
-        if not room:
-            return None
-
-        return {
-            "x1": room["x"],
-            "y1": room["y"],
-            "x2": room["x"] + room["width"],
-            "y2": room["y"] + room["height"],
-        }
+        rid = self.rooms.find(user.get("floor"), user.get("room"))
+        return self.rooms.bounds(rid) if rid >= 0 else None
 
     # ====================================================================
     # USER MOVEMENT - NaN-proof, room-bounded
     # ====================================================================
     def move_users(self):
-        """Move users with full validation and bounce physics."""
-        BASE_MIN, BASE_MAX = 1, 2
-
-        for user in self.clients:
-            bounds = self.get_user_room_bounds(user)
+        """
+        Move users with full validation and bounce physics, all users in
+        one NumPy pass over the client columns.
+        """
+        clients, rooms, rng = self.clients, self.rooms, self.rng
+        n = len(clients)
+        if not n:
+            return
 
-            # Reset if room invalid
-            if not bounds:
-                self._reset_user_position(user)
-                continue
+        rid = rooms.ids(clients.col("floor"), clients.col("room"), clients.pools["room"])
 
-            # Validate coordinates
-            if not self._validate_coordinates(user):
-                user["x"] = (bounds["x1"] + bounds["x2"]) / 2
-                user["y"] = (bounds["y1"] + bounds["y2"]) / 2
-
-            # Validate velocity
-            if not self._validate_velocity(user):
-                ang = random.random() * 2 * math.pi
-                spd = random.uniform(BASE_MIN, BASE_MAX)
-                user["vx"] = math.cos(ang) * spd
-                user["vy"] = math.sin(ang) * spd
-
-            # Random direction change (5% chance)
-            if random.random() < 0.05:
-                ang = random.random() * 2 * math.pi
-                spd = random.uniform(BASE_MIN, BASE_MAX)
-                user["vx"] = math.cos(ang) * spd
-                user["vy"] = math.sin(ang) * spd
-
-            # Calculate next position
-            nx = safe_float(user["x"] + user["vx"])
-            ny = safe_float(user["y"] + user["vy"])
-
-            # Bounce off walls
-            if nx <= bounds["x1"] or nx >= bounds["x2"]:
-                user["vx"] *= -1
-                nx = max(bounds["x1"] + 1, min(bounds["x2"] - 1, nx))
-
-            if ny <= bounds["y1"] or ny >= bounds["y2"]:
-                user["vy"] *= -1
-                ny = max(bounds["y1"] + 1, min(bounds["y2"] - 1, ny))
-
-            user["x"], user["y"] = nx, ny
-
-    def _validate_coordinates(self, user):
-        """Check if coordinates are valid numbers."""
-        x, y = user.get("x"), user.get("y")
-        return (
-            isinstance(x, (int, float)) and isinstance(y, (int, float))
-            and math.isfinite(x) and math.isfinite(y)
-        )
+        # Reset if room invalid (rare; those users skip this tick's move)
+        lost = np.flatnonzero(rid < 0)
+        for row in lost.tolist():
+            self._reset_user_position(clients[row])
+        ok = rid >= 0 if len(lost) else slice(None)
+        rid = rid[ok]
+        m = len(rid)
+        if not m:
+            return
 
-    def _validate_velocity(self, user):
-        """Check if velocity is valid."""
-        vx, vy = user.get("vx", 0), user.get("vy", 0)
-        return (
-            isinstance(vx, (int, float)) and isinstance(vy, (int, float))
-            and math.isfinite(vx) and math.isfinite(vy)
-        )
+        x_col, y_col = clients.col("x"), clients.col("y")
+        vx_col, vy_col = clients.col("vx"), clients.col("vy")
+        x, y, vx, vy = x_col[ok], y_col[ok], vx_col[ok], vy_col[ok]
+        x1, y1, x2, y2 = rooms.x1[rid], rooms.y1[rid], rooms.x2[rid], rooms.y2[rid]
+
+        # Validate coordinates → room centre
+        bad = ~(np.isfinite(x) & np.isfinite(y))
+        if bad.any():
+            x[bad] = (x1[bad] + x2[bad]) / 2
+            y[bad] = (y1[bad] + y2[bad]) / 2
+
+        # Invalid velocity or random direction change → new heading
+        turn = ~(np.isfinite(vx) & np.isfinite(vy)) | (rng.random(m) < TURN_CHANCE)
+        k = int(turn.sum())
+        if k:
+            ang = rng.random(k) * (2 * math.pi)
+            spd = rng.uniform(SPEED_MIN, SPEED_MAX, k)
+            vx[turn] = np.cos(ang) * spd
+            vy[turn] = np.sin(ang) * spd
+
+        # Calculate next position (non-finite → 0, like safe_float)
+        nx = np.nan_to_num(x + vx, nan=0.0, posinf=0.0, neginf=0.0)
+        ny = np.nan_to_num(y + vy, nan=0.0, posinf=0.0, neginf=0.0)
+
+        # Bounce off walls
+        hit = (nx <= x1) | (nx >= x2)
+        vx[hit] *= -1
+        nx[hit] = np.maximum(x1[hit] + 1, np.minimum(x2[hit] - 1, nx[hit]))
+
+        hit = (ny <= y1) | (ny >= y2)
+        vy[hit] *= -1
+        ny[hit] = np.maximum(y1[hit] + 1, np.minimum(y2[hit] - 1, ny[hit]))
+
+        x_col[ok], y_col[ok] = nx, ny
+        vx_col[ok], vy_col[ok] = vx, vy
 
     def _reset_user_position(self, user):
         """Reset user to center of a valid spawnable room on their floor."""
-        floor_rooms = [
-            r for f in self.campus_layout
-            if f["level"] == user.get("floor")
-            for r in f["rooms"]
-        ]
+        floor_rooms = self.layout.rooms_on(user.get("floor"))
         if floor_rooms:
             # Prefer non-corridor, non-staircase rooms
-            spawnable = self._filter_spawn_rooms(floor_rooms)
-            if not spawnable:
-                spawnable = floor_rooms
-
-            r = random.choice(spawnable)
+            spawn = self.layout.spawn(user.get("floor"))
+            r = self.random.choice(spawn.rooms if spawn else floor_rooms)
             user["x"] = r["x"] + r["width"] / 2
             user["y"] = r["y"] + r["height"] / 2
             user["room"] = r["name"]
@@ -244,69 +319,41 @@ class WifiSimulator:
             return -95
         return max(-95, min(-40, rssi))
 
-    def update_rssi(self):
-        """Update RSSI for all users - band-restricted with disconnection."""
-        for user in self.clients:
-            u_floor = user.get("floor")
-
-            # APs on same floor
-            floor_aps = [ap for ap in self.aps if ap["floor"] == u_floor]
+    # ====================================================================
+    # BAND + AP SPATIAL INDEX
+    # ====================================================================
+    def set_band(self, band):
+        """Switch band globally: every AP gets the band + its coverage."""
+        self.current_band = band
+        for ap in self.aps:
+            ap["band"] = band
+            ap["coverage_radius"] = self.band_coverage[band]
+        self._ap_index = None
 
-            if not floor_aps:
-                # 🔥 DISCONNECTION: floor has no APs
-                user["nearest_ap"] = None
-                user["connected_ap"] = None
-                user["assigned_ap"] = None
-                user["RSSI"] = -95
-                continue
+    def get_ap_index(self):
+        """
+        APGrid over self.aps, cell size = current band coverage.
+        Rebuilt lazily when the band or the AP list changes.
+        """
+        key = (self.current_band, id(self.aps), len(self.aps))
+        if self._ap_index is None or self._ap_index_key != key:
+            cell = self.band_coverage.get(self.current_band, 200)
+            self._ap_index = APGrid(self.aps, cell)
+            self._ap_index_key = key
+        return self._ap_index
 
-            best_ap = None
-            best_rssi = -95
-
-            # --------------------------------------------------------------
-            # BAND-DEPENDENT COVERAGE + BAND-DEPENDENT RSSI
-            # --------------------------------------------------------------
-            for ap in floor_aps:
-                try:
-                    dist = math.dist(
-                        (safe_float(user["x"]), safe_float(user["y"])),
-                        (safe_float(ap["x"]), safe_float(ap["y"]))
-                    )
-                except Exception:
-                    continue
-
-                # ❗ Disconnect user if outside CURRENT BAND range
-                if dist > self.band_coverage[self.current_band]:
-                    continue
-
-                band = ap.get("band", self.current_band)
-                loss = self.band_pathloss.get(band, 22)
-
-                rssi = -30 - loss * math.log10(max(dist, 1e-3))
-                rssi = max(-95, min(-40, rssi))
-
-                if rssi > best_rssi:
-                    best_rssi = rssi
-                    best_ap = ap["id"]
-
-            # --------------------------------------------------------------
-            # 🛑 DISCONNECTION ZONE
-            # If NO AP in band range → user disappears
-            # --------------------------------------------------------------
-            if best_ap is None:
-                user["nearest_ap"] = None
-                user["connected_ap"] = None
-                user["assigned_ap"] = None
-                user["RSSI"] = -95
-                continue
+    def update_rssi(self):
+        """
+        Update RSSI for all users - band-restricted with disconnection.
 
-            # --------------------------------------------------------------
-            # ✅ RECONNECTION ZONE (user visible again)
-            # --------------------------------------------------------------
-            user["nearest_ap"] = best_ap
-            user["assigned_ap"] = best_ap      # ← YOU MUST HAVE THIS
-            user["connected_ap"] = best_ap     # ← AND THIS
-            user["RSSI"] = int(best_rssi)
+        Batched per floor through RSSIEngine:
+        - users outside the CURRENT BAND range of every same-floor AP are
+          disconnected (nearest/assigned/connected → None, RSSI → -95)
+        - everyone else snaps to the strongest AP (band-dependent path loss)
+        """
+        self.rssi_engine.update_users(
+            self.clients, self.aps, self.current_band, grid=self.get_ap_index()
+        )
 
 
     # ====================================================================
@@ -316,20 +363,11 @@ class WifiSimulator:
         """Calculate AP loads and generate alarms (debounced)."""
         self.ap_alarms = []
 
-        # Reset counts
-        for ap in self.aps:
-            ap["user_count"] = 0
-
         # Count only users truly connected under NEW BAND CONDITIONS
-        for user in self.clients:
-            ap_id = user.get("assigned_ap")      # ← NO FALLBACK
-            if not ap_id:
-                continue                         # user dropped due to band
-
-            for ap in self.aps:
-                if ap["id"] == ap_id:
-                    ap["user_count"] += 1
-                    break
+        # (assigned_ap only, NO FALLBACK — dropped users have no AP row)
+        rows = self.aps.rows_for(self.clients.col("assigned_ap"))
+        counts = np.bincount(rows[rows >= 0], minlength=len(self.aps))
+        self.aps.col("user_count")[:] = counts
 
 
     # ====================================================================
@@ -351,62 +389,70 @@ class WifiSimulator:
         for ap in self.aps:
             if ap["user_count"] > ap["max_users"]:
                 print(f"⚠️ AP {ap['id']} overloaded before MCMF, using greedy fallback")
-                GreedyRedistributor(self.aps, self.clients).redistribute()
+                GreedyRedistributor(self.aps, self.clients, alpha=self.capacity_alpha).redistribute()
                 return
 
         # 2. Run MCMF
         try:
-            assignments = MCMFEngine(self.clients, self.aps).run()
+            engine = MCMFEngine(
+                self.clients, self.aps,
+                solver=MCMF_SOLVER,
+                workers=self.config["mcmf_workers"],
+                warm_state=self.mcmf_state if MCMF_INCREMENTAL else None,
+                weights=self.weights, alpha=self.capacity_alpha,
+            )
+            assignments = engine.run()
+            self.mcmf_state = engine.state
+            self.mcmf_report = engine.report
         except Exception as e:
             print(f"⚠️ MCMF failed, using greedy: {e}")
-            GreedyRedistributor(self.aps, self.clients).redistribute()
+            GreedyRedistributor(self.aps, self.clients, alpha=self.capacity_alpha).redistribute()
             assignments = {u["id"]: u.get("nearest_ap") for u in self.clients}
+            self.mcmf_state = {}
 
-        self.assignments = assignments
-
-        # -----------------------------
-        # 3. SMOOTH LOAD UPDATE LOGIC
-        # -----------------------------
-        LOAD_DECAY = 0.82      # load retains 82% of previous value each tick
-        LOAD_GAIN_WEIGHT = 0.40  # 40% from new user airtime
-
-        # Reset connected clients list (NOT load)
-        for ap in self.aps:
-            ap["connected_clients"] = []
-
-        # Compute new raw load
-        new_loads = {ap["id"]: 0 for ap in self.aps}
-
-        for user in self.clients:
-            uid = user["id"]
-            aid = assignments.get(uid)
-
-            user["assigned_ap"] = aid
-            user["connected_ap"] = aid
-
-            if not aid:
-                continue
+        # 3. Apply + smooth loads
+        self._apply_assignments(assignments)
 
-            new_loads[aid] += user.get("airtime_usage", 1)
+    # ====================================================================
+    # ANYTIME AUCTION (DEADLINE-BOUNDED)
+    # ====================================================================
+    def apply_auction(self, time_budget=None):
+        """
+        ε-scaling auction assignment that never overruns its time budget.
+        - Returns the best complete assignment reached before the deadline
+        - Optimality gap bound + phases land in self.auction_report
+        - Same load smoothing as MCMF
+        """
+        budget = AUCTION_TIME_BUDGET if time_budget is None else time_budget
 
-        # Apply load smoothing
-        for ap in self.aps:
-            ap_id = ap["id"]
-            prev_load = ap.get("load", 0)
+        try:
+            engine = AuctionEngine(self.clients, self.aps, time_budget=budget,
+                                   weights=self.weights, alpha=self.capacity_alpha)
+            assignments = engine.run()
+            self.auction_report = engine.report
+        except Exception as e:
+            print(f"⚠️ Auction failed, using greedy: {e}")
+            self.apply_greedy()
+            return
 
-            # new instantaneous load
-            instant_load = new_loads.get(ap_id, 0)
+        self._apply_assignments(assignments)
 
-            # smoothed real load (enterprise WiFi-style)
-            smoothed = prev_load * LOAD_DECAY + instant_load * LOAD_GAIN_WEIGHT
+    def _apply_assignments(self, assignments):
+        """Write solver assignments back to users + smoothed AP loads."""
+        self.assignments = assignments
+        clients = self.clients
 
-            # hard clamp to 0–100 range
-            ap["load"] = max(0, min(smoothed, 100))
+        # assigned_ap / connected_ap columns in one pass over the ids
+        code = clients.ap_ids.code
+        refs = np.fromiter((code(assignments.get(uid)) for uid in clients.ids()),
+                           dtype=np.int32, count=len(clients))
+        clients.col("assigned_ap")[:] = refs
+        clients.col("connected_ap")[:] = refs
 
-            # update connected clients list
-            for user in self.clients:
-                if user["assigned_ap"] == ap_id:
-                    ap["connected_clients"].append(user["id"])
+        # -----------------------------
+        # SMOOTH LOAD UPDATE LOGIC
+        # -----------------------------
+        self._smooth_loads(self.aps.rows_for(refs), np.arange(len(clients)))
 
     def _is_user_in_band(self, user) -> bool:
         """
@@ -424,186 +470,227 @@ class WifiSimulator:
         - Only IN-BAND users (by current_band) are considered
         - Load decays slowly (enterprise-style smoothing)
         """
+        clients, aps = self.clients, self.aps
 
-        # ✅ 1. Restrict to in-band users only
-        active_users = [u for u in self.clients if u.get("nearest_ap")]
+        # ✅ 1. Restrict to in-band users only (rows with a nearest AP)
+        active = np.flatnonzero(clients.col("nearest_ap") >= 0)
 
         # If nobody is in range, just decay loads and bail
-        if not active_users:
-            LOAD_DECAY = 0.82
-            for ap in self.aps:
-                ap["load"] = max(0, ap.get("load", 0) * LOAD_DECAY)
+        if not len(active):
+            decay = self.config["load_decay"]
+            aps.col("load")[:] = _clamp_load(aps.col("load") * decay, math.inf)
+            for ap in aps:
                 ap["connected_clients"] = []
+            self.greedy_report = {"moves": 0, "overloaded": 0}
             return
 
         # ✅ 2. Run greedy ONLY on in-band users
-        GreedyRedistributor(self.aps, active_users).redistribute()
+        greedy = GreedyRedistributor(aps, clients, self.get_ap_index(),
+                                     alpha=self.capacity_alpha, rows=active)
+        greedy.redistribute()
+        self.greedy_report = {"moves": greedy.moves, "overloaded": greedy.overloaded}
 
         # After greedy.assignments:
-        for user in active_users:
-            ap_id = user.get("assigned_ap")
-            if ap_id:
-                user["connected_ap"] = ap_id
-
-        # ✅ 3. Prepare smoother load logic
-        LOAD_DECAY = 0.82          # 82% of previous load kept each tick
-        LOAD_GAIN_WEIGHT = 0.40    # 40% from new instantaneous load
-
-        # Count new instantaneous load
-        new_loads = {ap["id"]: 0 for ap in self.aps}
-
-        for user in active_users:
-            aid = user.get("assigned_ap")
-            if not aid:
-                continue
-            new_loads[aid] += user.get("airtime_usage", 1)
-
-        # Apply smoothing & update lists
-        for ap in self.aps:
-            ap_id = ap["id"]
-            prev_load = ap.get("load", 0)
-            instant_load = new_loads.get(ap_id, 0)
+        assigned = clients.col("assigned_ap")[active]
+        linked = active[assigned >= 0]
+        clients.col("connected_ap")[linked] = clients.col("assigned_ap")[linked]
 
-            smoothed = prev_load * LOAD_DECAY + instant_load * LOAD_GAIN_WEIGHT
+        # ✅ 3. Smooth loads: raw load from assigned users, connected lists
+        #    keyed by assigned AP (nearest as fallback)
+        nearest = clients.col("nearest_ap")[active]
+        self._smooth_loads(aps.rows_for(assigned), active,
+                           connected=aps.rows_for(np.where(assigned >= 0, assigned, nearest)))
 
-            ap["load"] = max(0, min(smoothed, 100))
+    def _smooth_loads(self, ap_rows, rows, connected=None):
+        """
+        load ← clamp(load · decay + new raw load · gain, 0, 100) for every AP
+        and connected_clients ← user ids, from client `rows` and the AP row
+        each one counts for (`ap_rows`, -1 = none; `connected` lists them
+        under another AP row, default the same).
+        """
+        clients, aps = self.clients, self.aps
+        decay = self.config["load_decay"]
+        gain = self.config["load_gain_weight"]
 
-            ap["connected_clients"] = [
-                u["id"]
-                for u in active_users
-                if (u.get("assigned_ap") or u.get("nearest_ap")) == ap_id
-            ]
+        counted = ap_rows >= 0
+        instant = np.bincount(ap_rows[counted], weights=clients.col("airtime_usage")[rows[counted]],
+                              minlength=len(aps))
+        members = group_rows(ap_rows if connected is None else connected, rows)
 
+        # APs sharing an id share its load and list, like the old id-keyed dicts
+        first = aps.rows_for(aps.codes())
+        load = aps.col("load")
+        load[:] = _clamp_load(load * decay + instant[first] * gain, 100)
 
+        ids = clients.ids()
+        for ap, row in zip(aps, first.tolist()):
+            users = members.get(row)
+            ap["connected_clients"] = [] if users is None else [ids[r] for r in users.tolist()]
 
     # ====================================================================
     # ADD/REMOVE USERS (FLOOR-SAFE, NO CORRIDOR/STAIRCASE SPAWN)
     # ====================================================================
-    def _filter_spawn_rooms(self, rooms):
+    def add_user_to_floor(self, floor: int):
+        """Add user to specified floor with capacity & spawn-room checks."""
+        self.add_users({floor: 1})
+
+    def add_users(self, counts):
         """
-        Filter out corridors, staircases, tiny rooms etc to avoid weird geometry.
+        Batched add_user_to_floor: counts = {floor: n}.  Floor occupancy
+        is counted once for the whole batch; each floor is capped at
+        MAX_FLOOR_CAP.  Returns {floor: users actually added}.
         """
-        block_tokens = ["corridor", "stair", "lift", "toilet", "washroom", "wc"]
-        valid = []
-        for r in rooms:
-            name = r["name"].lower()
-            if any(tok in name for tok in block_tokens):
-                continue
-            if r["width"] < 25 or r["height"] < 25:
+        levels, occupied = np.unique(self.clients.col("floor"), return_counts=True)
+        occupancy = {int(f): int(c) for f, c in zip(levels, occupied)}
+        added = {}
+
+        for floor, n in counts.items():
+            if not self.layout.rooms_on(floor):
+                print(f"⚠️ No rooms on floor {floor}")
                 continue
-            valid.append(r)
-        return valid
 
-    def add_user_to_floor(self, floor: int):
-        """Add user to specified floor with capacity & spawn-room checks."""
-        # All rooms on this floor
-        rooms = [
-            r for f in self.campus_layout
-            if f["level"] == floor
-            for r in f["rooms"]
-        ]
-        if not rooms:
-            print(f"⚠️ No rooms on floor {floor}")
-            return
+            # Spawnable rooms (no corridor/staircase, min size)
+            spawn = self.layout.spawn(floor)
+            if spawn is None:
+                print(f"⚠️ No valid spawn rooms on floor {floor}")
+                continue
 
-        # Filter to spawnable rooms (no corridor/staircase, min size)
-        spawn_rooms = self._filter_spawn_rooms(rooms)
-        if not spawn_rooms:
-            print(f"⚠️ No valid spawn rooms on floor {floor}")
-            return
+            # Check floor capacity (simple hard cap)
+            users_on_floor = occupancy.get(floor, 0)
+            k = min(n, MAX_FLOOR_CAP - users_on_floor)
+            if k <= 0:
+                print(f"⚠️ Floor {floor} at capacity ({users_on_floor}/{MAX_FLOOR_CAP})")
+                continue
 
-        # Check floor capacity (simple hard cap)
-        users_on_floor = sum(1 for u in self.clients if u.get("floor") == floor)
-        MAX_FLOOR_CAP = 90
-        if users_on_floor >= MAX_FLOOR_CAP:
-            print(f"⚠️ Floor {floor} at capacity ({users_on_floor}/{MAX_FLOOR_CAP})")
-            return
+            for _ in range(k):
+                new_user = self._new_user(floor, spawn)
+                self.clients.append(new_user)
+            occupancy[floor] = users_on_floor + k
+            added[floor] = k
 
-        room = random.choice(spawn_rooms)
+            if n == 1:
+                print(f"✅ Added user {new_user['id']} in {new_user['room']} on floor {floor}")
+            else:
+                print(f"✅ Added {k}/{n} users on floor {floor}")
+        return added
 
-        # Safe position within room
-        x1, y1 = room["x"] + 5, room["y"] + 5
-        x2 = room["x"] + room["width"] - 5
-        y2 = room["y"] + room["height"] - 5
+    def _new_user(self, floor, spawn):
+        # Random spawnable room, safe position within it
+        i = self.random.randrange(len(spawn))
 
-        new_user = {
-            "id": f"User_{random.randint(100000, 999999)}",
+        return {
+            "id": f"User_{self.random.randint(100000, 999999)}",
             "floor": floor,
-            "room": room["name"],
-            "x": random.uniform(x1, x2),
-            "y": random.uniform(y1, y2),
-            "vx": random.uniform(-1, 1),
-            "vy": random.uniform(-1, 1),
-            "airtime_usage": random.randint(1, 5),
+            "room": spawn.names[i],
+            "x": self.random.uniform(spawn.x1.item(i), spawn.x2.item(i)),
+            "y": self.random.uniform(spawn.y1.item(i), spawn.y2.item(i)),
+            "vx": self.random.uniform(-1, 1),
+            "vy": self.random.uniform(-1, 1),
+            "airtime_usage": self.random.randint(1, 5),
             "nearest_ap": None,
             "assigned_ap": None,
             "connected_ap": None,
             "RSSI": -95,
         }
 
-        self.clients.append(new_user)
-        print(f"✅ Added user {new_user['id']} in {room['name']} on floor {floor}")
-
     def remove_user_from_floor(self, floor: int):
         """Remove random user from specified floor."""
-        users_on_floor = [u for u in self.clients if u.get("floor") == floor]
-
-        if not users_on_floor:
-            print(f"⚠️ No users on floor {floor}")
-            return
+        self.remove_users({floor: 1})
 
-        user = random.choice(users_on_floor)
-        user_id = user["id"]
+    def remove_users(self, counts):
+        """
+        Batched remove_user_from_floor: counts = {floor: n} random users.
+        Assignments and AP lists are cleaned up in one pass over the APs.
+        Returns {floor: users actually removed}.
+        """
+        floors = self.clients.col("floor")
+        picked, removed, notes = [], {}, []
+        for floor, n in counts.items():
+            rows = np.flatnonzero(floors == floor).tolist()
+            if not rows:
+                print(f"⚠️ No users on floor {floor}")
+                continue
+            rows = [self.random.choice(rows)] if n == 1 else self.random.sample(rows, min(n, len(rows)))
+            picked.extend(self.clients[r] for r in rows)
+            removed[floor] = len(rows)
+            if n == 1:
+                notes.append(f"✅ Removed user {picked[-1]['id']} from floor {floor}")
+            else:
+                notes.append(f"✅ Removed {len(rows)}/{n} users from floor {floor}")
+        if not picked:
+            return removed
 
-        # Clean up all references
-        try:
+        # Record views follow their row through swap-removes
+        airtime = {u["id"]: u.get("airtime_usage", 1) for u in picked}
+        for user in picked:
             self.clients.remove(user)
 
-            # Remove from assignments
+        # Clean up all references
+        for user_id in airtime:
             self.assignments.pop(user_id, None)
+        for ap in self.aps:
+            connected = ap.get("connected_clients", [])
+            gone = [uid for uid in connected if uid in airtime]
+            if gone:
+                ap["connected_clients"] = [uid for uid in connected if uid not in airtime]
+                ap["load"] = max(0, ap["load"] - sum(airtime[uid] for uid in gone))
 
-            # Remove from AP lists
-            for ap in self.aps:
-                if user_id in ap.get("connected_clients", []):
-                    ap["connected_clients"].remove(user_id)
-                    ap["load"] = max(
-                        0,
-                        ap["load"] - user.get("airtime_usage", 1)
-                    )
-
-            print(f"✅ Removed user {user_id} from floor {floor}")
-
-        except ValueError:
-            print(f"⚠️ User {user_id} already removed")
+        for note in notes:
+            print(note)
+        return removed
 
     # ====================================================================
     # MAIN TICK LOOP  🔥 NO-BLOCKING VERSION
     # ====================================================================
-    def step(self):
+    def step(self, time_budget=None):
         """
         Execute one simulation step.
 
         IMPORTANT:
         - Always lightweight for the realtime loop.
         - For the live WebSocket viz, we *always* run greedy.
-        - MCMF is reserved for offline / controlled use (USE_MCMF flag).
+        - MCMF is reserved for offline / controlled use (USE_MCMF flag,
+          or solver="mcmf" e.g. from simulation.run).
+        - USE_AUCTION runs the anytime auction instead.  `time_budget` is
+          the seconds this step may take (the tick's slack; the live loops
+          pass FixedRate.remaining()): the auction gets what is left of it
+          after move / RSSI / load, AUCTION_TIME_BUDGET when None.
+        - Per-phase wall times land in self.phase_times.
         """
+        clock = time.perf_counter
+        phases = self.phase_times = {}
+        started = clock()
         try:
             # 1. Move users
+            t0 = clock()
             self.move_users()
+            t1 = clock()
+            phases["move_users"] = t1 - t0
 
             # 2. Update RSSI & AP loads
             self.update_rssi()
+            t0 = clock()
+            phases["update_rssi"] = t0 - t1
             self.update_ap_load()
+            t1 = clock()
+            phases["update_ap_load"] = t1 - t0
 
             # 3. Load balancing:
             #    For realtime animation → GREEDY ONLY (no blocking).
             #    If you ever want to demo MCMF, flip USE_MCMF = True
             #    at the top and keep user count modest.
-            if USE_MCMF and len(self.clients) <= MCMF_MAX_USERS and (self.tick % MCMF_EVERY_N_TICKS == 0):
+            solver = self.solver or ("auction" if USE_AUCTION else "mcmf" if USE_MCMF else "greedy")
+            if solver == "auction":
+                left = None if time_budget is None else max(0.0, time_budget - (t1 - started))
+                self.apply_auction(left)
+                phase = "apply_auction"
+            elif solver == "mcmf" and len(self.clients) <= MCMF_MAX_USERS and (self.tick % MCMF_EVERY_N_TICKS == 0):
                 self.apply_mcmf()
+                phase = "apply_mcmf"
             else:
                 self.apply_greedy()
+                phase = "apply_greedy"
+            phases[phase] = clock() - t1
 
             self.tick += 1
 
@@ -614,8 +701,9 @@ class WifiSimulator:
         
         # 4. AP-Killer effect
         if self.ap_killer.active:
-            rooms = [r for f in self.campus_layout if f["level"] == self.ap_killer.floor for r in f["rooms"]]
-            self.ap_killer.update(self.aps, rooms)
+            t0 = clock()
+            self.ap_killer.update(self.aps)
+            phases["ap_killer"] = clock() - t0
 
 
 
@@ -626,110 +714,126 @@ class WifiSimulator:
     def to_global(self, floor, x, y):
         """
         Keep this consistent but we will still sanitize in get_state
-        to avoid NaNs hitting JSON.
+        to avoid NaNs hitting JSON.  (Offsets precomputed per floor in
+        self.layout; to_global_many() does whole columns.)
         """
-        floors_sorted = sorted(self.campus_layout, key=lambda f: -f["level"])
-        index = next((i for i, f in enumerate(floors_sorted) if f["level"] == floor), None)
-        if index is None:
-            return x, y
-
-        margin = 20
-        floor_height = 350
-
-        top = margin + index * (floor_height + margin)
-        return x + margin, top + y
+        return self.layout.to_global(floor, x, y)
 
     # ====================================================================
     # STATE EXPORT (FULLY SANITIZED FOR JSON)
     # ====================================================================
-    def get_state(self):
-        try:
-            # --- Pre-compute RSSI lists per AP ---
-            aps_out = []
-            for ap in self.aps:
-                gx, gy = self.to_global(ap.get("floor"), ap.get("x"), ap.get("y"))
-
-                ap_copy = {
-                    "id": ap.get("id"),
-                    "floor": ap.get("floor"),
-                    "room": ap.get("room", "Corridor"),
-                    "x": safe_float(ap.get("x", 0.0)),
-                    "y": safe_float(ap.get("y", 0.0)),
-                    "_gx": safe_float(gx),
-                    "_gy": safe_float(gy),
-                    "channel": ap.get("channel"),
-                    "band": ap.get("band", self.current_band),
-                    "interference_score": safe_float(ap.get("interference_score", 0.0)),
-                    "airtime_capacity": safe_int(ap.get("airtime_capacity", 100)),
-                    "max_clients": safe_int(ap.get("max_clients", ap.get("max_users", 30))),
-                    "max_users": safe_int(ap.get("max_users", ap.get("max_clients", 30))),
-                    "coverage_radius": safe_float(ap.get("coverage_radius", 200.0)),
-                    "client_count": safe_int(ap.get("client_count", 0)),
-                    "user_count": safe_int(ap.get("user_count", 0)),
-                    "load": safe_float(ap.get("load", 0.0)),
-                }
-
-                aps_out.append(ap_copy)
+    def export_aps(self):
+        """JSON-safe AP records (what get_state sends)."""
+        aps_out = []
+        gxs, gys = self.layout.to_global_many(
+            self.aps.col("floor"), self.aps.col("x"), self.aps.col("y"))
+        for row, ap in enumerate(self.aps):
+            gx, gy = gxs.item(row), gys.item(row)
+
+            ap_copy = {
+                "id": ap.get("id"),
+                "floor": ap.get("floor"),
+                "room": ap.get("room", "Corridor"),
+                "x": safe_float(ap.get("x", 0.0)),
+                "y": safe_float(ap.get("y", 0.0)),
+                "_gx": safe_float(gx),
+                "_gy": safe_float(gy),
+                "channel": ap.get("channel"),
+                "band": ap.get("band", self.current_band),
+                "interference_score": safe_float(ap.get("interference_score", 0.0)),
+                "airtime_capacity": safe_int(ap.get("airtime_capacity", 100)),
+                "max_clients": safe_int(ap.get("max_clients", ap.get("max_users", 30))),
+                "max_users": safe_int(ap.get("max_users", ap.get("max_clients", 30))),
+                "coverage_radius": safe_float(ap.get("coverage_radius", 200.0)),
+                "client_count": safe_int(ap.get("client_count", 0)),
+                "user_count": safe_int(ap.get("user_count", 0)),
+                "load": safe_float(ap.get("load", 0.0)),
+            }
+
+            aps_out.append(ap_copy)
+        return aps_out
+
+    def export_clients(self, rows, gx, gy):
+        """
+        JSON-safe client records for table `rows` (what get_state sends per
+        visible user), built column by column; gx / gy are their global
+        coordinates.
+        """
+        c = self.clients
+        rows = np.asarray(rows, dtype=np.int64)
+        ids = c.ids()
+
+        def names(name):
+            pool = c.pools[name].names
+            return [pool[k] if k >= 0 else None for k in c.col(name)[rows].tolist()]
+
+        floors = [None if f == INT_NONE else f for f in c.col("floor")[rows].tolist()]
+        return [
+            {
+                "id": ids[row],
+                "floor": floor,
+                "room": room,
+                "x": x,
+                "y": y,
+                "_gx": ux,
+                "_gy": uy,
+                "vx": vx,
+                "vy": vy,
+                "nearest_ap": nearest,
+                "assigned_ap": assigned,
+                "connected_ap": connected,
+                "airtime_usage": airtime,
+                "RSSI": rssi,
+            }
+            for row, floor, room, x, y, ux, uy, vx, vy, nearest, assigned, connected, airtime, rssi
+            in zip(rows.tolist(), floors, names("room"),
+                   _floats(c.col("x")[rows]), _floats(c.col("y")[rows]),
+                   _floats(gx), _floats(gy),
+                   _floats(c.col("vx")[rows]), _floats(c.col("vy")[rows]),
+                   names("nearest_ap"), names("assigned_ap"), names("connected_ap"),
+                   _ints(c.col("airtime_usage")[rows]), _ints(c.col("RSSI")[rows]))
+        ]
 
+    def export_ap_killer(self):
+        """The AP killer as a pseudo client record."""
+        killer = self.ap_killer
+        gx, gy = self.to_global(killer.floor, killer.x, killer.y)
+        return {
+            "id": "AP-KILLER",
+            "floor": killer.floor,
+            "room": "Corridor",
+            "x": killer.x,
+            "y": killer.y,
+            "_gx": gx,
+            "_gy": gy,
+            "vx": killer.vx,
+            "vy": killer.vy,
+            "nearest_ap": killer.get_nearest_ap_id(self.aps),
+            "assigned_ap": None,
+            "connected_ap": None,
+            "airtime_usage": 10,
+            "RSSI": -20
+        }
 
+    def get_state(self):
+        try:
+            aps_out = self.export_aps()
 
             # --------------------------
             # USER LIST
             # --------------------------
             users_out = []
 
-            visible_users = [
-                u for u in self.clients
-                if u.get("assigned_ap") is not None or u.get("nearest_ap") is not None
-            ]
-
-            for u in visible_users:
-                gx, gy = self.to_global(u.get("floor"), u.get("x"), u.get("y"))
-
-                u_copy = {
-                    "id": u.get("id"),
-                    "floor": u.get("floor"),
-                    "room": u.get("room", ""),
-                    "x": safe_float(u.get("x", 0.0)),
-                    "y": safe_float(u.get("y", 0.0)),
-                    "_gx": safe_float(gx),
-                    "_gy": safe_float(gy),
-                    "vx": safe_float(u.get("vx", 0.0)),
-                    "vy": safe_float(u.get("vy", 0.0)),
-                    "nearest_ap": u.get("nearest_ap"),
-                    "assigned_ap": u.get("assigned_ap"),
-                    "connected_ap": u.get("connected_ap"),
-                    "airtime_usage": safe_int(u.get("airtime_usage", 1)),
-                    "RSSI": safe_int(u.get("RSSI", -95)),
-                }
-
-                users_out.append(u_copy)
+            c = self.clients
+            visible = np.flatnonzero((c.col("assigned_ap") >= 0) | (c.col("nearest_ap") >= 0))
+            gxs, gys = self.layout.to_global_many(
+                c.col("floor")[visible], c.col("x")[visible], c.col("y")[visible])
+            users_out.extend(self.export_clients(visible, gxs, gys))
             # --------------------------
             # AP-KILLER (added ONCE)
             # --------------------------
             if self.ap_killer.active:
-                gx, gy = self.to_global(
-                    self.ap_killer.floor,
-                    self.ap_killer.x,
-                    self.ap_killer.y
-                )
-
-                users_out.append({
-                    "id": "AP-KILLER",
-                    "floor": self.ap_killer.floor,
-                    "room": "Corridor",
-                    "x": self.ap_killer.x,
-                    "y": self.ap_killer.y,
-                    "_gx": gx,
-                    "_gy": gy,
-                    "vx": self.ap_killer.vx,
-                    "vy": self.ap_killer.vy,
-                    "nearest_ap": self.ap_killer.get_nearest_ap_id(self.aps),
-                    "assigned_ap": None,
-                    "connected_ap": None,
-                    "airtime_usage": 10,
-                    "RSSI": -20
-                })
+                users_out.append(self.export_ap_killer())
 
             # --------------------------
             # FINAL RETURN
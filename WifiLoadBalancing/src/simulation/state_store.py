@@ -0,0 +1,458 @@
+import math
+from collections.abc import MutableMapping
+
+import numpy as np
+
+# Column kinds
+FLOAT = "f"    # float64, NaN allowed
+NUM = "n"      # float64, read back as int when integral (JSON-style numbers)
+INT = "i"      # int32
+NINT = "ni"    # int32, None allowed
+TEXT = "t"     # interned string (per-column pool), None allowed
+REF = "r"      # interned AP id (shared pool), None allowed
+
+INT_NONE = np.iinfo(np.int32).min
+NONE_CODE = -1
+
+_DTYPES = {
+    FLOAT: np.float64, NUM: np.float64,
+    INT: np.int32, NINT: np.int32, TEXT: np.int32, REF: np.int32,
+}
+
+
+class Interner:
+    """Append-only string pool: name ↔ small int code (None ↔ -1)."""
+
+    def __init__(self):
+        self.names = []
+        self.codes = {}
+
+    def code(self, name):
+        if name is None:
+            return NONE_CODE
+        c = self.codes.get(name)
+        if c is None:
+            c = len(self.names)
+            self.codes[name] = c
+            self.names.append(name)
+        return c
+
+    def name(self, code):
+        return None if code < 0 else self.names[code]
+
+    def __len__(self):
+        return len(self.names)
+
+
+def group_rows(keys, rows=None):
+    """
+    {key: rows with that key} for an int key array (one key per row of
+    `rows`, default 0..n-1).  Rows keep their order; negative keys
+    (None refs, unknown APs) are dropped.
+    """
+    keys = np.asarray(keys)
+    rows = np.arange(len(keys)) if rows is None else np.asarray(rows)
+    keep = keys >= 0
+    keys, rows = keys[keep], rows[keep]
+    if not len(keys):
+        return {}
+    order = np.argsort(keys, kind="stable")
+    keys, rows = keys[order], rows[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    return {k: rows[a:b] for k, a, b in zip(keys[starts].tolist(), starts.tolist(), ends.tolist())}
+
+
+class RecordTable:
+    """
+    Struct-of-arrays store for a list of JSON-like records.
+
+    Every column in COLUMNS lives in one contiguous NumPy array; "id" is
+    kept in an id → row map so lookups are O(1).  Keys outside COLUMNS go
+    to a small per-row dict (rarely used).
+
+    The table behaves like the old list of dicts:
+      • iterating / indexing yields Record views (dict-compatible)
+      • append(dict) adds a row, remove(record) swap-removes in O(1)
+    Vectorized code reads/writes columns directly via col(name).
+    """
+
+    # name → (kind, default)
+    COLUMNS = {}
+    # TEXT columns where None means "key absent" (ap.get("band", ...))
+    OPTIONAL = ()
+
+    def __init__(self, records=(), ap_ids=None, capacity=64):
+        self.ap_ids = ap_ids if ap_ids is not None else Interner()
+        self.pools = {
+            name: self.ap_ids if kind == REF else Interner()
+            for name, (kind, _) in self.COLUMNS.items() if kind in (TEXT, REF)
+        }
+
+        self.n = 0
+        self._cap = 0
+        self._cols = {}
+        self._grow(max(capacity, len(records) if hasattr(records, "__len__") else 0))
+
+        self._ids = []          # row → id
+        self._rows = {}         # id → row
+        self._extra = []        # row → dict | None
+        self._views = []        # row → cached Record | None
+
+        for rec in records:
+            self.append(rec)
+
+    # ============================================================
+    # Storage
+    # ============================================================
+    def _grow(self, need):
+        if need <= self._cap:
+            return
+        cap = max(need, self._cap * 2, 16)
+        for name, (kind, _) in self.COLUMNS.items():
+            arr = np.empty(cap, dtype=_DTYPES[kind])
+            old = self._cols.get(name)
+            if old is not None:
+                arr[:self.n] = old[:self.n]
+            self._cols[name] = arr
+        self._cap = cap
+
+    def col(self, name):
+        """Live array view of a column (length = number of rows)."""
+        return self._cols[name][:self.n]
+
+    def _encode(self, name, value):
+        kind, _ = self.COLUMNS[name]
+        if kind in (TEXT, REF):
+            return self.pools[name].code(value)
+        if kind == NINT:
+            return INT_NONE if value is None else int(value)
+        if kind == INT:
+            return int(value)
+        if value is None or isinstance(value, (str, bytes)):
+            return math.nan
+        return float(value)
+
+    def _decode(self, name, row):
+        kind, _ = self.COLUMNS[name]
+        v = self._cols[name].item(row)
+        if kind == FLOAT or kind == INT:
+            return v
+        if kind == NUM:
+            return int(v) if v.is_integer() else v
+        if kind == NINT:
+            return None if v == INT_NONE else v
+        return self.pools[name].name(v)
+
+    def _present(self, name, row):
+        if name in self.OPTIONAL:
+            return self._cols[name].item(row) != NONE_CODE
+        return True
+
+    # ============================================================
+    # List-like API
+    # ============================================================
+    def __len__(self):
+        return self.n
+
+    def __bool__(self):
+        return self.n > 0
+
+    def __iter__(self):
+        for row in range(self.n):
+            yield self._view(row)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._view(r) for r in range(*i.indices(self.n))]
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError("record index out of range")
+        return self._view(i)
+
+    def _view(self, row):
+        v = self._views[row]
+        if v is None:
+            v = self._views[row] = Record(self, row)
+        return v
+
+    def get(self, rid, default=None):
+        """Record by id (O(1))."""
+        row = self._rows.get(rid)
+        return default if row is None else self._view(row)
+
+    def row_of(self, rid):
+        return self._rows.get(rid, -1)
+
+    def ids(self):
+        """Row → id list (read-only view of the id column)."""
+        return self._ids
+
+    def append(self, rec):
+        self._grow(self.n + 1)
+        row = self.n
+        self.n += 1
+
+        rid = rec.get("id")
+        self._ids.append(rid)
+        self._rows.setdefault(rid, row)
+        self._extra.append(None)
+        self._views.append(None)
+
+        for name, (kind, default) in self.COLUMNS.items():
+            value = rec.get(name, default)
+            self._cols[name][row] = self._encode(name, value)
+        for key, value in rec.items():
+            if key != "id" and key not in self.COLUMNS:
+                self._set_extra(row, key, value)
+
+        self._changed()
+
+    def extend(self, records):
+        for rec in records:
+            self.append(rec)
+
+    def remove(self, rec):
+        """Swap-remove a record; the removed view keeps its values."""
+        row = self._find(rec)
+        if row < 0:
+            raise ValueError("record not in table")
+
+        last = self.n - 1
+        view = self._views[row]
+        if view is not None:
+            view._detach(self._materialize(row))
+
+        rid = self._ids[row]
+        if self._rows.get(rid) == row:
+            del self._rows[rid]
+
+        if row != last:
+            for arr in self._cols.values():
+                arr[row] = arr[last]
+            moved = self._ids[last]
+            self._ids[row] = moved
+            if self._rows.get(moved) == last:
+                self._rows[moved] = row
+            self._extra[row] = self._extra[last]
+            self._views[row] = self._views[last]
+            if self._views[row] is not None:
+                self._views[row]._row = row
+
+        self._ids.pop()
+        self._extra.pop()
+        self._views.pop()
+        self.n = last
+        self._changed()
+
+    def _find(self, rec):
+        if isinstance(rec, Record) and rec._t is self:
+            return rec._row
+        row = self._rows.get(rec.get("id"), -1)
+        if row >= 0 and self._view(row) == rec:
+            return row
+        return -1
+
+    def _materialize(self, row):
+        out = {"id": self._ids[row]}
+        for name in self.COLUMNS:
+            if self._present(name, row):
+                out[name] = self._decode(name, row)
+        if self._extra[row]:
+            out.update(self._extra[row])
+        return out
+
+    def to_records(self):
+        """Plain list of dicts (snapshot)."""
+        return [self._materialize(r) for r in range(self.n)]
+
+    def _set_extra(self, row, key, value):
+        extra = self._extra[row]
+        if extra is None:
+            extra = self._extra[row] = {}
+        extra[key] = value
+
+    def _rename(self, row, rid):
+        old = self._ids[row]
+        if self._rows.get(old) == row:
+            del self._rows[old]
+        self._ids[row] = rid
+        self._rows.setdefault(rid, row)
+        self._changed()
+
+    def _changed(self):
+        """Hook for derived caches (row/ref maps)."""
+
+    def nbytes(self):
+        """Bytes held by the column arrays (allocated capacity)."""
+        return sum(arr.nbytes for arr in self._cols.values())
+
+
+class Record(MutableMapping):
+    """
+    Dict-compatible view of one table row.
+
+    Works anywhere the old user/AP dicts did (get, [], setdefault, in,
+    items, ==).  A record removed from its table turns into a plain
+    detached copy so late readers still see its last values.
+    """
+
+    __slots__ = ("_t", "_row", "_data")
+
+    def __init__(self, table, row):
+        self._t = table
+        self._row = row
+        self._data = None
+
+    def _detach(self, data):
+        self._t = None
+        self._data = data
+
+    def __getitem__(self, key):
+        t = self._t
+        if t is None:
+            return self._data[key]
+        if key in t.COLUMNS:
+            if not t._present(key, self._row):
+                raise KeyError(key)
+            return t._decode(key, self._row)
+        if key == "id":
+            return t._ids[self._row]
+        extra = t._extra[self._row]
+        if extra is None:
+            raise KeyError(key)
+        return extra[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __setitem__(self, key, value):
+        t = self._t
+        if t is None:
+            self._data[key] = value
+        elif key in t.COLUMNS:
+            t._cols[key][self._row] = t._encode(key, value)
+        elif key == "id":
+            t._rename(self._row, value)
+        else:
+            t._set_extra(self._row, key, value)
+
+    def __delitem__(self, key):
+        t = self._t
+        if t is None:
+            del self._data[key]
+        elif key in t.OPTIONAL:
+            if not t._present(key, self._row):
+                raise KeyError(key)
+            t._cols[key][self._row] = NONE_CODE
+        elif key in t.COLUMNS or key == "id":
+            raise KeyError(f"{key!r} is a fixed column")
+        else:
+            extra = t._extra[self._row]
+            if not extra or key not in extra:
+                raise KeyError(key)
+            del extra[key]
+
+    def __contains__(self, key):
+        t = self._t
+        if t is None:
+            return key in self._data
+        if key in t.COLUMNS:
+            return t._present(key, self._row)
+        if key == "id":
+            return True
+        extra = t._extra[self._row]
+        return bool(extra) and key in extra
+
+    def __iter__(self):
+        t = self._t
+        if t is None:
+            return iter(self._data)
+        return iter(t._materialize(self._row))
+
+    def __len__(self):
+        t = self._t
+        if t is None:
+            return len(self._data)
+        return len(t._materialize(self._row))
+
+    def copy(self):
+        return dict(self.items()) if self._t is None else self._t._materialize(self._row)
+
+    def __repr__(self):
+        return f"Record({self.copy()!r})"
+
+
+# ============================================================
+# Concrete tables
+# ============================================================
+class ClientTable(RecordTable):
+    """Users: positions, velocities, floor, airtime, RSSI, AP refs."""
+
+    COLUMNS = {
+        "floor": (NINT, None),
+        "room": (TEXT, None),
+        "x": (FLOAT, math.nan),
+        "y": (FLOAT, math.nan),
+        "vx": (FLOAT, math.nan),
+        "vy": (FLOAT, math.nan),
+        "airtime_usage": (NUM, 1),
+        # NUM, not INT: a float RSSI written through a view is kept as is
+        # (RSSIEngine truncates to whole dBm itself, so it reads back int)
+        "RSSI": (NUM, -95),
+        "nearest_ap": (REF, None),
+        "assigned_ap": (REF, None),
+        "connected_ap": (REF, None),
+    }
+
+
+class APTable(RecordTable):
+    """
+    APs: position, radio params and load.
+
+    AP ids are interned in `ap_ids`, the pool ClientTable REF columns
+    use, so client → AP links are plain int codes; rows_for() turns
+    codes into AP rows for vectorized code.
+    """
+
+    COLUMNS = {
+        "floor": (NINT, None),
+        "room": (TEXT, None),
+        "x": (FLOAT, math.nan),
+        "y": (FLOAT, math.nan),
+        "band": (TEXT, None),
+        "channel": (NINT, None),
+        "interference_score": (FLOAT, 0.0),
+        "airtime_capacity": (NUM, 100),
+        "max_clients": (NUM, 30),
+        "max_users": (NUM, 30),
+        "coverage_radius": (NUM, 200),
+        "client_count": (NUM, 0),
+        "user_count": (NUM, 0),
+        "load": (FLOAT, 0.0),
+    }
+    OPTIONAL = ("band",)
+    _code_rows = None
+
+    def _changed(self):
+        self._code_rows = None
+
+    def codes(self):
+        """AP id code per row."""
+        return np.fromiter((self.ap_ids.code(i) for i in self._ids), np.int64, self.n)
+
+    def rows_for(self, codes):
+        """Map AP id codes (e.g. a REF column) to AP rows; -1 if unknown."""
+        if self._code_rows is None or len(self._code_rows) < len(self.ap_ids) + 1:
+            lut = np.full(len(self.ap_ids) + 1, -1, dtype=np.int64)
+            for row, rid in reversed(list(enumerate(self._ids))):
+                code = self.ap_ids.codes.get(rid)
+                if code is not None:
+                    lut[code] = row     # first row wins on duplicate ids
+            self._code_rows = lut
+        # -1 (None) lands on the trailing sentinel slot
+        return self._code_rows[np.asarray(codes, dtype=np.int64)]
@@ -0,0 +1,253 @@
+"""
+Parameter sweep: many independent headless WifiSimulator runs in a
+process pool (one per core), KPIs collected into a single table.
+
+    cd WifiLoadBalancing/src
+    python -m simulation.sweep sweep.json --out sweep.csv
+    python -m simulation.sweep sweep.json --workers 4 --out sweep.npz
+
+Spec (JSON):
+
+    {
+      "grid":    {"weights.load": [0.3, 0.6, 0.9], "capacity_alpha": [0.1, 0.25]},
+      "random":  {"load_decay": [0.7, 0.95], "band_coverage.5": [250, 400]},
+      "samples": 16,              # random draws (per grid point)
+      "seeds":   [0, 1],          # every point runs once per seed
+      "ticks":   2000,
+      "warmup":  200,             # ticks left out of the KPI means
+      "solver":  "greedy", "users": null, "ap_spacing": null
+    }
+
+Parameter names are DEFAULT_CONFIG keys (simulator.py); "a.b" sets one
+entry of a dict value ("weights.load", "band_coverage.5").  "grid" takes
+the cartesian product of its value lists; "random" draws uniformly from
+[low, high] (integers if both bounds are), seeded by "sweep_seed".
+Each run gets its own WifiSimulator(config=...), so nothing is shared
+through module globals.
+
+One row per run:
+
+    run, seed, <params...>, ticks_per_sec, step_ms_p50, step_ms_p95,
+    overloaded_aps, disconnected, mean_rssi, moves, clients
+
+  • overloaded_aps … moves — per-tick KPIs of simulation.run, averaged
+    over the ticks after `warmup`
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from .run import SOLVERS, KPILog, build_sim, run
+from .simulator import DEFAULT_CONFIG, make_config
+
+SPEC_DEFAULTS = {
+    "grid": {},
+    "random": {},
+    "samples": 0,
+    "seeds": [0],
+    "ticks": 2000,
+    "warmup": 200,
+    "solver": None,
+    "users": None,
+    "ap_spacing": None,
+    "sweep_seed": 0,
+}
+
+KPI_MEANS = ("overloaded_aps", "disconnected", "mean_rssi", "moves")
+RESULTS = ("ticks_per_sec", "step_ms_p50", "step_ms_p95", *KPI_MEANS, "clients")
+
+
+# ============================================================
+# Spec → points
+# ============================================================
+def load_spec(spec):
+    """Spec dict (or JSON path) with defaults filled in and checked."""
+    if not isinstance(spec, dict):
+        spec = json.loads(Path(spec).read_text())
+    unknown = set(spec) - set(SPEC_DEFAULTS)
+    if unknown:
+        raise ValueError(f"unknown spec keys {sorted(unknown)}")
+    spec = {**SPEC_DEFAULTS, **spec}
+
+    if spec["solver"] is not None and spec["solver"] not in SOLVERS:
+        raise ValueError(f"solver must be one of {SOLVERS}")
+    if spec["random"] and spec["samples"] < 1:
+        raise ValueError('"random" needs "samples" >= 1')
+    for name, bounds in spec["random"].items():
+        if len(bounds) != 2:
+            raise ValueError(f"random {name!r} must be [low, high]")
+    if not 0 <= spec["warmup"] < spec["ticks"]:
+        raise ValueError('"warmup" must be in 0..ticks-1')
+
+    # Fail here, not in N workers: every name must land in DEFAULT_CONFIG
+    for name in [*spec["grid"], *spec["random"]]:
+        key, _, sub = name.partition(".")
+        if sub and not isinstance(DEFAULT_CONFIG.get(key), dict):
+            raise ValueError(f"{name!r}: config {key!r} has no entries")
+        make_config(to_config({name: 0}))
+    return spec
+
+
+def points(spec):
+    """Parameter dicts: grid product × random draws (either may be empty)."""
+    grid = spec["grid"]
+    combos = [dict(zip(grid, values)) for values in itertools.product(*grid.values())]
+
+    rng = random.Random(spec["sweep_seed"])
+    out = []
+    for combo in combos:
+        for _ in range(spec["samples"] if spec["random"] else 1):
+            point = dict(combo)
+            for name, (low, high) in spec["random"].items():
+                if isinstance(low, int) and isinstance(high, int):
+                    point[name] = rng.randint(low, high)
+                else:
+                    point[name] = rng.uniform(low, high)
+            out.append(point)
+    return out
+
+
+def to_config(params):
+    """{"weights.load": 0.9, "load_decay": 0.8} → WifiSimulator config."""
+    config = {}
+    for name, value in params.items():
+        key, _, sub = name.partition(".")
+        if sub:
+            config.setdefault(key, {})[sub] = value
+        else:
+            config[key] = value
+    return config
+
+
+# ============================================================
+# One run (in a pool worker)
+# ============================================================
+def run_point(job):
+    params = job["params"]
+    config = {**to_config(params), "mcmf_workers": 1}   # no pool inside the pool
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        sim = build_sim(seed=job["seed"], solver=job["solver"], users=job["users"],
+                        ap_spacing=job["ap_spacing"], config=config)
+        log = KPILog(capacity=job["ticks"])
+        summary = run(sim, job["ticks"], log=log)
+
+    cols = {name: arr[job["warmup"]:] for name, arr in log.columns().items()}
+    row = {"run": job["run"], "seed": job["seed"], **params}
+    row["ticks_per_sec"] = summary["ticks_per_sec"]
+    row["step_ms_p50"] = round(float(np.percentile(cols["step_ms"], 50)), 3)
+    row["step_ms_p95"] = round(float(np.percentile(cols["step_ms"], 95)), 3)
+    for name in KPI_MEANS:
+        row[name] = round(float(np.nanmean(cols[name])), 4)
+    row["clients"] = int(cols["clients"][-1])
+    return row
+
+
+def jobs(spec):
+    out = []
+    for point in points(spec):
+        for seed in spec["seeds"]:
+            out.append({
+                "run": len(out),
+                "seed": seed,
+                "params": point,
+                "ticks": spec["ticks"],
+                "warmup": spec["warmup"],
+                "solver": spec["solver"],
+                "users": spec["users"],
+                "ap_spacing": spec["ap_spacing"],
+            })
+    return out
+
+
+def sweep(spec, workers=None, progress=True):
+    """Run every job of `spec` across `workers` processes; rows sorted by run."""
+    spec = load_spec(spec)
+    todo = jobs(spec)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+    rows = []
+
+    # spawn, not fork: same as the MCMF pool, safe from threaded callers
+    with ProcessPoolExecutor(max_workers=workers,
+                             mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = [pool.submit(run_point, job) for job in todo]
+        for done, future in enumerate(as_completed(futures), 1):
+            row = future.result()
+            rows.append(row)
+            if progress:
+                print(f"  [{done:>4}/{len(todo)}] run {row['run']:>4}  "
+                      f"overloaded {row['overloaded_aps']:>7.3f}  "
+                      f"disconnected {row['disconnected']:>8.2f}  "
+                      f"{row['ticks_per_sec']:>7.1f} ticks/s", file=sys.stderr)
+
+    rows.sort(key=lambda r: r["run"])
+    return rows
+
+
+# ============================================================
+# Output
+# ============================================================
+def save_table(rows, path):
+    """One row per run → .csv or .npz (one array per column), atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    columns = list(rows[0]) if rows else []
+
+    if path.suffix == ".csv":
+        with open(tmp, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(tmp, "wb") as f:
+            np.savez(f, **{c: np.array([r[c] for r in rows]) for c in columns})
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep WifiSimulator configs across a process pool")
+    parser.add_argument("spec", type=Path, help="sweep spec (JSON, see module docstring)")
+    parser.add_argument("--workers", type=int, default=None, help="default: one per core")
+    parser.add_argument("--out", type=Path, default=None, help="result table (.csv or .npz)")
+    parser.add_argument("--sort", choices=RESULTS, default="overloaded_aps",
+                        help="column the printed top runs are ranked by (ascending)")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    n = len(jobs(spec))
+    print(f"▶️ {n} runs × {spec['ticks']} ticks "
+          f"({spec['solver'] or 'greedy'}, {args.workers or os.cpu_count()} workers)")
+
+    started = time.perf_counter()
+    rows = sweep(spec, workers=args.workers)
+    wall = time.perf_counter() - started
+    print(f"✅ {len(rows)} runs in {wall:.1f} s")
+
+    if args.out is not None:
+        save_table(rows, args.out)
+        print(f"📁 Table → {args.out}")
+
+    params = [c for c in rows[0] if c not in RESULTS and c not in ("run", "seed")] if rows else []
+    for row in sorted(rows, key=lambda r: r[args.sort])[:args.top]:
+        shown = ", ".join(f"{p}={row[p]:.4g}" if isinstance(row[p], float) else f"{p}={row[p]}"
+                          for p in params)
+        print(f"   run {row['run']:>4} (seed {row['seed']})  {args.sort}={row[args.sort]}  {shown}")
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,482 @@
+"""
+WifiSimulator in its own process.
+
+    API process                          worker process
+    ───────────                          ──────────────
+    SimProcess.submit() ── commands ──▶  apply_batch() before each tick
+                                         step() at SIM_HZ
+    SimProcess.poll()  ◀── shared mem ── publish bundle at BROADCAST_HZ
+                       ◀── events ────── segment name / errors
+
+Each bundle holds everything the API needs for one tick, already encoded
+(snapshot body + gzip/br, delta patch, keyframe on request, binary frames
+on request, status JSON), so the API process never runs get_state() or
+json.dumps() and its GIL stays free for FastAPI and WebSocket fan-out.
+"""
+
+import json
+import multiprocessing as mp
+import queue
+import struct
+import time
+from multiprocessing import shared_memory
+
+from .commands import apply_batch
+from .scheduler import FixedRate
+
+SLOT_SIZE = 8 * 1024 * 1024   # bytes per buffer; grows when a bundle doesn't fit
+STOP = "__stop__"
+VIEWS = "__views__"           # floor subscriptions the API currently serves
+PROFILE = "__profile__"       # profile the next N step + publish cycles
+BATCH = "__batch__"           # [(name, args), ...] from one POST /commands
+
+# Bundle sections, in slot order
+SECTIONS = ("status", "state", "gzip", "br", "patch", "keyframe",
+            "bin_table", "bin", "alarms", "views")
+TEXT_SECTIONS = ("patch", "keyframe", "bin_table", "alarms", "views")
+
+# Control block: <u64 latest seq, u64 slot size,
+#                 u8 want keyframe, u8 want binary, u8 want view keyframes>
+CONTROL = struct.Struct("<QQBBB5x")
+# Slot header: <u64 seq, u32 tick, u32 flags, u32 snapshot seq, u32 bin table version>
+SLOT_HEADER = struct.Struct("<QIIII")
+LENGTHS = struct.Struct(f"<{len(SECTIONS)}i")   # -1 = section absent
+_STAMP = struct.Struct("<Q")    # control latest seq / slot seqlock stamp (0 = writing)
+READ_RETRIES = 8
+
+KEYFRAME_DUE = 1   # flags: every delta socket should get this keyframe
+
+
+# ============================================================
+# Shared double buffer
+# ============================================================
+class SharedFrames:
+    """
+    Two bundle slots in one shared_memory segment.  Bundle `seq` goes to
+    slot seq % 2 and only then is the control block's latest seq bumped.
+
+    Each slot header starts with a seqlock stamp: the writer clears it to
+    0 before touching the slot and sets it to `seq` once the payload is in.
+    read() copies only when the stamp equals the seq it wants, and checks
+    it again after the copy; a slot rewritten (seq + 2) meanwhile no longer
+    carries that stamp, so the copy is thrown away and retried — readers
+    never return a torn bundle.
+    """
+
+    def __init__(self, shm):
+        self.shm = shm
+        self.buf = shm.buf
+        self.slot_size = CONTROL.unpack_from(self.buf, 0)[1]
+
+    @classmethod
+    def create(cls, slot_size=SLOT_SIZE):
+        shm = shared_memory.SharedMemory(create=True, size=CONTROL.size + 2 * slot_size)
+        CONTROL.pack_into(shm.buf, 0, 0, slot_size, 0, 0, 0)
+        return cls(shm)
+
+    @classmethod
+    def attach(cls, name):
+        # The spawned worker shares our resource tracker, so its unlink()
+        # also clears this registration (and a crashed worker's segment
+        # is still cleaned up when the API exits)
+        return cls(shared_memory.SharedMemory(name=name))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def latest(self):
+        return CONTROL.unpack_from(self.buf, 0)[0]
+
+    # ----- request flags (API → worker) -----
+    def request(self, keyframe=None, binary=None, view_keyframe=None):
+        for at, flag in ((16, keyframe), (17, binary), (18, view_keyframe)):
+            if flag is not None:
+                self.buf[at] = 1 if flag else 0
+
+    def requests(self):
+        return bool(self.buf[16]), bool(self.buf[17]), bool(self.buf[18])
+
+    # ----- writer -----
+    def fits(self, sections):
+        need = SLOT_HEADER.size + LENGTHS.size + sum(len(v) for v in sections.values())
+        return need <= self.slot_size, need
+
+    def write(self, tick, flags, snap_seq, bin_version, sections):
+        seq = self.latest + 1
+        base = CONTROL.size + (seq % 2) * self.slot_size
+        lengths = [len(sections[s]) if s in sections else -1 for s in SECTIONS]
+
+        _STAMP.pack_into(self.buf, base, 0)        # slot is being rewritten
+        SLOT_HEADER.pack_into(self.buf, base, 0, tick & 0xFFFFFFFF, flags,
+                              snap_seq & 0xFFFFFFFF, bin_version & 0xFFFFFFFF)
+        LENGTHS.pack_into(self.buf, base + SLOT_HEADER.size, *lengths)
+
+        off = base + SLOT_HEADER.size + LENGTHS.size
+        for name in SECTIONS:
+            data = sections.get(name)
+            if data is None:
+                continue
+            if isinstance(data, str):
+                data = data.encode("utf-8")
+            self.buf[off:off + len(data)] = data
+            off += len(data)
+
+        _STAMP.pack_into(self.buf, base, seq)      # slot complete
+        _STAMP.pack_into(self.buf, 0, seq)         # publish
+        return seq
+
+    # ----- reader -----
+    def read(self, after=0):
+        """Newest bundle with seq > `after`, or None."""
+        for _ in range(READ_RETRIES):
+            seq = self.latest
+            if seq <= after:
+                return None
+
+            base = CONTROL.size + (seq % 2) * self.slot_size
+            stamp, tick, flags, snap_seq, bin_version = SLOT_HEADER.unpack_from(self.buf, base)
+            if stamp != seq:                # already being rewritten
+                continue
+            lengths = LENGTHS.unpack_from(self.buf, base + SLOT_HEADER.size)
+
+            sections = {}
+            off = base + SLOT_HEADER.size + LENGTHS.size
+            for name, n in zip(SECTIONS, lengths):
+                if n < 0:
+                    continue
+                data = bytes(self.buf[off:off + n])
+                sections[name] = data.decode("utf-8") if name in TEXT_SECTIONS else data
+                off += n
+
+            if _STAMP.unpack_from(self.buf, base)[0] == seq:   # not rewritten while copying
+                return Bundle(seq, tick, flags, snap_seq, bin_version, sections)
+        return None
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+
+
+class Bundle:
+    __slots__ = ("seq", "tick", "flags", "snap_seq", "bin_version", "sections")
+
+    def __init__(self, seq, tick, flags, snap_seq, bin_version, sections):
+        self.seq = seq
+        self.tick = tick
+        self.flags = flags
+        self.snap_seq = snap_seq
+        self.bin_version = bin_version
+        self.sections = sections
+
+    @property
+    def keyframe_due(self):
+        return bool(self.flags & KEYFRAME_DUE)
+
+    def get(self, name, default=None):
+        return self.sections.get(name, default)
+
+    def __getitem__(self, name):
+        return self.sections[name]
+
+    def __contains__(self, name):
+        return name in self.sections
+
+
+# ============================================================
+# API side
+# ============================================================
+class SimProcess:
+    """
+    Handle on the worker: start()/stop(), submit() commands, poll() the
+    newest bundle.  `status` is the worker's last published status dict.
+    """
+
+    def __init__(self, sim_hz, broadcast_hz, policy="drop", slot_size=SLOT_SIZE,
+                 seed=None, record=None):
+        self.config = {
+            "sim_hz": sim_hz,
+            "broadcast_hz": broadcast_hz,
+            "policy": policy,
+            "slot_size": slot_size,
+            "seed": seed,
+            "record": record,     # command log path (simulation.replay)
+        }
+        self.process = None
+        self.commands = None
+        self.events = None
+        self.frames = None
+
+        self.seq = 0
+        self.tick = 0
+        self.views = {}
+        self.profiling = False
+        self.profile_result = None
+        self.status = {}
+        self.errors = []
+        self.segments = 0
+        self.last_bundle_bytes = 0
+
+    @property
+    def ready(self):
+        return self.frames is not None and self.seq > 0
+
+    def start(self):
+        ctx = mp.get_context("spawn")      # no inherited event loop / sockets
+        self.commands = ctx.Queue()
+        self.events = ctx.Queue()
+        self.process = ctx.Process(
+            target=_worker_main, args=(self.config, self.commands, self.events),
+            name="wifi-sim", daemon=True,
+        )
+        self.process.start()
+        return self
+
+    def submit(self, name, **args):
+        self.commands.put((name, args))
+
+    def submit_batch(self, batch):
+        """Many commands, one queue message (and one pickle)."""
+        self.commands.put((BATCH, batch))
+
+    def set_views(self, views):
+        """{view key: {"patch": bool, "full": bool}} to build every bundle."""
+        if views != self.views:
+            self.views = views
+            self.commands.put((VIEWS, views))
+
+    def request_profile(self, ticks, mode):
+        """Result lands in `profile_result` (via the event queue)."""
+        self.profiling = True
+        self.profile_result = None
+        self.commands.put((PROFILE, {"ticks": ticks, "mode": mode}))
+
+    def poll(self, want_keyframe=False, want_binary=False, want_view_keyframe=False):
+        """Pass request flags to the worker; return a new Bundle or None."""
+        self._drain_events()
+        if self.frames is None:
+            return None
+
+        self.frames.request(keyframe=want_keyframe, binary=want_binary,
+                            view_keyframe=want_view_keyframe)
+        bundle = self.frames.read(self.seq)
+        if bundle is None:
+            return None
+
+        self.seq = bundle.seq
+        self.tick = bundle.tick
+        self.last_bundle_bytes = sum(len(v) for v in bundle.sections.values())
+        if "status" in bundle:
+            self.status = json.loads(bundle["status"])
+        return bundle
+
+    def _drain_events(self):
+        segment = None
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "segment":
+                segment = value
+            elif kind == "profile":
+                self.profile_result = value
+                self.profiling = False
+            elif kind == "error":
+                print("🔥 Worker:", value)
+                self.errors = (self.errors + [value])[-20:]
+
+        if segment is not None and (self.frames is None or self.frames.name != segment):
+            try:
+                frames = SharedFrames.attach(segment)
+            except FileNotFoundError:
+                return      # already replaced; the newer name is queued
+            if self.frames is not None:
+                self.frames.close()
+            self.frames = frames
+            self.seq = 0
+            self.segments += 1
+
+    def stop(self, timeout=5.0):
+        if self.process is None:
+            return
+        try:
+            self.commands.put((STOP, None))
+            self.process.join(timeout)
+        finally:
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(1)
+            if self.frames is not None:
+                self.frames.close()
+                self.frames = None
+
+    def stats(self):
+        return {
+            "pid": self.process.pid if self.process else None,
+            "alive": bool(self.process and self.process.is_alive()),
+            "segment": self.frames.name if self.frames else None,
+            "slot_bytes": self.frames.slot_size if self.frames else 0,
+            "segments": self.segments,
+            "bundle_seq": self.seq,
+            "bundle_bytes": self.last_bundle_bytes,
+            "errors": self.errors[-5:],
+        }
+
+
+# ============================================================
+# Worker process
+# ============================================================
+def _worker_main(config, commands, events):
+    from observability.profiler import TickProfiler
+    from observability.tick_metrics import TickMetrics
+    from streaming.binary import BinaryEncoder
+    from streaming.delta import DeltaEncoder
+    from streaming.floors import FloorViews
+    from streaming.snapshot import SnapshotCache
+    from .replay import CommandLog
+    from .simulator import WifiSimulator
+
+    sim = WifiSimulator(seed=config["seed"])
+    sim.ready = True
+    recorder = CommandLog(config["record"], config["seed"]) if config["record"] else None
+
+    frames = SharedFrames.create(config["slot_size"])
+    events.put(("segment", frames.name))
+
+    stream = DeltaEncoder()
+    encoders = (stream, BinaryEncoder(), SnapshotCache(), FloorViews(stream))
+    metrics = TickMetrics()
+    profiler = TickProfiler()
+    views = {}
+    rate = FixedRate("simulation", config["sim_hz"], config["policy"])
+    publish_period = 1.0 / config["broadcast_hz"]
+    next_publish = time.perf_counter()
+    publish_cost = 0.0      # EWMA seconds of one _publish()
+
+    try:
+        while _drain_commands(sim, commands, events, views, profiler, metrics, recorder):
+            ticks = rate.wait()
+            for i in range(ticks):
+                # Slack until the next deadline, minus the publish that
+                # follows in this slot when one is due
+                reserve = publish_cost if time.perf_counter() + rate.period >= next_publish else 0.0
+                budget = max(0.0, rate.remaining() - reserve) / (ticks - i)
+                profiler.call(sim.step, budget)
+                metrics.record_step(sim)
+                profiler.step_done()
+
+            now = time.perf_counter()
+            if now >= next_publish:
+                next_publish = max(next_publish + publish_period, now)
+                try:
+                    frames = profiler.call(_publish, sim, frames, encoders, views,
+                                           rate, metrics, events)
+                except Exception as e:
+                    events.put(("error", f"publish: {e}"))
+                publish_cost = 0.8 * publish_cost + 0.2 * (time.perf_counter() - now)
+                result = profiler.cycle_done()
+                if result is not None:
+                    events.put(("profile", result))
+    finally:
+        if recorder is not None:
+            recorder.close(sim.tick)
+        frames.close()
+        frames.shm.unlink()
+
+
+def _drain_commands(sim, commands, events, views, profiler, metrics, recorder=None):
+    """Apply everything queued since the last tick as one batch; False once STOP arrives."""
+    batch = []
+    running = True
+    while running:
+        try:
+            name, args = commands.get_nowait()
+        except queue.Empty:
+            break
+        if name == STOP:
+            running = False
+        elif name == BATCH:
+            batch.extend(args)
+        elif name == VIEWS:
+            views.clear()
+            views.update(args)
+        elif name == PROFILE:
+            try:
+                profiler.start(**args)
+            except (RuntimeError, ValueError) as e:
+                events.put(("profile", {"error": str(e)}))
+        else:
+            batch.append((name, args))
+
+    if batch and running:
+        errors = apply_batch(sim, batch, recorder)
+        metrics.record_commands(len(batch), errors)
+        for name, error in errors:
+            events.put(("error", f"{name}: {error}"))
+    return running
+
+
+def _publish(sim, frames, encoders, views, rate, metrics, events):
+    """Encode this tick into the next slot; returns the (maybe new) buffer."""
+    stream, bin_stream, snapshots, floor_views = encoders
+    encode = metrics.encode
+    want_keyframe, want_binary, want_view_keyframe = frames.requests()
+
+    state = metrics.get_state.time(sim.get_state)
+    snap = encode["snapshot"].time(snapshots.publish, state, sim.tick)
+    sections = {"state": snap.body, **snap.variants}
+    sections["patch"] = encode["patch"].time(stream.update_sim, sim)
+
+    flags = 0
+    if stream.keyframe_due():
+        flags |= KEYFRAME_DUE
+        want_keyframe = True
+        want_view_keyframe = True
+    if want_keyframe:
+        sections["keyframe"] = encode["keyframe"].time(stream.keyframe)
+        frames.request(keyframe=False)
+
+    if views:
+        sections["views"] = json.dumps(
+            encode["views"].time(floor_views.build, views, want_view_keyframe),
+            ensure_ascii=False,
+        )
+        frames.request(view_keyframe=False)
+
+    if want_binary:
+        sections["bin_table"], sections["bin"] = encode["binary"].time(bin_stream.encode, sim)
+        if state["alarms"]:
+            sections["alarms"] = json.dumps(
+                {"type": "alarms", "data": state["alarms"]}, ensure_ascii=False
+            )
+
+    sections["status"] = json.dumps({
+        "tick": sim.tick,
+        "aps": len(sim.aps),
+        "clients": len(sim.clients),
+        "mcmf": sim.mcmf_report,
+        "auction": sim.auction_report,
+        "stream": stream.stats(),
+        "views": floor_views.stats(),
+        "binary": bin_stream.stats(),
+        "simulation": rate.stats(),
+        "metrics": metrics.registry.snapshot(),
+    }, default=str).encode("utf-8")
+
+    sections = {k: v.encode("utf-8") if isinstance(v, str) else v
+                for k, v in sections.items()}
+    fits, need = frames.fits(sections)
+    if not fits:
+        # Grow: new segment, announce it, drop ours (the API's mapping
+        # of the old one stays valid until it switches)
+        bigger = SharedFrames.create(max(2 * frames.slot_size, 2 * need))
+        bigger.request(*frames.requests())
+        frames.close()
+        frames.shm.unlink()
+        frames = bigger
+        events.put(("segment", frames.name))
+
+    frames.write(sim.tick, flags, snap.seq, bin_stream.table_version, sections)
+    return frames
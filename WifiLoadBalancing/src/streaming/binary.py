@@ -0,0 +1,176 @@
+import json
+import struct
+
+import numpy as np
+
+from simulation.simulator import safe_int
+
+PROTOCOL = "wifi-bin.v1"
+FORMAT_VERSION = 2            # 2: every client in the table + visibility mask
+
+# <u16 format, u16 flags, u32 tick, u32 table version, u32 n_aps, u32 n_clients>
+HEADER = struct.Struct("<HHIIII")
+
+I16_MAX = np.iinfo(np.int16).max
+
+# Per-record fields that only travel in the (JSON) id table
+AP_STATIC = ("id", "floor", "room", "x", "y", "_gx", "_gy", "channel", "band",
+             "interference_score", "airtime_capacity", "max_clients", "max_users",
+             "client_count")
+
+
+class BinaryEncoder:
+    """
+    Column-packed state frames for the "wifi-bin.v1" WebSocket subprotocol.
+
+    Two kinds of message:
+
+      • id table (JSON text, only when membership or a static field
+        changes):  {"type": "ids", "v": table_version,
+                    "aps": [static AP fields...], "clients": [...]}
+        Lists every client, in range or not, so users walking in and out
+        of coverage never re-send it.
+      • state frame (binary, every tick), all little-endian:
+
+            header   u16 format, u16 flags, u32 tick, u32 table_version,
+                     u32 n_aps, u32 n_clients                   (20 bytes)
+            float32  client x, y, _gx, _gy                      (4 × n_clients)
+            float32  AP load, coverage_radius                   (2 × n_aps)
+            int16    client RSSI, nearest, assigned, connected  (4 × n_clients)
+            int16    AP user_count                              (n_aps)
+            uint8    client visible                             (n_clients)
+
+        nearest / assigned / connected are AP indices into the id table
+        (-1 = none).  visible = 0 hides the client, like get_state()
+        skipping users with neither a nearest nor an assigned AP.  Every
+        array starts aligned to its element size so the browser can wrap
+        it in a typed array without copying.
+
+    Reads the simulator's column tables directly (no get_state dicts).
+    """
+
+    def __init__(self):
+        self.table_version = 0
+        self._static = None
+        self._table_json = None
+        self.last_frame_bytes = 0
+
+    # ============================================================
+    # Public API
+    # ============================================================
+    def encode(self, sim):
+        """Return (id table JSON, frame bytes) for the current tick."""
+        clients = sim.clients
+        killer = sim.ap_killer if sim.ap_killer.active else None
+        ap_static = [_pick(ap, AP_STATIC) for ap in sim.export_aps()]
+
+        # Cheap change check on the columns; records are only built on
+        # change.  Keyed on membership, not visibility (that's per frame).
+        key = (
+            ap_static,
+            list(clients.ids()),
+            clients.col("floor").tobytes(),
+            clients.col("room").tobytes(),
+            clients.col("airtime_usage").tobytes(),
+            None if killer is None else killer.floor,
+        )
+        if key != self._static:
+            self._static = key
+            self.table_version += 1
+            self._table_json = json.dumps({
+                "type": "ids",
+                "v": self.table_version,
+                "aps": ap_static,
+                "clients": _client_static(clients, killer),
+            }, ensure_ascii=False, separators=(",", ":"))
+
+        frame = self._frame(sim, killer)
+        self.last_frame_bytes = len(frame)
+        return self._table_json, frame
+
+    def table(self):
+        return self._table_json
+
+    def stats(self):
+        return {
+            "table_version": self.table_version,
+            "frame_bytes": self.last_frame_bytes,
+            "table_bytes": len(self._table_json or ""),
+        }
+
+    # ============================================================
+    # Frame packing
+    # ============================================================
+    def _frame(self, sim, killer):
+        aps, clients = sim.aps, sim.clients
+        n_aps = len(aps)
+        n = len(clients) + (1 if killer is not None else 0)
+
+        x = _finite(clients.col("x"))
+        y = _finite(clients.col("y"))
+        gx, gy = sim.layout.to_global_many(clients.col("floor"), x, y)
+
+        rssi = _finite(clients.col("RSSI"))
+        refs = [aps.rows_for(clients.col(name))
+                for name in ("nearest_ap", "assigned_ap", "connected_ap")]
+
+        # Visible users: same rule as get_state()
+        visible = (clients.col("nearest_ap") >= 0) | (clients.col("assigned_ap") >= 0)
+
+        if killer is not None:
+            kgx, kgy = sim.to_global(killer.floor, killer.x, killer.y)
+            x = np.append(x, killer.x)
+            y = np.append(y, killer.y)
+            gx = np.append(gx, kgx)
+            gy = np.append(gy, kgy)
+            rssi = np.append(rssi, -20)
+            near_id = killer.get_nearest_ap_id(aps)
+            near = aps.row_of(near_id) if near_id is not None else -1
+            refs = [np.append(refs[0], near), np.append(refs[1], -1), np.append(refs[2], -1)]
+            visible = np.append(visible, True)
+
+        load = _finite(aps.col("load"))
+        coverage = _finite(aps.col("coverage_radius"))
+        user_count = np.clip(aps.col("user_count"), 0, I16_MAX)
+
+        parts = [
+            HEADER.pack(FORMAT_VERSION, 0, sim.tick & 0xFFFFFFFF,
+                        self.table_version, n_aps, n),
+            _f32(x), _f32(y), _f32(gx), _f32(gy),
+            _f32(load), _f32(coverage),
+            _i16(rssi), *(_i16(r) for r in refs),
+        ]
+        parts.append(_i16(user_count))
+        parts.append(visible.astype(np.uint8).tobytes())
+        return b"".join(parts)
+
+
+def _client_static(clients, killer):
+    out = []
+    for u in clients:
+        out.append({
+            "id": u["id"],
+            "floor": u.get("floor"),
+            "room": u.get("room", ""),
+            "airtime_usage": safe_int(u.get("airtime_usage", 1)),
+        })
+    if killer is not None:
+        out.append({"id": "AP-KILLER", "floor": killer.floor,
+                    "room": "Corridor", "airtime_usage": 10})
+    return out
+
+
+def _pick(rec, fields):
+    return {k: rec[k] for k in fields if k in rec}
+
+
+def _finite(a):
+    return np.nan_to_num(np.asarray(a, dtype=np.float64), nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def _f32(a):
+    return np.asarray(a, dtype="<f4").tobytes()
+
+
+def _i16(a):
+    return np.clip(np.asarray(a), -I16_MAX - 1, I16_MAX).astype("<i2").tobytes()
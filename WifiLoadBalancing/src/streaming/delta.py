@@ -0,0 +1,347 @@
+import json
+import math
+
+import numpy as np
+
+# Floats are sent with this many decimals (0.01 px / 0.01 % load)
+PRECISION = 2
+
+# A keyframe goes out to everyone every N versions so dropped or
+# misapplied patches heal by themselves
+KEYFRAME_EVERY = 50
+
+# update_sim(): a change in one of these client columns re-exports the
+# whole record (rare: floor / room / AP refs); the FIELD_COLUMNS of a
+# client record (x … RSSI, moving every tick) are diffed as arrays
+RECORD_COLUMNS = ("floor", "room", "airtime_usage", "nearest_ap", "assigned_ap", "connected_ap")
+FIELD_COLUMNS = ("x", "y", "_gx", "_gy", "vx", "vy", "RSSI")
+
+
+class DeltaEncoder:
+    """
+    Versioned keyframe + patch stream over get_state() snapshots.
+
+    Each update(state) bumps `version` and returns a patch that turns the
+    previous version into the new one:
+
+        {"type": "patch", "v": 12, "base": 11, "tick": 340,
+         "aps":         {"set": {id: {changed fields}}, "del": [ids]},
+         "clients":     {"set": {id: {changed fields}}, "del": [ids]},
+         "assignments": {"set": {uid: aid}, "del": [uids]},
+         "alarms":      [...]}
+
+    New records are sent in full inside "set".  keyframe() returns the
+    full current state ({"type": "keyframe", "v", "tick", "data"}) and is
+    encoded at most once per version.  Patch size scales with what
+    changed this tick, not with campus size.
+
+    update_sim(sim) builds the same patch straight from the simulator's
+    column tables, without get_state(): last tick's x, y, vx, vy, RSSI
+    (quantized) and ref columns are kept as arrays, NumPy compares them
+    with this tick's, and only the changed cells of the changed rows are
+    turned into Python values.  Encode CPU follows churn (plus a few
+    O(campus) vectorized passes).  APs and alarms are few and still go
+    through export_aps() / the dict diff.
+    """
+
+    def __init__(self, precision=PRECISION, keyframe_every=KEYFRAME_EVERY):
+        self.precision = precision
+        self.keyframe_every = keyframe_every
+
+        self.version = 0
+        self.tick = 0
+        self.aps = {}
+        self.clients = {}
+        self.assignments = {}
+        self.alarms = []
+
+        self.last_patch = None     # un-encoded patch (per-floor views slice it)
+        self.left = {"aps": {}, "clients": {}}   # id -> old floor, removed/moved
+        self._keyframe = None      # (version, encoded)
+        self.last_patch_bytes = 0
+        self.last_keyframe_bytes = 0
+
+        # update_sim(): last tick's client columns + where they came from
+        self._cols = None
+        self._fields = None
+        self._ids = None
+        self._visible = None
+        self._asg_source = None
+
+    # ============================================================
+    # Encoding
+    # ============================================================
+    def update(self, state, tick=0):
+        """Advance to `state`; return the encoded patch."""
+        aps = {a["id"]: self._quantize(a) for a in state.get("aps", ())}
+        clients = {c["id"]: self._quantize(c) for c in state.get("clients", ())}
+        assignments = dict(state.get("assignments") or {})
+        alarms = list(state.get("alarms") or ())
+
+        patch = {
+            "type": "patch",
+            "v": self.version + 1,
+            "base": self.version,
+            "tick": tick,
+            "aps": _diff_records(self.aps, aps),
+            "clients": _diff_records(self.clients, clients),
+            "assignments": _diff_values(self.assignments, assignments),
+            "alarms": alarms,
+        }
+
+        self.left = {
+            "aps": _left_floors(self.aps, aps, patch["aps"]),
+            "clients": _left_floors(self.clients, clients, patch["clients"]),
+        }
+        self.last_patch = patch
+
+        self.version += 1
+        self.tick = tick
+        self.aps, self.clients = aps, clients
+        self.assignments, self.alarms = assignments, alarms
+
+        self._cols = None          # column state no longer matches self.clients
+        return self._encode_patch(patch)
+
+    def update_sim(self, sim):
+        """update(sim.get_state(), sim.tick), diffed from the client columns."""
+        clients = sim.clients
+        p = self.precision
+        cols = {name: clients.col(name).copy() for name in RECORD_COLUMNS}
+        gx, gy = sim.layout.to_global_many(clients.col("floor"),
+                                           clients.col("x"), clients.col("y"))
+        fields = {
+            "x": _round_many(clients.col("x"), p),
+            "y": _round_many(clients.col("y"), p),
+            "_gx": _round_many(gx, p),
+            "_gy": _round_many(gy, p),
+            "vx": _round_many(clients.col("vx"), p),
+            "vy": _round_many(clients.col("vy"), p),
+            "RSSI": _int_many(clients.col("RSSI")),
+        }
+        ids = list(clients.ids())
+        visible = (cols["nearest_ap"] >= 0) | (cols["assigned_ap"] >= 0)
+
+        old_clients = self.clients
+        new_clients = dict(old_clients)
+        changed, removed = {}, []
+
+        # export: rows sent as whole records (new, re-shown, or a
+        #         RECORD_COLUMNS value changed) → export_clients + dict diff
+        # update: still-visible rows, only their FIELD_COLUMNS compared
+        if self._cols is None:
+            export = np.flatnonzero(visible)
+            update = np.zeros(len(ids), dtype=bool)
+            shown = {ids[r] for r in export.tolist()}
+            gone = [rid for rid in old_clients if rid not in shown and rid != "AP-KILLER"]
+        else:
+            if ids == self._ids:
+                at, known = None, np.ones(len(ids), dtype=bool)
+                old_cols, old_fields = self._cols, self._fields
+            else:
+                # Membership changed (add / swap-remove): line rows up by id
+                row_of = {rid: row for row, rid in enumerate(self._ids)}
+                prev = np.array([row_of.get(rid, -1) for rid in ids], dtype=np.int64)
+                known = prev >= 0
+                at = np.where(known, prev, 0)
+                old_cols = {name: col[at] for name, col in self._cols.items()}
+                old_fields = {name: col[at] for name, col in self._fields.items()}
+
+            was_visible = known & (self._visible if at is None else self._visible[at])
+            dirty = ~was_visible
+            for name, col in cols.items():
+                dirty |= _changed(col, old_cols[name])
+            export = np.flatnonzero(visible & dirty)
+            update = visible & ~dirty
+
+            # Field-level diff: rows × 7 columns in NumPy, then only the
+            # changed cells become Python values
+            for name, col in fields.items():
+                rows = np.flatnonzero(update & (col != old_fields[name]))
+                for row, value in zip(rows.tolist(), col[rows].tolist()):
+                    rid = ids[row]
+                    rec = changed.get(rid)
+                    if rec is None:
+                        rec = changed[rid] = {}
+                    rec[name] = value
+            for rid, rec in changed.items():
+                new_clients[rid] = {**old_clients[rid], **rec}
+
+            gone = [ids[r] for r in np.flatnonzero(was_visible & ~visible).tolist()]
+            if at is not None:
+                current = set(ids)
+                gone += [rid for row, rid in enumerate(self._ids)
+                         if self._visible[row] and rid not in current]
+
+        for rec in sim.export_clients(export, gx[export], gy[export]):
+            rec = self._quantize(rec)
+            _diff_into(changed, old_clients, rec)
+            new_clients[rec["id"]] = rec
+
+        for rid in gone:
+            removed.append(rid)
+            del new_clients[rid]
+
+        # AP killer: one pseudo record, kept last like get_state()
+        if sim.ap_killer.active:
+            rec = self._quantize(sim.export_ap_killer())
+            _diff_into(changed, old_clients, rec)
+            new_clients.pop("AP-KILLER", None)
+            new_clients["AP-KILLER"] = rec
+        elif "AP-KILLER" in new_clients:
+            removed.append("AP-KILLER")
+            del new_clients["AP-KILLER"]
+
+        # Assignments are replaced wholesale by a solve and only ever
+        # shrink (pop) otherwise, so same dict + same size = unchanged
+        asg = sim.assignments
+        if asg is self._asg_source and len(asg) == len(self.assignments):
+            assignments, asg_patch = self.assignments, {"set": {}, "del": []}
+        else:
+            assignments = dict(asg)
+            asg_patch = _diff_values(self.assignments, assignments)
+
+        aps = {a["id"]: self._quantize(a) for a in sim.export_aps()}
+        alarms = list(sim.ap_alarms or ())
+
+        patch = {
+            "type": "patch",
+            "v": self.version + 1,
+            "base": self.version,
+            "tick": sim.tick,
+            "aps": _diff_records(self.aps, aps),
+            "clients": {"set": changed, "del": removed},
+            "assignments": asg_patch,
+            "alarms": alarms,
+        }
+
+        self.left = {
+            "aps": _left_floors(self.aps, aps, patch["aps"]),
+            "clients": _left_floors(old_clients, new_clients, patch["clients"]),
+        }
+        self.last_patch = patch
+
+        self.version += 1
+        self.tick = sim.tick
+        self.aps, self.clients = aps, new_clients
+        self.assignments, self.alarms = assignments, alarms
+        self._cols, self._fields = cols, fields
+        self._ids, self._visible = ids, visible
+        self._asg_source = asg
+        return self._encode_patch(patch)
+
+    def _encode_patch(self, patch):
+        encoded = json.dumps(patch, ensure_ascii=False, separators=(",", ":"))
+        self.last_patch_bytes = len(encoded)
+        return encoded
+
+    def keyframe(self):
+        """Full state for the current version (encoded once, then cached)."""
+        if self._keyframe is None or self._keyframe[0] != self.version:
+            frame = {
+                "type": "keyframe",
+                "v": self.version,
+                "tick": self.tick,
+                "data": {
+                    "aps": list(self.aps.values()),
+                    "clients": list(self.clients.values()),
+                    "assignments": self.assignments,
+                    "alarms": [],          # alarms are events, not state
+                },
+            }
+            encoded = json.dumps(frame, ensure_ascii=False, separators=(",", ":"))
+            self._keyframe = (self.version, encoded)
+            self.last_keyframe_bytes = len(encoded)
+        return self._keyframe[1]
+
+    def keyframe_due(self):
+        return self.keyframe_every > 0 and self.version % self.keyframe_every == 0
+
+    def stats(self):
+        return {
+            "version": self.version,
+            "patch_bytes": self.last_patch_bytes,
+            "keyframe_bytes": self.last_keyframe_bytes,
+            "keyframe_every": self.keyframe_every,
+        }
+
+    def _quantize(self, record):
+        p = self.precision
+        return {
+            k: _round(v, p) if isinstance(v, float) else v
+            for k, v in record.items()
+        }
+
+
+def _round(v, p):
+    """round(v, p) the way _round_many() does it (rint(v·10^p) / 10^p)."""
+    if not math.isfinite(v):
+        return v
+    scale = 10.0 ** p
+    return round(v * scale) / scale
+
+
+def _int_many(values):
+    """Column → ints the way safe_int() exports them (truncated, non-finite → 0)."""
+    return np.where(np.isfinite(values), np.trunc(values), 0).astype(np.int64)
+
+
+def _round_many(values, p):
+    """Column → JSON-safe floats (non-finite → 0.0, like safe_float), quantized."""
+    scale = 10.0 ** p
+    values = np.where(np.isfinite(values), values, 0.0)
+    return np.rint(values * scale) / scale + 0.0    # + 0.0: no "-0.0"
+
+
+def _diff_records(old, new):
+    """{"set": {id: changed fields | full record}, "del": [ids]}"""
+    changed = {}
+    for rid, rec in new.items():
+        prev = old.get(rid)
+        if prev is None:
+            changed[rid] = rec
+            continue
+        if prev == rec:
+            continue
+        fields = {k: v for k, v in rec.items() if prev.get(k, _MISSING) != v}
+        if fields:
+            changed[rid] = fields
+
+    removed = [rid for rid in old if rid not in new]
+    return {"set": changed, "del": removed}
+
+
+def _changed(new, old):
+    """Element-wise new != old, NaN == NaN."""
+    if new.dtype.kind == "f":
+        return (new != old) & ~(np.isnan(new) & np.isnan(old))
+    return new != old
+
+
+def _diff_into(changed, old, rec):
+    """_diff_records() for one new / updated record."""
+    prev = old.get(rec["id"])
+    if prev is None:
+        changed[rec["id"]] = rec
+    elif prev != rec:
+        fields = {k: v for k, v in rec.items() if prev.get(k, _MISSING) != v}
+        if fields:
+            changed[rec["id"]] = fields
+
+
+def _left_floors(old, new, diff):
+    """Old floor of every record that was removed or changed floor."""
+    left = {rid: old[rid].get("floor") for rid in diff["del"]}
+    for rid, fields in diff["set"].items():
+        if "floor" in fields and rid in old:
+            left[rid] = old[rid].get("floor")
+    return left
+
+
+def _diff_values(old, new):
+    changed = {k: v for k, v in new.items() if old.get(k, _MISSING) != v}
+    removed = [k for k in old if k not in new]
+    return {"set": changed, "del": removed}
+
+
+_MISSING = object()
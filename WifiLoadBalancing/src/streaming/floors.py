@@ -0,0 +1,219 @@
+import json
+
+# Always kept when a subscription narrows the field set
+ALWAYS = ("id", "floor")
+
+PATCH_PARTS = ("aps_set", "aps_del", "clients_set", "clients_del", "asg_set", "asg_del")
+RECORD_PARTS = ("aps", "clients", "asg")
+
+
+def view_key(floors=None, fields=None):
+    """Canonical subscription key ("*" = everything); safe to send across processes."""
+    f = "*" if floors is None else ",".join(str(x) for x in sorted(set(floors)))
+    k = "*" if fields is None else ",".join(sorted(set(fields) - set(ALWAYS)))
+    return f"floors={f};fields={k}"
+
+
+def parse_view(key):
+    floors, fields = (part.split("=", 1)[1] for part in key.split(";"))
+    return (
+        None if floors == "*" else tuple(int(x) for x in floors.split(",") if x),
+        None if fields == "*" else frozenset(x for x in fields.split(",") if x),
+    )
+
+
+class FloorViews:
+    """
+    Floor-scoped slices of a DeltaEncoder stream.
+
+    After each stream.update(), build(views) returns, per subscription key,
+    the messages its sockets need:
+
+        {key: {"patch": str, "keyframe": str, "full": str}}
+
+    Every floor's share of the patch / records is encoded once per version
+    (and field set) as a JSON fragment; a subscription's message is just
+    its floors' fragments joined, so ten sockets watching floor 3 cost one
+    encode of floor 3.  Messages keep the stream's schema and v/base
+    chain, plus a "floors" list.  A record that changes floor is deleted
+    from the old floor and sent in full to the new one.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._version = None
+        self._patch_groups = None
+        self._record_groups = None
+        self._fragments = {}
+        self.encoded = 0          # fragments encoded (lifetime)
+
+    def build(self, views, keyframe=False):
+        """
+        views:    {key: {"patch": bool, "full": bool}}
+        keyframe: also build keyframes for the patch views
+        """
+        if self.stream.last_patch is None:
+            return {}
+        self._sync()
+
+        out = {}
+        for key, needs in views.items():
+            floors, fields = parse_view(key)
+            frames = {}
+            if needs.get("patch"):
+                frames["patch"] = self._patch(floors, fields)
+                if keyframe:
+                    frames["keyframe"] = self._state("keyframe", floors, fields)
+            if needs.get("full"):
+                frames["full"] = self._state("state", floors, fields)
+            out[key] = frames
+        return out
+
+    def stats(self):
+        return {"version": self._version, "fragments": len(self._fragments),
+                "encoded": self.encoded}
+
+    # ============================================================
+    # Composition
+    # ============================================================
+    def _patch(self, floors, fields):
+        s = self.stream
+        p = self._join(self._patch_grouped(), PATCH_PARTS, floors, fields)
+        return (
+            f'{{"type":"patch","v":{s.version},"base":{s.version - 1},"tick":{s.tick},'
+            f'"floors":{_dumps(floors and list(floors))},'
+            f'"aps":{{"set":{{{p["aps_set"]}}},"del":[{p["aps_del"]}]}},'
+            f'"clients":{{"set":{{{p["clients_set"]}}},"del":[{p["clients_del"]}]}},'
+            f'"assignments":{{"set":{{{p["asg_set"]}}},"del":[{p["asg_del"]}]}},'
+            f'"alarms":{_dumps(_alarms_for(s.alarms, floors))}}}'
+        )
+
+    def _state(self, kind, floors, fields):
+        s = self.stream
+        p = self._join(self._records_grouped(), RECORD_PARTS, floors, fields)
+        data = (
+            f'{{"aps":[{p["aps"]}],"clients":[{p["clients"]}],'
+            f'"assignments":{{{p["asg"]}}},'
+            f'"alarms":{_dumps(_alarms_for(s.alarms, floors) if kind == "state" else [])}}}'
+        )
+        if kind == "keyframe":
+            return (f'{{"type":"keyframe","v":{s.version},"tick":{s.tick},'
+                    f'"floors":{_dumps(floors and list(floors))},"data":{data}}}')
+        return f'{{"type":"state","floors":{_dumps(floors and list(floors))},"data":{data}}}'
+
+    def _join(self, groups, parts, floors, fields):
+        chosen = list(groups) if floors is None else [f for f in floors if f in groups]
+        return {
+            part: ",".join(filter(None, (self._fragment(groups, part, f, fields)
+                                         for f in chosen)))
+            for part in parts
+        }
+
+    def _fragment(self, groups, part, floor, fields):
+        key = (part, floor, fields)
+        frag = self._fragments.get(key)
+        if frag is None:
+            frag = self._fragments[key] = _encode(part, groups[floor][part], fields)
+            self.encoded += 1
+        return frag
+
+    # ============================================================
+    # Per-floor grouping (once per version)
+    # ============================================================
+    def _sync(self):
+        if self._version != self.stream.version:
+            self._version = self.stream.version
+            self._patch_groups = None
+            self._record_groups = None
+            self._fragments = {}
+
+    def _patch_grouped(self):
+        if self._patch_groups is not None:
+            return self._patch_groups
+
+        s, patch = self.stream, self.stream.last_patch
+        groups = {}
+
+        def g(floor):
+            if floor not in groups:
+                groups[floor] = {
+                    "aps_set": {}, "aps_del": [], "clients_set": {}, "clients_del": [],
+                    "asg_set": {}, "asg_del": [],
+                }
+            return groups[floor]
+
+        for kind in ("aps", "clients"):
+            current, left = getattr(s, kind), s.left[kind]
+            for rid, fields in patch[kind]["set"].items():
+                rec = current[rid]
+                floor = rec.get("floor")
+                if rid in left:
+                    # changed floor → gone from the old one, new on this one
+                    g(left[rid])[kind + "_del"].append(rid)
+                    fields = rec
+                    if kind == "clients" and rid in s.assignments:
+                        g(left[rid])["asg_del"].append(rid)
+                        g(floor)["asg_set"][rid] = s.assignments[rid]
+                g(floor)[kind + "_set"][rid] = fields
+            for rid in patch[kind]["del"]:
+                g(left.get(rid))[kind + "_del"].append(rid)
+
+        for uid, aid in patch["assignments"]["set"].items():
+            g(self._client_floor(uid))["asg_set"][uid] = aid
+        for uid in patch["assignments"]["del"]:
+            g(self._client_floor(uid))["asg_del"].append(uid)
+
+        self._patch_groups = groups
+        return groups
+
+    def _records_grouped(self):
+        if self._record_groups is not None:
+            return self._record_groups
+
+        s = self.stream
+        groups = {}
+
+        def g(floor):
+            if floor not in groups:
+                groups[floor] = {"aps": [], "clients": [], "asg": {}}
+            return groups[floor]
+
+        for rec in s.aps.values():
+            g(rec.get("floor"))["aps"].append(rec)
+        for rec in s.clients.values():
+            g(rec.get("floor"))["clients"].append(rec)
+        for uid, aid in s.assignments.items():
+            g(self._client_floor(uid))["asg"][uid] = aid
+
+        self._record_groups = groups
+        return groups
+
+    def _client_floor(self, uid):
+        rec = self.stream.clients.get(uid)
+        return rec.get("floor") if rec is not None else self.stream.left["clients"].get(uid)
+
+
+def _encode(part, value, fields):
+    """JSON fragment without the enclosing {} / []."""
+    if fields is not None and part in ("aps_set", "clients_set"):
+        value = {rid: f for rid, f in ((rid, _only(f, fields)) for rid, f in value.items()) if f}
+    elif fields is not None and part in ("aps", "clients"):
+        value = [_only(r, fields) for r in value]
+    if not value:
+        return ""
+    return _dumps(value)[1:-1]
+
+
+def _only(rec, fields):
+    return {k: v for k, v in rec.items() if k in fields or k in ALWAYS}
+
+
+def _alarms_for(alarms, floors):
+    if floors is None:
+        return alarms
+    return [a for a in alarms
+            if not isinstance(a, dict) or "floor" not in a or a["floor"] in floors]
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+
+# Pending ticks per connection (on top of the one being sent)
+QUEUE_SIZE = 1
+
+DELTA = "delta"      # keyframe + patches (default)
+FULL = "full"        # whole state every tick (/ws?mode=full)
+BINARY = "binary"    # "wifi-bin.v1" id table + binary frames
+
+_ids = itertools.count(1)
+
+
+class Connection:
+    """
+    One WebSocket with its own sender task and a bounded, latest-wins queue.
+
+    broadcast() only calls offer(), which never awaits — a slow browser
+    can fall behind without holding back the tick for anyone else.  When
+    the queue is full the stale tick is dropped:
+
+      • full   → the newer snapshot simply replaces it
+      • delta  → the patch chain is broken, so pending frames are cleared
+                 and the next tick sends this socket a keyframe
+      • binary → if the dropped tick carried an id table, it is carried
+                 over to the newer frame
+    """
+
+    def __init__(self, ws, mode=DELTA, queue_size=QUEUE_SIZE, on_close=None):
+        self.ws = ws
+        self.mode = mode
+        self.id = next(_ids)
+        self.queue_size = max(1, queue_size)
+        self.on_close = on_close
+
+        # Stream sync state
+        self.needs_keyframe = mode == DELTA
+        self.table_version = 0
+        self.view = None          # floor / field subscription key (JSON modes)
+
+        # (payloads, enqueued_at, carries_table)
+        self.queue = deque()
+        self._wake = asyncio.Event()
+        self._task = None
+        self.closed = False
+
+        # Stats
+        self.sent = 0
+        self.dropped = 0
+        self.bytes = 0
+        self.max_depth = 0
+        self.last_latency = 0.0
+        self.avg_latency = 0.0
+        self.max_latency = 0.0
+
+    # ============================================================
+    # Producer side (event loop, never blocks)
+    # ============================================================
+    def offer(self, payloads, carries_table=False):
+        if self.closed or not payloads:
+            return
+
+        if len(self.queue) >= self.queue_size:
+            stale, _, stale_table = self.queue.popleft()
+            self.dropped += 1
+
+            if self.mode == DELTA:
+                # Missing patch → resync with a keyframe next tick
+                self.dropped += len(self.queue) + 1
+                self.queue.clear()
+                self.needs_keyframe = True
+                return
+
+            if self.mode == BINARY and stale_table and not carries_table:
+                payloads = [stale[0], *payloads]
+                carries_table = True
+
+        self.queue.append((payloads, time.perf_counter(), carries_table))
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self._wake.set()
+
+    # ============================================================
+    # Sender task
+    # ============================================================
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self):
+        try:
+            while not self.closed:
+                if not self.queue:
+                    self._wake.clear()
+                    await self._wake.wait()
+                    continue
+
+                payloads, enqueued, _ = self.queue.popleft()
+                for payload in payloads:
+                    if isinstance(payload, bytes):
+                        await self.ws.send_bytes(payload)
+                    else:
+                        await self.ws.send_text(payload)
+                    self.bytes += len(payload)
+
+                latency = time.perf_counter() - enqueued
+                self.sent += 1
+                self.last_latency = latency
+                self.max_latency = max(self.max_latency, latency)
+                self.avg_latency = latency if self.sent == 1 else (
+                    0.9 * self.avg_latency + 0.1 * latency
+                )
+        except asyncio.CancelledError:
+            pass
+        except Exception:
+            pass
+        finally:
+            self.closed = True
+            if self.on_close:
+                self.on_close(self)
+
+    async def close(self):
+        self.closed = True
+        self._wake.set()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+            try:
+                await self._task
+            except BaseException:
+                pass
+
+    def stats(self):
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "view": self.view,
+            "depth": len(self.queue),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "bytes": self.bytes,
+            "latency_ms": {
+                "last": round(self.last_latency * 1000, 2),
+                "avg": round(self.avg_latency * 1000, 2),
+                "max": round(self.max_latency * 1000, 2),
+            },
+        }
@@ -0,0 +1,121 @@
+import gzip
+import json
+
+try:
+    import brotli
+except ImportError:          # optional: br variant is simply not offered
+    brotli = None
+
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+class Snapshot:
+    """
+    One tick's state, encoded once and never mutated afterwards.
+
+        body      → JSON bytes of get_state()       (GET /state)
+        ws_text   → {"type": "state", "data": ...}  (full-mode WebSocket)
+        variants  → {"gzip": bytes, "br": bytes}    (precomputed bodies)
+        etag      → '"<tick>-<seq>"'
+    """
+
+    __slots__ = ("tick", "seq", "etag", "body", "ws_text", "variants")
+
+    def __init__(self, tick, seq, body, encodings):
+        self.tick = tick
+        self.seq = seq
+        self.etag = f'"{tick}-{seq}"'
+        self.body = body
+        self.ws_text = '{"type":"state","data":' + body.decode("utf-8") + "}"
+
+        self.variants = {}
+        if "gzip" in encodings:
+            self.variants["gzip"] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if "br" in encodings and brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+
+    def etag_for(self, encoding=None):
+        """Per-representation ETag (compressed bodies differ byte-wise)."""
+        return self.etag if not encoding else self.etag[:-1] + f'-{encoding}"'
+
+    def negotiate(self, accept_encoding):
+        """
+        Best precomputed encoding the client accepts, or None.  Highest
+        q-value wins (br > gzip on ties); q=0 means "not acceptable", and
+        "*" covers encodings not listed by name.
+        """
+        q = _qvalues(accept_encoding)
+        best, best_q = None, 0.0
+        for enc in ("br", "gzip"):
+            weight = q.get(enc, q.get("*", 0.0))
+            if enc in self.variants and weight > best_q:
+                best, best_q = enc, weight
+        return best
+
+    def matches(self, if_none_match):
+        """True when If-None-Match names any representation of this tick."""
+        if not if_none_match:
+            return False
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        return bool(tags & {self.etag_for(e) for e in (None, *self.variants)})
+
+
+def _qvalues(header):
+    """Accept-Encoding → {coding: q}; malformed q counts as 0."""
+    out = {}
+    for part in (header or "").split(","):
+        coding, *params = part.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        out[coding] = q if 0.0 <= q <= 1.0 else 0.0
+    return out
+
+
+class SnapshotCache:
+    """
+    Holds the latest Snapshot.  publish() runs once per tick (in the
+    executor); readers just grab `current`, so /state and the WebSocket
+    broadcast never touch the live simulator.
+    """
+
+    def __init__(self, encodings=("gzip", "br")):
+        self.encodings = tuple(encodings)
+        self.current = None
+        self._seq = 0
+
+    def publish(self, state, tick):
+        self._seq += 1
+        body = json.dumps(state, ensure_ascii=False).encode("utf-8")
+        snap = Snapshot(tick, self._seq, body, self.encodings)
+        self.current = snap      # single reference swap → readers stay consistent
+        return snap
+
+    def adopt(self, tick, seq, body, variants):
+        """Install a snapshot already encoded elsewhere (the worker process)."""
+        snap = Snapshot(tick, seq, body, encodings=())
+        snap.variants = dict(variants)
+        self.current = snap
+        return snap
+
+    def stats(self):
+        snap = self.current
+        if snap is None:
+            return {"tick": None}
+        return {
+            "tick": snap.tick,
+            "etag": snap.etag,
+            "bytes": len(snap.body),
+            **{f"{enc}_bytes": len(b) for enc, b in snap.variants.items()},
+        }
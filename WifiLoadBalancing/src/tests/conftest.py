@@ -0,0 +1,25 @@
+import json
+
+import pytest
+
+from simulation.simulator import DATA_DIR
+
+
+@pytest.fixture
+def bundled():
+    """Fresh copies of data/aps.json and data/users.json (plain dicts)."""
+    with open(DATA_DIR / "aps.json") as f:
+        aps = json.load(f)
+    with open(DATA_DIR / "users.json") as f:
+        users = json.load(f)
+    return aps, users
+
+
+@pytest.fixture
+def campus():
+    """
+    make_campus(n, seed) with RSSI / nearest AP / user_count filled in the
+    way a tick would (same as benchmarks.bench_mcmf.prepare).
+    """
+    from benchmarks.bench_mcmf import prepare
+    return prepare
@@ -0,0 +1,59 @@
+"""AuctionEngine: valid at any deadline, optimal given time."""
+
+import pytest
+
+from algorithms.auction import AuctionEngine
+from algorithms.mcmf import MCMFEngine
+from test_mcmf import assert_feasible, total_cost
+
+
+def assigned(out):
+    return sum(aid is not None for aid in out.values())
+
+
+@pytest.mark.parametrize("n_users, seed", [(200, 0), (600, 1)])
+def test_auction_reaches_mcmf_optimum(campus, n_users, seed):
+    aps, users = campus(n_users, seed)
+    engine = AuctionEngine(users, aps, time_budget=30)
+    out = engine.run()
+    ref = MCMFEngine(users, aps, workers=1).run()
+
+    assert_feasible(users, aps, out)
+    assert engine.report["optimal"]
+    assert 0 <= engine.report["gap"] < 0.01     # bound, not exact
+    assert assigned(out) == assigned(ref)
+    assert total_cost(users, aps, out) == pytest.approx(total_cost(users, aps, ref), abs=1e-6)
+
+
+def test_zero_budget_still_completes(campus):
+    aps, users = campus(600, 2)
+    engine = AuctionEngine(users, aps, time_budget=0)
+    out = engine.run()
+    ref = MCMFEngine(users, aps, workers=1).run()
+
+    assert_feasible(users, aps, out)
+    assert assigned(out) == assigned(ref)      # complete, just not optimal
+    assert engine.report["gap"] >= 0
+    assert total_cost(users, aps, out) >= total_cost(users, aps, ref) - 1e-6
+
+
+def test_more_users_than_slots(campus):
+    aps, users = campus(300, 3)
+    for ap in aps:
+        ap["airtime_capacity"] = 4
+        ap["user_count"] = 0
+    out = AuctionEngine(users, aps, time_budget=30).run()
+    ref = MCMFEngine(users, aps, workers=1).run()
+    assert_feasible(users, aps, out)
+    assert assigned(out) == assigned(ref) < len(users)
+    assert total_cost(users, aps, out) == pytest.approx(total_cost(users, aps, ref), abs=1e-6)
+
+
+def test_bundled_data(bundled):
+    aps, users = bundled
+    engine = AuctionEngine(users, aps, time_budget=30)
+    out = engine.run()
+    assert_feasible(users, aps, out)
+    assert engine.report["floors"] == len({ap["floor"] for ap in aps})
+    assert total_cost(users, aps, out) == pytest.approx(
+        total_cost(users, aps, MCMFEngine(users, aps, workers=1).run()), abs=1e-6)
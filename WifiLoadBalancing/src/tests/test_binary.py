@@ -0,0 +1,126 @@
+"""BinaryEncoder frames decode back to get_state(); id table sent once."""
+
+import json
+
+import numpy as np
+import pytest
+
+from simulation.simulator import WifiSimulator
+from streaming.binary import FORMAT_VERSION, HEADER, BinaryEncoder
+
+
+def decode(table_json, frame):
+    """Python mirror of binaryStream.decode() in frontend/index.html."""
+    table = json.loads(table_json)
+    fmt, _, tick, version, n_aps, n = HEADER.unpack_from(frame, 0)
+    assert fmt == FORMAT_VERSION and version == table["v"]
+    assert (n_aps, n) == (len(table["aps"]), len(table["clients"]))
+
+    off = HEADER.size
+    cols = {}
+    for name, dtype, size in [
+        ("x", "<f4", n), ("y", "<f4", n), ("_gx", "<f4", n), ("_gy", "<f4", n),
+        ("load", "<f4", n_aps), ("coverage_radius", "<f4", n_aps),
+        ("RSSI", "<i2", n), ("nearest_ap", "<i2", n), ("assigned_ap", "<i2", n),
+        ("connected_ap", "<i2", n), ("user_count", "<i2", n_aps), ("visible", "u1", n),
+    ]:
+        arr = np.frombuffer(frame, dtype=dtype, count=size, offset=off)
+        assert off % arr.itemsize == 0          # typed arrays need alignment
+        cols[name] = arr
+        off += arr.nbytes
+    assert off == len(frame)
+
+    ap_ids = [ap["id"] for ap in table["aps"]]
+    ref = lambda k: ap_ids[k] if k >= 0 else None
+    clients = []
+    for k, c in enumerate(table["clients"]):
+        if not cols["visible"][k]:
+            continue
+        clients.append({
+            **c,
+            **{f: float(cols[f][k]) for f in ("x", "y", "_gx", "_gy")},
+            "RSSI": int(cols["RSSI"][k]),
+            **{f: ref(int(cols[f][k])) for f in ("nearest_ap", "assigned_ap", "connected_ap")},
+        })
+    aps = [{**ap, "load": float(cols["load"][k]), "user_count": int(cols["user_count"][k])}
+           for k, ap in enumerate(table["aps"])]
+    return tick, aps, clients
+
+
+def assert_matches_state(sim, decoded):
+    tick, aps, clients = decoded
+    state = sim.get_state()
+    assert tick == sim.tick
+
+    want = {u["id"]: u for u in state["clients"]}
+    assert [c["id"] for c in clients] == list(want)
+    for c in clients:
+        u = want[c["id"]]
+        for f in ("x", "y", "_gx", "_gy"):
+            assert c[f] == pytest.approx(u[f], abs=1e-3, rel=1e-6)
+        for f in ("RSSI", "nearest_ap", "assigned_ap", "connected_ap", "floor", "room",
+                  "airtime_usage"):
+            assert c[f] == u[f], f
+
+    want_aps = {ap["id"]: ap for ap in state["aps"]}
+    for ap in aps:
+        assert ap["load"] == pytest.approx(want_aps[ap["id"]]["load"], rel=1e-6, abs=1e-4)
+        assert ap["user_count"] == want_aps[ap["id"]]["user_count"]
+
+
+@pytest.fixture
+def sim():
+    sim = WifiSimulator(seed=11)
+    sim.step()
+    return sim
+
+
+def test_frames_round_trip(sim):
+    enc = BinaryEncoder()
+    for _ in range(5):
+        sim.step()
+        assert_matches_state(sim, decode(*enc.encode(sim)))
+
+
+def test_out_of_coverage_clients_hidden_not_dropped(sim):
+    enc = BinaryEncoder()
+    sim.set_band("6")           # tiny cells: most users out of range
+    sim.step()
+    table, frame = enc.encode(sim)
+    _, _, clients = decode(table, frame)
+    assert len(json.loads(table)["clients"]) == len(sim.clients)
+    assert 0 < len(clients) < len(sim.clients)
+    assert_matches_state(sim, decode(table, frame))
+
+
+def test_id_table_sent_once_while_visibility_churns(sim):
+    enc = BinaryEncoder()
+    sim.set_band("6")
+    visible = set()
+    for _ in range(40):
+        sim.step()
+        table, frame = enc.encode(sim)
+        visible.add(tuple(c["id"] for c in decode(table, frame)[2]))
+    assert len(visible) > 1                     # coverage really changed …
+    assert enc.table_version == 1               # … and the table stayed put
+
+
+def test_membership_change_bumps_table(sim):
+    enc = BinaryEncoder()
+    enc.encode(sim)
+    floor = sim.clients[0]["floor"]
+    sim.add_users({floor: 2})
+    sim.step()
+    table, frame = enc.encode(sim)
+    assert enc.table_version == 2
+    assert_matches_state(sim, decode(table, frame))
+
+
+def test_ap_killer_rides_along(sim):
+    enc = BinaryEncoder()
+    sim.ap_killer.deploy()
+    sim.step()
+    table, frame = enc.encode(sim)
+    _, _, clients = decode(table, frame)
+    assert clients[-1]["id"] == "AP-KILLER"
+    assert_matches_state(sim, decode(table, frame))
@@ -0,0 +1,102 @@
+"""Command validation, batching, and record / replay of command logs."""
+
+import pytest
+
+from simulation import commands
+from simulation.commands import CommandError, apply_batch, check
+from simulation.replay import CommandLog, Replayer, read_log
+from simulation.simulator import WifiSimulator
+
+
+@pytest.mark.parametrize("name, args", [
+    ("add_user", {"floor": 40_000}),
+    ("remove_user", {"floor": -40_000}),
+    ("apkiller_floor", {"level": 1_000_000}),
+    ("add_user", {"floor": 2, "count": 0}),
+    ("add_user", {"floor": 2, "count": commands.MAX_COUNT + 1}),
+    ("add_user", {"floor": "two"}),
+    ("add_user", {}),
+    ("set_band", {"band": "60"}),
+    ("warp_drive", {}),
+])
+def test_check_rejects(name, args):
+    with pytest.raises(CommandError):
+        check(name, args)
+
+
+def test_check_normalizes_types():
+    assert check("add_user", {"floor": "3", "count": 2.0}) == {"floor": 3, "count": 2}
+    assert check("apkiller_move", {"vx": 1}) == {"vx": 1.0}
+    assert check("apkiller_floor", {"level": commands.FLOOR_MAX}) == {"level": commands.FLOOR_MAX}
+
+
+class BrokenLog:
+    def write(self, tick, batch):
+        raise OSError("disk full")
+
+
+def test_failed_log_write_does_not_drop_batch():
+    sim = WifiSimulator(seed=1)
+    n = len(sim.clients)
+    floor = sim.clients[0]["floor"]
+    errors = apply_batch(sim, [("add_user", {"floor": floor, "count": 3})], recorder=BrokenLog())
+    assert errors == [("record", "disk full")]
+    assert len(sim.clients) == n + 3
+
+
+def test_post_commands_rejects_out_of_range_floor():
+    from fastapi.testclient import TestClient
+    import main
+
+    client = TestClient(main.app)       # no lifespan: nothing gets queued
+    r = client.post("/commands", json=[{"cmd": "add_user", "floor": 2},
+                                       {"cmd": "add_user", "floor": 70_000}])
+    assert r.status_code == 400
+    assert "commands[1]" in r.json()["error"]
+    assert not main.pending_commands
+
+
+def _state(sim):
+    return [(u["id"], u["floor"], round(u["x"], 6), round(u["y"], 6), u["assigned_ap"])
+            for u in sim.clients]
+
+
+def test_record_and_replay_reproduce_the_run(tmp_path):
+    path = tmp_path / "session.wlog"
+    script = {
+        2: [("add_user", {"floor": 3, "count": 4}), ("set_band", {"band": "2.4"})],
+        5: [("remove_user", {"floor": 3, "count": 2}), ("apkiller_deploy", {}),
+            ("apkiller_floor", {"level": 3}), ("apkiller_move", {"vx": 0.5, "vy": -1.0})],
+        9: [("set_band", {"band": "5"}), ("apkiller_withdraw", {})],
+    }
+
+    live = WifiSimulator(seed=7)
+    log = CommandLog(path, seed=7)
+    for _ in range(12):
+        batch = [(name, check(name, args)) for name, args in script.get(live.tick, [])]
+        if batch:
+            assert apply_batch(live, batch, recorder=log) == []
+        live.step()
+    log.close(live.tick)
+
+    header, records, last = read_log(path)
+    assert header["seed"] == 7 and last == live.tick
+    assert [(t, n, a) for t, n, a in records] == [
+        (t, n, check(n, a)) for t, batch in sorted(script.items()) for n, a in batch]
+
+    replay = WifiSimulator(seed=header["seed"])
+    replayer = Replayer(records)
+    for _ in range(last):
+        replayer(replay)
+        replay.step()
+    assert replayer.errors == []
+    assert _state(replay) == _state(live)
+
+
+def test_log_without_end_marker_is_readable(tmp_path):
+    path = tmp_path / "killed.wlog"
+    log = CommandLog(path, seed=None)
+    log.write(4, [("add_user", {"floor": 1, "count": 1})])
+    log._f.close()                      # killed before close(tick)
+    _, records, last = read_log(path)
+    assert records == [(4, "add_user", {"floor": 1, "count": 1})] and last == 5
@@ -0,0 +1,97 @@
+"""compute_cost_matrix / compute_floor_cost_matrices vs the scalar compute_cost."""
+
+import random
+
+import numpy as np
+import pytest
+
+from algorithms.cost_function import (
+    FLOOR_PENALTY,
+    compute_cost,
+    compute_cost_matrix,
+    compute_floor_cost_matrices,
+)
+from simulation.simulator import WifiSimulator
+
+# compute_cost rounds with round(), the matrix with np.round
+ATOL = 1e-3 + 1e-9
+
+
+def scalar_matrix(users, aps, **kw):
+    return np.array([[compute_cost(u, ap, **kw) for ap in aps] for u in users], dtype=float)
+
+
+def loaded(aps, seed=0):
+    """Give the APs the load / user_count spread a running sim would."""
+    rng = random.Random(seed)
+    for ap in aps:
+        ap["load"] = rng.uniform(0, 140)
+        ap["user_count"] = rng.randint(0, 40)
+    return aps
+
+
+def test_bundled_layout_matches_scalar(bundled):
+    aps, users = bundled
+    loaded(aps)
+    np.testing.assert_allclose(compute_cost_matrix(users, aps), scalar_matrix(users, aps), atol=ATOL)
+
+
+def test_cross_floor_pairs_get_floor_penalty(bundled):
+    aps, users = bundled
+    costs = compute_cost_matrix(users, aps)
+    cross = np.array([[u["floor"] != ap["floor"] for ap in aps] for u in users])
+    assert cross.any() and (~cross).any()
+    assert (costs[cross] == FLOOR_PENALTY).all()
+    assert (costs[~cross] < FLOOR_PENALTY).all()
+
+
+def test_odd_records_match_scalar(bundled):
+    aps, users = bundled
+    loaded(aps)
+    users = users[:20] + [
+        {"id": "no_floor", "x": 10, "y": 10},                       # floor None
+        {"id": "no_ap_floor", "floor": 99, "x": 10, "y": 10},       # floor without APs
+        {"id": "no_xy", "floor": aps[0]["floor"]},                  # distance → 9999
+        {"id": "bad_xy", "floor": aps[0]["floor"], "x": "?", "y": None},
+        {"id": "heavy", "floor": aps[0]["floor"], "x": 0, "y": 0, "airtime_usage": 7},
+    ]
+    aps = aps + [
+        {"id": "bare", "floor": aps[0]["floor"], "x": 5, "y": 5},   # no load / capacity / interference
+        {"id": "no_xy_ap", "floor": aps[0]["floor"], "load": 50},
+        {"id": "zero_cap", "floor": aps[0]["floor"], "x": 1, "y": 1,
+         "airtime_capacity": 0, "load": 10},                         # emergency load penalty
+    ]
+    np.testing.assert_allclose(compute_cost_matrix(users, aps), scalar_matrix(users, aps), atol=ATOL)
+
+
+def test_custom_weights_and_alpha_match_scalar(bundled):
+    aps, users = bundled
+    loaded(aps, seed=1)
+    weights = {"distance": 0.05, "signal": 2.0, "airtime": 0.3, "sticky": 3.0,
+               "interference": 1.5, "load": 4.0}
+    kw = {"weights": weights, "alpha": 0.0}
+    np.testing.assert_allclose(compute_cost_matrix(users, aps, **kw),
+                               scalar_matrix(users, aps, **kw), atol=ATOL)
+
+
+@pytest.mark.parametrize("band", ["2.4", "5", "6"])
+def test_simulator_records_match_scalar(band):
+    # Record views off the column store; on "6" most users are out of band
+    sim = WifiSimulator(seed=4)
+    sim.set_band(band)
+    for _ in range(3):
+        sim.step()
+    users, aps = list(sim.clients), list(sim.aps)
+    if band == "6":
+        assert any(not u.get("nearest_ap") for u in users)
+    np.testing.assert_allclose(compute_cost_matrix(users, aps), scalar_matrix(users, aps), atol=ATOL)
+
+
+def test_floor_blocks_cover_only_same_floor_pairs(bundled):
+    aps, users = bundled
+    blocks = compute_floor_cost_matrices(users, aps)
+    assert set(blocks) == {u["floor"] for u in users} & {ap["floor"] for ap in aps}
+    for floor, (rows, cols, block) in blocks.items():
+        assert all(users[i]["floor"] == floor for i in rows)
+        assert [j for j, ap in enumerate(aps) if ap["floor"] == floor] == cols.tolist()
+        assert block.shape == (len(rows), len(cols))
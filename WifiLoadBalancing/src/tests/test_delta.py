@@ -0,0 +1,107 @@
+"""DeltaEncoder.update_sim() (column diff) == update(get_state()) (dict diff)."""
+
+import json
+
+import numpy as np
+import pytest
+
+from simulation.simulator import WifiSimulator
+from streaming.delta import DeltaEncoder, _round, _round_many
+from streaming.floors import FloorViews, view_key
+
+
+def apply(records, part):
+    """Client-side patch apply (frontend applyPatch) for one record map."""
+    records = dict(records)
+    for rid, fields in part["set"].items():
+        records[rid] = {**records[rid], **fields} if rid in records else fields
+    for rid in part["del"]:
+        records.pop(rid, None)
+    return records
+
+
+def by_id(frame):
+    """Keyframe / state with its client list keyed by id (list order is draw order only)."""
+    frame = json.loads(frame)
+    frame["data"]["clients"] = {c["id"]: c for c in frame["data"]["clients"]}
+    return frame
+
+
+def events(sim):
+    """Ticks covering joins, swap-removes, a band switch and the AP killer."""
+    floor = sim.clients[0]["floor"]
+    plan = {3: lambda: sim.add_users({floor: 6}),
+            6: lambda: sim.remove_users({floor: 4}),
+            9: lambda: sim.set_band("6"),
+            12: sim.ap_killer.deploy,
+            15: sim.ap_killer.withdraw,
+            17: lambda: sim.set_band("5")}
+    for i in range(20):
+        sim.step()
+        if i in plan:
+            plan[i]()
+        yield i
+
+
+@pytest.fixture
+def sim():
+    sim = WifiSimulator(seed=5)
+    sim.step()
+    return sim
+
+
+def test_update_sim_matches_dict_path(sim):
+    by_state, by_cols = DeltaEncoder(), DeltaEncoder()
+    for i in events(sim):
+        a = json.loads(by_state.update(sim.get_state(), sim.tick))
+        b = json.loads(by_cols.update_sim(sim))
+        b["clients"]["del"].sort()
+        a["clients"]["del"].sort()
+        assert a == b, i
+        assert by_state.clients == by_cols.clients
+        assert by_state.left == by_cols.left
+        assert by_id(by_state.keyframe()) == by_id(by_cols.keyframe())
+
+
+def test_patches_rebuild_keyframe(sim):
+    enc = DeltaEncoder()
+    enc.update_sim(sim)
+    clients = by_id(enc.keyframe())["data"]["clients"]
+    for _ in events(sim):
+        clients = apply(clients, json.loads(enc.update_sim(sim))["clients"])
+        assert clients == by_id(enc.keyframe())["data"]["clients"]
+
+
+def test_unchanged_rows_not_sent(sim):
+    enc = DeltaEncoder()
+    enc.update_sim(sim)
+    patch = json.loads(enc.update_sim(sim))         # no step in between
+    assert patch["clients"] == {"set": {}, "del": []}
+    assert patch["assignments"] == {"set": {}, "del": []}
+
+
+def test_floor_views_after_update_sim(sim):
+    by_state, by_cols = DeltaEncoder(), DeltaEncoder()
+    views = {view_key([sim.clients[0]["floor"]]): {"patch": True, "full": True}}
+    for i in events(sim):
+        by_state.update(sim.get_state(), sim.tick)
+        by_cols.update_sim(sim)
+        a = FloorViews(by_state).build(views, keyframe=True)
+        b = FloorViews(by_cols).build(views, keyframe=True)
+        for key in views:
+            for kind in a[key]:
+                if kind != "patch":
+                    assert by_id(a[key][kind]) == by_id(b[key][kind]), i
+                    continue
+                x, y = json.loads(a[key][kind]), json.loads(b[key][kind])
+                x["clients"]["del"].sort()
+                y["clients"]["del"].sort()
+                assert x == y, i
+
+
+def test_round_many_matches_scalar():
+    v = np.concatenate([np.random.default_rng(0).uniform(-500, 500, 5000),
+                        np.arange(-500, 500) / 100 + 0.005, [-0.001, np.nan, np.inf]])
+    want = [_round(x, 2) if np.isfinite(x) else 0.0 for x in v.tolist()]
+    assert _round_many(v, 2).tolist() == want
+    assert str(_round_many(np.array([-0.001]), 2)[0]) == "0.0"
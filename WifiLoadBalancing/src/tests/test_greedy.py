@@ -0,0 +1,52 @@
+"""GreedyRedistributor over ClientTable / APTable == over plain dicts."""
+
+import contextlib
+import os
+
+import numpy as np
+import pytest
+
+from algorithms.greedy_redistribution import GreedyRedistributor
+from algorithms.spatial_index import APGrid
+from benchmarks.synthetic import make_campus
+from simulation.simulator import WifiSimulator
+
+
+@pytest.fixture(scope="module")
+def crowded():
+    """Stepped sim whose APs overload and still have neighbours to move to."""
+    aps, users, floors = make_campus(8000, seed=1, ap_spacing=150)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        sim = WifiSimulator(aps=aps, users=users, floors=floors, seed=4, solver="greedy")
+        for _ in range(2):
+            sim.step()
+        sim.update_rssi()
+        sim.update_ap_load()
+    return sim
+
+
+def test_table_path_matches_dicts(crowded):
+    sim = crowded
+    active = np.flatnonzero(sim.clients.col("nearest_ap") >= 0)
+    ap_dicts = sim.aps.to_records()
+    user_dicts = sim.clients.to_records()
+    subset = [user_dicts[r] for r in active.tolist()]
+    cell = sim.band_coverage[sim.current_band]
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        by_dict = GreedyRedistributor(ap_dicts, subset, APGrid(ap_dicts, cell),
+                                      alpha=sim.capacity_alpha)
+        by_dict.redistribute()
+        by_table = GreedyRedistributor(sim.aps, sim.clients, sim.get_ap_index(),
+                                       alpha=sim.capacity_alpha, rows=active)
+        by_table.redistribute()
+
+    assert by_table.moves == by_dict.moves > 0
+    assert by_table.overloaded == by_dict.overloaded
+    assert [u["assigned_ap"] for u in subset] == \
+        [sim.clients[r]["assigned_ap"] for r in active.tolist()]
+    assert [u["connected_ap"] for u in subset] == \
+        [sim.clients[r]["connected_ap"] for r in active.tolist()]
+    for ap, row in zip(ap_dicts, sim.aps):
+        assert row["load"] == ap["load"]
+        assert row["connected_clients"] == ap["connected_clients"]
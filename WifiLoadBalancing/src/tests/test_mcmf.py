@@ -0,0 +1,180 @@
+"""MCMFEngine: in-house SSP solver vs the networkx reference."""
+
+import random
+
+import pytest
+
+from algorithms.cost_function import compute_cost, dynamic_capacity
+from algorithms.flow_solver import FlowProblem, SSPSolver
+from algorithms import mcmf
+from algorithms.mcmf import MCMFEngine
+
+
+def assert_feasible(users, aps, assignments):
+    """Every user present, floor rule held, no AP above its capacity."""
+    assert set(assignments) == {u["id"] for u in users}
+    assert any(aid is not None for aid in assignments.values())
+    ap_by_id = {ap["id"]: ap for ap in aps}
+    count = {}
+    for u in users:
+        aid = assignments[u["id"]]
+        if aid is None:
+            continue
+        assert ap_by_id[aid]["floor"] == u["floor"]
+        count[aid] = count.get(aid, 0) + 1
+    for aid, n in count.items():
+        assert n <= int(max(1, dynamic_capacity(ap_by_id[aid])))
+
+
+def total_cost(users, aps, assignments):
+    ap_by_id = {ap["id"]: ap for ap in aps}
+    return sum(compute_cost(u, ap_by_id[assignments[u["id"]]])
+               for u in users if assignments[u["id"]] is not None)
+
+
+def test_ssp_matches_networkx_on_bundled_data(bundled):
+    aps, users = bundled
+    ssp = MCMFEngine(users, aps, workers=1).run()
+    ref = MCMFEngine(users, aps, solver="networkx").run()
+    assert_feasible(users, aps, ssp)
+    assert ssp == ref
+
+
+@pytest.mark.parametrize("n_users, seed", [(150, 0), (400, 1)])
+def test_ssp_matches_networkx_on_synthetic_campus(campus, n_users, seed):
+    aps, users = campus(n_users, seed)
+    ssp = MCMFEngine(users, aps, workers=1).run()
+    ref = MCMFEngine(users, aps, solver="networkx").run()
+    assert_feasible(users, aps, ssp)
+    assert ssp == ref
+
+
+def test_over_capacity_floor_assigns_max_flow(campus):
+    # Shrink every AP so users outnumber slots: max flow, then min cost
+    aps, users = campus(300, 2)
+    for ap in aps:
+        ap["airtime_capacity"] = 3
+        ap["user_count"] = 0
+    ssp = MCMFEngine(users, aps, workers=1).run()
+    ref = MCMFEngine(users, aps, solver="networkx").run()
+    assert_feasible(users, aps, ssp)
+    assert None in ssp.values()
+    assert sum(a is not None for a in ssp.values()) == sum(a is not None for a in ref.values())
+    assert total_cost(users, aps, ssp) == pytest.approx(total_cost(users, aps, ref), abs=1e-6)
+
+
+def test_global_problem_solves_like_engine(campus):
+    aps, users = campus(300, 3)
+    problem = FlowProblem.from_users(users, aps)
+    assign = SSPSolver(problem).solve()
+    merged = {uid: (problem.ap_ids[a] if a >= 0 else None)
+              for uid, a in zip(problem.user_ids, assign)}
+    engine = MCMFEngine(users, aps, workers=1).run()
+    assert total_cost(users, aps, merged) == pytest.approx(total_cost(users, aps, engine), abs=1e-6)
+
+
+def test_unknown_solver_rejected():
+    with pytest.raises(ValueError):
+        MCMFEngine([], [], solver="simplex")
+
+
+# ============================================================
+# Per-floor split + process pool (user-004)
+# ============================================================
+@pytest.fixture
+def pooled(monkeypatch):
+    """Force the pool path even for small campuses; shut it down after."""
+    monkeypatch.setattr(mcmf, "PARALLEL_MIN_USERS", 0)
+    yield
+    if mcmf._pool is not None:
+        mcmf._pool.shutdown()
+        mcmf._pool = None
+        mcmf._pool_workers = 0
+
+
+def test_pool_matches_inline(campus, pooled):
+    aps, users = campus(500, 4)
+    inline = MCMFEngine(users, aps, workers=1)
+    pooled_engine = MCMFEngine(users, aps, workers=2)
+    assert pooled_engine._pool_size(7) == 2
+    assert pooled_engine.run() == inline.run()
+    assert pooled_engine.report == inline.report
+    assert pooled_engine.report["floors"] == len({u["floor"] for u in users})
+
+
+def test_users_on_floors_without_aps_stay_unassigned(bundled):
+    aps, users = bundled
+    floor = aps[0]["floor"]
+    aps = [ap for ap in aps if ap["floor"] != floor]
+    out = MCMFEngine(users, aps, workers=1).run()
+    assert_feasible(users, aps, out)
+    assert all(out[u["id"]] is None for u in users if u["floor"] == floor)
+
+
+# ============================================================
+# Warm start (user-005)
+# ============================================================
+def test_warm_start_matches_cold_solve(campus):
+    aps, users = campus(400, 5)
+    rng = random.Random(5)
+    state, warm_aug, cold_aug = {}, 0, 0
+    extra = 0
+
+    for tick in range(12):
+        for u in users:
+            u["x"] += rng.uniform(-4, 4)
+            u["y"] += rng.uniform(-4, 4)
+        if tick % 3 == 1:       # users leave …
+            del users[rng.randrange(len(users))]
+            del users[rng.randrange(len(users))]
+        if tick % 3 == 2:       # … and join
+            extra += 1
+            users.append({**users[rng.randrange(len(users))], "id": f"Joined_{extra}"})
+
+        cold = MCMFEngine(users, aps, workers=1)
+        warm = MCMFEngine(users, aps, workers=1, warm_state=state)
+        cold_out, warm_out = cold.run(), warm.run()
+
+        assert warm_out == cold_out
+        assert warm.report["incremental"] == (tick > 0)     # tick 0: empty state
+        assert not cold.report["incremental"]
+        state = warm.state
+        cold_aug += cold.report["augmentations"]
+        warm_aug += warm.report["augmentations"]
+
+    # Reused flow: far fewer augmentations than solving from scratch
+    assert warm_aug < cold_aug / 2
+
+
+def test_warm_start_survives_capacity_drop(campus):
+    aps, users = campus(300, 6)
+    first = MCMFEngine(users, aps, workers=1)
+    first.run()
+    for ap in aps[::2]:
+        ap["airtime_capacity"] = 5
+        ap["user_count"] = 0
+    warm = MCMFEngine(users, aps, workers=1, warm_state=first.state)
+    cold = MCMFEngine(users, aps, workers=1)
+    warm_out = warm.run()
+    assert warm.report["released"] > 0
+    assert_feasible(users, aps, warm_out)
+    assert total_cost(users, aps, warm_out) == pytest.approx(total_cost(users, aps, cold.run()), abs=1e-6)
+
+
+def test_incremental_only_when_state_is_used(campus):
+    aps, users = campus(300, 7)
+    first = MCMFEngine(users, aps, workers=1)
+    first.run()
+    assert not first.report["incremental"] and first.report["warm_floors"] == 0
+
+    empty = MCMFEngine(users, aps, workers=1, warm_state={})
+    empty.run()
+    assert not empty.report["incremental"]
+
+    other_floors = MCMFEngine(users, aps, workers=1, warm_state={"no such floor": {"assignment": {}}})
+    other_floors.run()
+    assert not other_floors.report["incremental"]
+
+    warm = MCMFEngine(users, aps, workers=1, warm_state=first.state)
+    warm.run()
+    assert warm.report["incremental"] and warm.report["warm_floors"] == len(first.state)
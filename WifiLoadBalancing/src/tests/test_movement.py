@@ -0,0 +1,116 @@
+"""move_users(): wall bounce, NaN repair, lost-room reset; RoomBounds.ids() lookups."""
+
+import math
+
+import numpy as np
+import pytest
+
+from simulation import simulator as sim_module
+from simulation.layout import RoomBounds
+from simulation.simulator import WifiSimulator
+from simulation.state_store import INT_NONE, Interner
+
+FLOORS = [
+    {"level": 0, "rooms": [{"name": "Lab", "x": 0, "y": 0, "width": 100, "height": 50},
+                           {"name": "Hall", "x": 100, "y": 0, "width": 200, "height": 50}]},
+    {"level": 2, "rooms": [{"name": "Lab", "x": 0, "y": 0, "width": 40, "height": 40}]},
+    {"level": 2, "rooms": [{"name": "Ignored", "x": 0, "y": 0, "width": 1, "height": 1}]},
+]
+
+
+@pytest.fixture
+def sim(monkeypatch):
+    monkeypatch.setattr(sim_module, "TURN_CHANCE", 0.0)     # headings only change when invalid
+    sim = WifiSimulator(seed=7)
+    sim.step()
+    return sim
+
+
+def place(sim, row, x, y, vx, vy):
+    user = sim.clients[row]
+    user.update(x=x, y=y, vx=vx, vy=vy)
+    return user, sim.get_user_room_bounds(user)
+
+
+# ============================================================
+# move_users
+# ============================================================
+def test_bounce_off_walls(sim):
+    user, b = sim.clients[0], sim.get_user_room_bounds(sim.clients[0])
+    mid_y = (b["y1"] + b["y2"]) / 2
+    place(sim, 0, b["x2"] - 0.5, mid_y, 2.0, 0.0)             # about to cross the right wall
+    sim.move_users()
+    assert user["vx"] == -2.0 and user["x"] == b["x2"] - 1 and user["y"] == mid_y
+
+    place(sim, 0, (b["x1"] + b["x2"]) / 2, b["y1"] + 0.5, 0.0, -1.5)
+    sim.move_users()
+    assert user["vy"] == 1.5 and user["y"] == b["y1"] + 1
+
+
+def test_users_stay_in_their_room(sim):
+    for _ in range(50):
+        sim.move_users()
+        for user in sim.clients:
+            b = sim.get_user_room_bounds(user)
+            assert b["x1"] <= user["x"] <= b["x2"] and b["y1"] <= user["y"] <= b["y2"]
+
+
+def test_nan_position_and_velocity_are_repaired(sim):
+    user, b = place(sim, 0, math.nan, math.nan, 0.0, 0.0)
+    sim.move_users()
+    assert (user["x"], user["y"]) == ((b["x1"] + b["x2"]) / 2, (b["y1"] + b["y2"]) / 2)
+
+    place(sim, 0, user["x"], user["y"], math.nan, math.inf)
+    sim.move_users()
+    speed = math.hypot(user["vx"], user["vy"])
+    assert sim_module.SPEED_MIN <= speed <= sim_module.SPEED_MAX
+    assert np.isfinite(sim.clients.col("x")).all() and np.isfinite(sim.clients.col("y")).all()
+
+
+def test_unknown_room_resets_to_a_spawn_room(sim):
+    lost, other = sim.clients[0], sim.clients[1]
+    lost["room"] = "Nowhere"                    # new pool code → LUT rebuild, rid < 0
+    before = (other["x"], other["y"])
+    sim.move_users()
+
+    b = sim.get_user_room_bounds(lost)
+    assert b is not None and lost["room"] != "Nowhere"
+    assert (lost["x"], lost["y"]) == ((b["x1"] + b["x2"]) / 2, (b["y1"] + b["y2"]) / 2)
+    assert (other["x"], other["y"]) != before   # the rest still moved this tick
+
+
+# ============================================================
+# RoomBounds.ids
+# ============================================================
+def test_room_ids_by_floor_and_name():
+    rooms = RoomBounds(FLOORS)
+    pool = Interner()
+    room = np.array([pool.code(n) for n in ("LAB", "hall", "Lab", "Hall", "Ignored", None)])
+    floor = np.array([0, 0, 2, 2, 2, 0])
+    assert rooms.ids(floor, room, pool).tolist() == [0, 1, 2, -1, -1, -1]
+
+    unknown = np.array([1, 3, INT_NONE])        # missing floors / None
+    assert rooms.ids(unknown, room[:3], pool).tolist() == [-1, -1, -1]
+
+
+def test_lookup_rebuilds_when_the_pool_grows():
+    rooms = RoomBounds(FLOORS)
+    pool = Interner()
+    lab = pool.code("Lab")
+    assert rooms.ids(np.array([0]), np.array([lab]), pool).tolist() == [0]
+    stale = rooms._lut
+
+    hall = pool.code("Hall")                    # code past the cached table
+    got = rooms.ids(np.array([0, 0]), np.array([lab, hall]), pool)
+    assert got.tolist() == [0, 1] and rooms._lut is not stale
+    assert rooms._lut.shape == (2, len(pool) + 1)
+
+    cached = rooms._lut
+    assert rooms.ids(np.array([0]), np.array([hall]), pool).tolist() == [1]
+    assert rooms._lut is cached                 # reused while the pool is unchanged
+
+
+def test_no_rooms():
+    rooms = RoomBounds([])
+    pool = Interner()
+    assert rooms.ids(np.array([0]), np.array([pool.code("Lab")]), pool).tolist() == [-1]
@@ -0,0 +1,90 @@
+"""TickProfiler: overlapping calls from several threads never fail a tick."""
+
+import cProfile
+import threading
+
+import pytest
+
+from observability import profiler as profiler_module
+from observability.profiler import TickProfiler
+
+
+def busy(n=20_000):
+    return sum(i * i for i in range(n))
+
+
+def hammer(prof, threads=4, calls=20):
+    """profiler.call() from several threads at once, like step + encode."""
+    errors = []
+    barrier = threading.Barrier(threads)
+
+    def run():
+        barrier.wait()
+        for _ in range(calls):
+            try:
+                prof.call(busy)
+            except Exception as e:          # noqa: BLE001 — any raise fails a tick
+                errors.append(e)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return errors
+
+
+def test_cprofile_job_survives_concurrent_calls(tmp_path):
+    prof = TickProfiler(tmp_path)
+    job = prof.start(ticks=1, mode="cprofile")
+    assert hammer(prof) == []
+    prof.step_done()
+    result = prof.cycle_done()
+
+    assert job.done.is_set() and "error" not in result
+    assert result["mode"] == "cprofile" and (tmp_path / result["file"]).exists()
+    assert any("busy" in row["function"] for row in result["top"])
+
+
+def test_falls_back_to_sampling_when_cprofile_is_taken(tmp_path, monkeypatch):
+    class Taken(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiler_module, "PROCESS_WIDE", True)
+    monkeypatch.setattr(profiler_module.cProfile, "Profile", Taken)
+
+    prof = TickProfiler(tmp_path)
+    prof.start(ticks=1, mode="cprofile")
+    assert hammer(prof, calls=5) == []
+    prof.step_done()
+    result = prof.cycle_done()
+    assert result["mode"] == "sample" and "already active" in result["fallback"]
+
+
+def test_per_call_profile_skips_a_busy_thread(tmp_path, monkeypatch):
+    class Taken(cProfile.Profile):
+        def enable(self, *args, **kwargs):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setattr(profiler_module, "PROCESS_WIDE", False)
+    prof = TickProfiler(tmp_path)
+    prof.start(ticks=1, mode="cprofile")
+    monkeypatch.setattr(profiler_module.cProfile, "Profile", Taken)
+    assert prof.call(busy, 10) == busy(10)          # ran, just unprofiled
+    prof.finish()
+
+
+@pytest.mark.skipif(not profiler_module.PROCESS_WIDE, reason="per-thread cProfile before 3.12")
+def test_real_foreign_profiler_forces_fallback(tmp_path):
+    other = cProfile.Profile()
+    other.enable()
+    try:
+        prof = TickProfiler(tmp_path)
+        prof.start(ticks=1, mode="cprofile")
+        assert hammer(prof, calls=5) == []
+        prof.step_done()
+        result = prof.cycle_done()
+    finally:
+        other.disable()
+    assert result["mode"] == "sample" and "fallback" in result
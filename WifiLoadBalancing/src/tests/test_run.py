@@ -0,0 +1,50 @@
+"""KPILog: moves are counted per client id, not per table row."""
+
+import pytest
+
+from simulation.run import KPILog
+from simulation.simulator import WifiSimulator
+
+
+def assigned_by_id(sim):
+    return dict(zip(list(sim.clients.ids()), sim.clients.col("assigned_ap").tolist()))
+
+
+def expected_moves(before, after):
+    return sum(1 for rid, ap in after.items() if rid in before and before[rid] != ap)
+
+
+@pytest.fixture
+def sim():
+    sim = WifiSimulator(seed=3)
+    for _ in range(3):
+        sim.step()
+    return sim
+
+
+def test_joins_and_leaves_are_not_moves(sim):
+    log = KPILog()
+    log.record(sim, 0.0)
+    floor = sim.clients[0]["floor"]
+
+    sim.remove_users({floor: 5})        # swap-remove: rows shift
+    log.record(sim, 0.0)
+    sim.add_users({floor: 5})
+    log.record(sim, 0.0)
+
+    assert log.columns()["moves"].tolist() == [0, 0, 0]
+
+
+def test_moves_match_id_diff(sim):
+    log = KPILog()
+    log.record(sim, 0.0)
+    floor = sim.clients[0]["floor"]
+    for i in range(12):
+        before = assigned_by_id(sim)
+        if i % 3 == 1:
+            sim.remove_users({floor: 3})
+        elif i % 3 == 2:
+            sim.add_users({floor: 3})
+        sim.step()
+        log.record(sim, 0.0)
+        assert log.columns()["moves"][-1] == expected_moves(before, assigned_by_id(sim)), i
@@ -0,0 +1,42 @@
+"""FixedRate.remaining() and the step() budget handed to the auction."""
+
+import time
+
+import pytest
+
+from simulation.scheduler import FixedRate
+from simulation.simulator import WifiSimulator
+
+
+def test_remaining_counts_down_to_the_deadline():
+    rate = FixedRate("sim", 10)                 # 100 ms period
+    assert rate.remaining() == pytest.approx(0.1)      # not started yet
+    rate.wait()
+    left = rate.remaining()
+    assert 0.0 < left <= 0.1
+    time.sleep(0.02)
+    assert rate.remaining() < left
+    time.sleep(0.1)
+    assert rate.remaining() == 0.0              # late: no slack, never negative
+
+
+@pytest.fixture
+def budgets():
+    sim = WifiSimulator(seed=2, solver="auction")
+    seen = []
+    sim.apply_auction = seen.append
+    return sim, seen
+
+
+def test_auction_gets_what_is_left_of_the_step_budget(budgets):
+    sim, seen = budgets
+    sim.step(0.5)
+    assert 0.0 < seen[-1] < 0.5
+    sim.step(0.0)
+    assert seen[-1] == 0.0
+
+
+def test_no_budget_keeps_the_default(budgets):
+    sim, seen = budgets
+    sim.step()
+    assert seen == [None]
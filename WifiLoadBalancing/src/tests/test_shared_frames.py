@@ -0,0 +1,75 @@
+"""SharedFrames under a concurrent writer: read() never returns a torn bundle."""
+
+import multiprocessing as mp
+
+from simulation.worker import SECTIONS, SharedFrames
+
+# Bundles big enough that copying one spans a scheduler time slice, so
+# the writer regularly laps the reader mid-copy (even on one core)
+BUNDLES = 400
+SLOT_SIZE = 16 * 1024 * 1024
+
+
+def _sections(seq):
+    # Every byte of every section says which bundle it belongs to
+    fill = bytes([ord("a") + seq % 26])
+    return {name: fill * (200_000 + (seq * 37_003 + i * 101_009) % 1_000_000)
+            for i, name in enumerate(SECTIONS)}
+
+
+def _writer(name, started):
+    frames = SharedFrames.attach(name)
+    started.set()
+    for seq in range(1, BUNDLES + 1):
+        frames.write(seq, 0, seq, seq, _sections(seq))
+    frames.close()
+
+
+def _check(bundle):
+    assert bundle.tick == bundle.seq == bundle.snap_seq == bundle.bin_version
+    expected = _sections(bundle.seq)
+    for name in SECTIONS:
+        data = bundle[name]
+        data = data.encode() if isinstance(data, str) else data
+        assert data == expected[name], f"torn section {name} in bundle {bundle.seq}"
+
+
+def test_reader_never_sees_a_torn_bundle():
+    frames = SharedFrames.create(SLOT_SIZE)
+    ctx = mp.get_context("spawn")
+    started = ctx.Event()
+    writer = ctx.Process(target=_writer, args=(frames.name, started))
+    writer.start()
+    try:
+        assert started.wait(30)
+        reads, last = 0, 0
+        while writer.is_alive() or frames.latest > last:
+            bundle = frames.read(last)
+            if bundle is None:
+                continue
+            _check(bundle)
+            assert bundle.seq > last
+            last = bundle.seq
+            reads += 1
+        writer.join(30)
+        assert writer.exitcode == 0
+        assert reads > 0 and last == BUNDLES
+    finally:
+        if writer.is_alive():
+            writer.kill()
+        frames.close()
+        frames.shm.unlink()
+
+
+def test_read_returns_none_when_nothing_new():
+    frames = SharedFrames.create(64 * 1024)
+    try:
+        assert frames.read(0) is None
+        frames.write(7, 0, 1, 1, {"status": "{}"})
+        bundle = frames.read(0)
+        assert bundle.seq == 1 and bundle.tick == 7 and bundle["status"] == b"{}"
+        assert "state" not in bundle
+        assert frames.read(bundle.seq) is None
+    finally:
+        frames.close()
+        frames.shm.unlink()
@@ -0,0 +1,40 @@
+"""Snapshot.negotiate(): Accept-Encoding with q-values."""
+
+import pytest
+
+from streaming.snapshot import Snapshot
+
+
+@pytest.fixture
+def snap():
+    snap = Snapshot(1, 0, b'{"tick": 1}', encodings=("gzip",))
+    snap.variants["br"] = b"br-body"            # brotli may not be installed
+    return snap
+
+
+@pytest.mark.parametrize("header, want", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),                         # tie → br
+    ("BR;Q=1, GZIP", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0.0, gzip;q=0.000", None),
+    ("gzip;q=0", None),
+    ("br;q=0.4, gzip;q=0.8", "gzip"),           # client preference wins
+    ("br ; q=0.5 , gzip ; q=0.5", "br"),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("gzip, *;q=0", "gzip"),
+    ("br;q=0, *", "gzip"),
+    ("br;q=abc, gzip;q=2", None),               # malformed / out of range
+])
+def test_negotiate(snap, header, want):
+    assert snap.negotiate(header) == want
+
+
+def test_only_precomputed_variants(snap):
+    del snap.variants["br"]
+    assert snap.negotiate("br") is None
+    assert snap.negotiate("br, gzip;q=0.1") == "gzip"
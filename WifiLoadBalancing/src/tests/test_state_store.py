@@ -0,0 +1,179 @@
+"""ClientTable / APTable: rows, ids, interning and dict-compatible Record views."""
+
+import math
+
+import numpy as np
+import pytest
+
+from simulation.state_store import (
+    INT_NONE, NONE_CODE, APTable, ClientTable, Interner, group_rows,
+)
+
+
+def user(i, **fields):
+    return {"id": f"U{i}", "floor": i % 3, "room": f"R{i % 4}", "x": float(i), "y": 2.0 * i,
+            "vx": 0.5, "vy": -0.5, "airtime_usage": 1 + i % 5, "RSSI": -60 - i,
+            "nearest_ap": None, "assigned_ap": None, "connected_ap": None, **fields}
+
+
+def assert_consistent(table, want):
+    """Rows, id map and column values all agree with the `want` dicts (any order)."""
+    assert len(table) == len(want)
+    ids = table.ids()
+    assert sorted(ids) == sorted(u["id"] for u in want)
+    for row, rid in enumerate(ids):
+        assert table.row_of(rid) == row
+        assert table.get(rid)["id"] == rid
+    by_id = {u["id"]: u for u in want}
+    for rec in table:
+        assert dict(rec) == by_id[rec["id"]]
+
+
+# ============================================================
+# Interner
+# ============================================================
+def test_interner_round_trip():
+    pool = Interner()
+    names = ["AP_1", "AP_2", "AP_1", "Corridor", "AP_2"]
+    codes = [pool.code(n) for n in names]
+    assert codes == [0, 1, 0, 2, 1]              # stable, append-only
+    assert [pool.name(c) for c in codes] == names
+    assert pool.code(None) == NONE_CODE and pool.name(NONE_CODE) is None
+    assert len(pool) == 3
+
+
+def test_ref_columns_share_the_ap_pool():
+    aps = APTable([{"id": "A"}, {"id": "B"}])
+    clients = ClientTable([user(0, nearest_ap="B", assigned_ap="A")], ap_ids=aps.ap_ids)
+    assert clients.pools["nearest_ap"] is aps.ap_ids is clients.pools["connected_ap"]
+    assert aps.rows_for(clients.col("nearest_ap")).tolist() == [1]
+    assert aps.rows_for(clients.col("assigned_ap")).tolist() == [0]
+    assert aps.rows_for(clients.col("connected_ap")).tolist() == [-1]   # None
+
+
+# ============================================================
+# append / swap-remove
+# ============================================================
+def test_append_and_swap_remove_keep_rows_and_ids():
+    want = [user(i) for i in range(8)]
+    table = ClientTable(want, capacity=2)       # grows on the way
+    assert_consistent(table, want)
+
+    for rid in ("U2", "U7", "U0"):              # middle, last, first
+        rec = table.get(rid)
+        table.remove(rec)
+        want = [u for u in want if u["id"] != rid]
+        assert_consistent(table, want)
+        assert table.get(rid) is None and table.row_of(rid) == -1
+
+    table.append(user(9))
+    want.append(user(9))
+    assert_consistent(table, want)
+
+
+def test_views_follow_their_row_and_detach_on_remove():
+    table = ClientTable([user(i) for i in range(4)])
+    last, first = table.get("U3"), table.get("U0")
+    table.remove(first)                          # U3 swaps into row 0
+    assert last["id"] == "U3" and table.row_of("U3") == 0
+    last["x"] = 42.0
+    assert table.col("x")[0] == 42.0
+
+    assert first["x"] == 0.0                     # detached copy keeps its values
+    first["x"] = 123.0
+    assert table.get("U0") is None and 123.0 not in table.col("x")
+    with pytest.raises(ValueError):
+        table.remove(first)
+
+
+def test_remove_accepts_an_equal_dict():
+    table = ClientTable([user(i) for i in range(3)])
+    table.remove(user(1))
+    assert table.ids() == ["U0", "U2"]
+    with pytest.raises(ValueError):
+        table.remove(user(1, x=99.0))
+
+
+# ============================================================
+# Record ↔ dict parity
+# ============================================================
+def test_record_reads_like_the_dict():
+    src = user(4, nearest_ap="A", airtime_usage=2.5, extra={"k": 1})
+    rec = ClientTable([src], ap_ids=APTable([{"id": "A"}]).ap_ids)[0]
+
+    assert dict(rec) == src and rec == src and rec.copy() == src
+    assert rec.get("nearest_ap") == "A"
+    assert rec.get("assigned_ap", "default") is None      # None, not the default
+    assert rec.get("missing", "default") == "default"
+    assert rec["airtime_usage"] == 2.5 and isinstance(rec["RSSI"], int)
+    assert "extra" in rec and "missing" not in rec
+    with pytest.raises(KeyError):
+        rec["missing"]
+
+
+def test_none_round_trips_through_sentinels():
+    table = ClientTable([user(0)])
+    rec = table[0]
+    rec["floor"] = None
+    rec["room"] = None
+    rec["assigned_ap"] = "A"
+    rec["assigned_ap"] = None
+    rec["x"] = None
+    assert table.col("floor")[0] == INT_NONE
+    assert table.col("room")[0] == NONE_CODE and table.col("assigned_ap")[0] == NONE_CODE
+    assert rec["floor"] is None and rec["room"] is None and rec["assigned_ap"] is None
+    assert math.isnan(rec["x"])
+
+
+def test_missing_keys_take_column_defaults():
+    rec = ClientTable([{"id": "U"}])[0]
+    assert rec["RSSI"] == -95 and rec["airtime_usage"] == 1
+    assert rec["floor"] is None and rec["nearest_ap"] is None
+    assert math.isnan(rec["x"])
+
+
+def test_setdefault_and_extra_keys():
+    rec = ClientTable([user(0)])[0]
+    assert rec.setdefault("RSSI", -20) == -60    # column present: kept
+    assert rec.setdefault("note", "hi") == "hi"  # extra key: added
+    assert rec["note"] == "hi"
+    del rec["note"]
+    assert "note" not in rec
+    with pytest.raises(KeyError):
+        del rec["x"]                              # fixed column
+
+
+def test_optional_column_acts_absent():
+    rec = APTable([{"id": "A"}])[0]
+    assert "band" not in rec and rec.get("band", "5") == "5"
+    rec["band"] = "6"
+    assert rec.get("band", "5") == "6"
+    del rec["band"]
+    assert "band" not in rec
+
+
+def test_float_rssi_is_not_truncated():
+    rec = ClientTable([user(0)])[0]
+    rec["RSSI"] = -61.7                           # e.g. calc_rssi()
+    assert rec["RSSI"] == -61.7
+    rec["RSSI"] = -61.0
+    assert rec["RSSI"] == -61 and isinstance(rec["RSSI"], int)
+
+
+def test_rename_moves_the_id_map():
+    table = ClientTable([user(0), user(1)])
+    table[0]["id"] = "Z"
+    assert table.row_of("Z") == 0 and table.get("U0") is None
+    assert table.ids() == ["Z", "U1"]
+
+
+# ============================================================
+# group_rows
+# ============================================================
+def test_group_rows():
+    keys = np.array([2, -1, 0, 2, 0, 5])
+    groups = group_rows(keys)
+    assert {k: v.tolist() for k, v in groups.items()} == {0: [2, 4], 2: [0, 3], 5: [5]}
+    groups = group_rows(keys, rows=np.arange(10, 16))
+    assert groups[2].tolist() == [10, 13]
+    assert group_rows(np.array([-1, -1])) == {}
@@ -0,0 +1,76 @@
+"""Sweep spec checks, grid × random points, and one tiny pooled run."""
+
+import json
+
+import pytest
+
+from simulation.sweep import RESULTS, load_spec, points, sweep, to_config
+
+
+def spec(**fields):
+    return load_spec({"grid": {"weights.load": [0.3, 0.9], "capacity_alpha": [0.1, 0.2, 0.3]},
+                      "random": {"load_decay": [0.7, 0.95], "band_coverage.5": [250, 400]},
+                      "samples": 4, **fields})
+
+
+# ============================================================
+# Spec
+# ============================================================
+def test_to_config_nests_dotted_names():
+    assert to_config({"weights.load": 0.9, "weights.rssi": 0.1, "load_decay": 0.8}) == \
+        {"weights": {"load": 0.9, "rssi": 0.1}, "load_decay": 0.8}
+
+
+@pytest.mark.parametrize("bad", [
+    {"grids": {}},                                  # spec key
+    {"grid": {"no_such_key": [1, 2]}},              # config key
+    {"grid": {"weights.no_such_weight": [1]}},      # dict entry
+    {"random": {"load_decay.x": [0, 1]}, "samples": 1},     # not a dict value
+])
+def test_unknown_keys_are_rejected(bad):
+    with pytest.raises(ValueError):
+        load_spec(bad)
+
+
+def test_load_spec_reads_json_and_fills_defaults(tmp_path):
+    path = tmp_path / "sweep.json"
+    path.write_text(json.dumps({"grid": {"load_decay": [0.8]}, "ticks": 10, "warmup": 2}))
+    got = load_spec(path)
+    assert got["ticks"] == 10 and got["seeds"] == [0] and got["sweep_seed"] == 0
+    with pytest.raises(ValueError):
+        load_spec({"ticks": 10, "warmup": 10})
+
+
+# ============================================================
+# points()
+# ============================================================
+def test_points_are_grid_times_samples():
+    pts = points(spec())
+    assert len(pts) == 2 * 3 * 4
+    grid = {(p["weights.load"], p["capacity_alpha"]) for p in pts}
+    assert len(grid) == 6
+    for p in pts:
+        assert 0.7 <= p["load_decay"] <= 0.95
+        assert isinstance(p["band_coverage.5"], int) and 250 <= p["band_coverage.5"] <= 400
+
+    assert len(points(load_spec({"grid": {"load_decay": [0.8, 0.9]}}))) == 2
+    assert points(load_spec({})) == [{}]
+
+
+def test_sweep_seed_reproducible():
+    assert points(spec(sweep_seed=3)) == points(spec(sweep_seed=3))
+    assert points(spec(sweep_seed=3)) != points(spec(sweep_seed=4))
+
+
+# ============================================================
+# sweep()
+# ============================================================
+def test_tiny_sweep_rows():
+    rows = sweep({"grid": {"load_decay": [0.7, 0.9]}, "seeds": [0, 1],
+                  "ticks": 6, "warmup": 2, "users": 60},
+                 workers=1, progress=False)
+    assert [r["run"] for r in rows] == [0, 1, 2, 3]
+    assert [(r["load_decay"], r["seed"]) for r in rows] == [(0.7, 0), (0.7, 1), (0.9, 0), (0.9, 1)]
+    for row in rows:
+        assert list(row) == ["run", "seed", "load_decay", *RESULTS]
+        assert row["clients"] == 60 and row["ticks_per_sec"] > 0